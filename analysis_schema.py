@@ -0,0 +1,145 @@
+"""
+JSON schema for structured sprint analyses and a lightweight validator for it.
+The schema is sent to the model as a function definition so the response arrives as typed JSON
+that feeds the spreadsheet builders directly.
+"""
+
+from typing import Any, Dict, List
+
+ANALYSIS_FUNCTION_NAME = "submit_sprint_plan"
+
+_IMPACT_LEVELS = ["Low", "Medium", "High", "Critical"]
+
+STORY_SCHEMA = {
+    "type": "object",
+    "required": ["title", "story_points", "hours"],
+    "properties": {
+        "title": {"type": "string"},
+        "story_points": {"type": "number", "minimum": 0},
+        "hours": {"type": "number", "minimum": 0}
+    }
+}
+
+SPRINT_SCHEMA = {
+    "type": "object",
+    "required": ["number", "goal", "stories"],
+    "properties": {
+        "number": {"type": "integer", "minimum": 1},
+        "goal": {"type": "string"},
+        "duration_weeks": {"type": "number", "minimum": 0},
+        "stories": {"type": "array", "items": STORY_SCHEMA},
+        "deliverables": {"type": "string"},
+        "dependencies": {"type": "string"}
+    }
+}
+
+BOTTLENECK_SCHEMA = {
+    "type": "object",
+    "required": ["type", "description", "impact", "mitigation"],
+    "properties": {
+        "type": {"type": "string"},
+        "description": {"type": "string"},
+        "impact": {"type": "string", "enum": _IMPACT_LEVELS},
+        "affected_sprints": {"type": "string"},
+        "mitigation": {"type": "string"},
+        "timeline_impact": {"type": "string"},
+        "owner": {"type": "string"}
+    }
+}
+
+RISK_SCHEMA = {
+    "type": "object",
+    "required": ["category", "description", "probability", "impact", "mitigation"],
+    "properties": {
+        "category": {"type": "string"},
+        "description": {"type": "string"},
+        "probability": {"type": "string", "enum": ["Low", "Medium", "High"]},
+        "impact": {"type": "string", "enum": _IMPACT_LEVELS},
+        "score": {"type": "integer", "minimum": 1, "maximum": 9},
+        "mitigation": {"type": "string"},
+        "contingency_buffer": {"type": "string"},
+        "owner": {"type": "string"},
+        "status": {"type": "string"}
+    }
+}
+
+MILESTONE_SCHEMA = {
+    "type": "object",
+    "required": ["sprint", "name"],
+    "properties": {
+        "sprint": {"type": "integer", "minimum": 1},
+        "name": {"type": "string"},
+        "deliverables": {"type": "string"},
+        "dependencies": {"type": "string"},
+        "buffer_days": {"type": "number", "minimum": 0},
+        "critical_path": {"type": "boolean"}
+    }
+}
+
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "required": ["project_overview", "sprints", "bottlenecks", "risks", "milestones"],
+    "properties": {
+        "project_overview": {"type": "string"},
+        "sprint_breakdown": {"type": "string"},
+        "bottleneck_analysis": {"type": "string"},
+        "resource_planning": {"type": "string"},
+        "risk_assessment": {"type": "string"},
+        "dependencies_mapping": {"type": "string"},
+        "timeline_milestones": {"type": "string"},
+        "recommendations": {"type": "string"},
+        "sprints": {"type": "array", "items": SPRINT_SCHEMA},
+        "bottlenecks": {"type": "array", "items": BOTTLENECK_SCHEMA},
+        "risks": {"type": "array", "items": RISK_SCHEMA},
+        "milestones": {"type": "array", "items": MILESTONE_SCHEMA}
+    }
+}
+
+ANALYSIS_TOOL = {
+    "type": "function",
+    "function": {
+        "name": ANALYSIS_FUNCTION_NAME,
+        "description": "Submit the complete sprint plan and project analysis.",
+        "parameters": ANALYSIS_SCHEMA
+    }
+}
+
+_TYPE_CHECKS = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool)
+}
+
+
+def validate(value: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """Validate value against the subset of JSON Schema used above, returning error messages"""
+    expected = schema.get("type")
+    if expected and not _TYPE_CHECKS[expected](value):
+        return [f"{path}: expected {expected}, got {type(value).__name__}"]
+
+    errors = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} is not one of {schema['enum']}")
+    if "minimum" in schema and value < schema["minimum"]:
+        errors.append(f"{path}: {value} is below the minimum {schema['minimum']}")
+    if "maximum" in schema and value > schema["maximum"]:
+        errors.append(f"{path}: {value} is above the maximum {schema['maximum']}")
+    if expected == "object":
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}: missing required property '{key}'")
+        for key, subschema in schema.get("properties", {}).items():
+            if key in value:
+                errors.extend(validate(value[key], subschema, f"{path}.{key}"))
+    elif expected == "array" and "items" in schema:
+        for position, item in enumerate(value):
+            errors.extend(validate(item, schema["items"], f"{path}[{position}]"))
+    return errors
+
+
+def validate_analysis(data: Any) -> List[str]:
+    """Validate a structured analysis, returning a list of error messages (empty when valid)"""
+    return validate(data, ANALYSIS_SCHEMA)
@@ -1,14 +1,105 @@
-from flask import Flask, render_template, request, jsonify, send_file, flash, redirect, url_for
-from enhanced_estimator import EnhancedSprintEstimator
+from flask import Flask, render_template, request, jsonify, send_file, flash, redirect, url_for, Response, stream_with_context, g, before_render_template, template_rendered
+from lazy_estimator import LazyEstimator
+from rate_limiter import RateLimiter
+from job_queue import JobQueue, SQLiteJobBackend, DONE, FAILED, FINISHED_STATES
+from metrics import REGISTRY, finish_request, record_stage, server_timing, start_request
+from sampling_profiler import SamplingProfiler
 import os
+import hmac
 from datetime import datetime
+import io
 import json
+import time
+import zipfile
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'  # Change this in production
 
-# Initialize the enhanced estimator
-estimator = EnhancedSprintEstimator()
+# Set by gunicorn.conf.py: build everything in the master process before workers fork
+PRELOAD = os.getenv('SPRINT_PRELOAD', '').lower() in ('1', 'true', 'yes')
+
+def create_estimator():
+    """Import and build the enhanced estimator (pandas, NumPy, openai and the historical data)"""
+    from enhanced_estimator import EnhancedSprintEstimator
+    return EnhancedSprintEstimator()
+
+# The enhanced estimator is built on first use; routes see it through this proxy
+estimator = LazyEstimator(create_estimator)
+if PRELOAD:
+    estimator.get()
+elif os.getenv('SPRINT_WARM_UP', 'true').lower() not in ('0', 'false', 'no'):
+    estimator.warm_up()
+
+# Shared across batch requests so concurrent batches cannot exceed the LLM budget together
+batch_rate_limiter = RateLimiter(rate=float(os.getenv('SPRINT_BATCH_RATE', 2)))
+MAX_BATCH_CONCURRENCY = int(os.getenv('SPRINT_BATCH_CONCURRENCY', 4))
+
+def run_estimation_job(project_details, report_progress):
+    """Job handler: full analysis plus report for one project, reporting sections as they stream in"""
+    # The payload may be the stored job record's own dict; leave it as submitted
+    project_details = dict(project_details)
+    report_format = project_details.pop('report_format', 'xlsx')
+    result = estimator.estimate_project(project_details, on_section=report_progress, report_format=report_format)
+    if 'error' in result:
+        return result
+    result['project_details'] = project_details
+    return result
+
+# Estimations run on background workers; routes only submit and poll
+job_queue = JobQueue(
+    run_estimation_job,
+    backend=SQLiteJobBackend(os.getenv('SPRINT_JOB_DB')) if os.getenv('SPRINT_JOB_DB') else None,
+    workers=int(os.getenv('SPRINT_JOB_WORKERS', 4)),
+    lease_seconds=float(os.getenv('SPRINT_JOB_LEASE', 60)),
+    # Job threads must start in the workers, not in a preloading master
+    resume=not PRELOAD
+)
+
+# Stage timings of each request go out as a Server-Timing header when enabled
+SERVER_TIMING = os.getenv('SPRINT_SERVER_TIMING', '').lower() in ('1', 'true', 'yes')
+# The sampling profiler behind /api/admin/profile is off unless explicitly enabled
+profiler = SamplingProfiler(float(os.getenv('SPRINT_PROFILER_INTERVAL', 0.005))) \
+    if os.getenv('SPRINT_PROFILER', '').lower() in ('1', 'true', 'yes') else None
+
+@app.before_request
+def start_request_timing():
+    g.request_started = time.perf_counter()
+    g.timing_token = start_request()
+
+@app.after_request
+def finish_request_timing(response):
+    token = g.pop('timing_token', None)
+    if token is None:
+        return response
+    timings = finish_request(token)
+    elapsed = time.perf_counter() - g.request_started
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    REGISTRY.observe('sprint_http_request_seconds', elapsed, method=request.method, endpoint=endpoint,
+                     status=str(response.status_code))
+    if SERVER_TIMING:
+        response.headers['Server-Timing'] = server_timing(timings, elapsed)
+    return response
+
+@before_render_template.connect_via(app)
+def start_render_timing(sender, template, context, **extra):
+    g.render_started = time.perf_counter()
+
+@template_rendered.connect_via(app)
+def finish_render_timing(sender, template, context, **extra):
+    started = g.pop('render_started', None)
+    if started is not None:
+        record_stage('render', time.perf_counter() - started)
+
+@app.route('/healthz')
+def healthz():
+    """Liveness check that answers immediately, with the estimator's warm-up state"""
+    return jsonify({'status': 'ok', 'estimator': estimator.status()})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness check: 503 until the estimator has finished loading"""
+    status = estimator.status()
+    return jsonify(status), 200 if status['status'] == 'ready' else 503
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -28,20 +119,15 @@ def index():
                 'tech_stack': request.form.get('tech_stack', '').split(',') if request.form.get('tech_stack') else []
             }
             
-            # Get AI analysis
-            analysis = estimator.get_ai_analysis(project_details)
-            
-            # Generate spreadsheet
-            if 'error' not in analysis:
-                spreadsheet_file = estimator.generate_sprint_spreadsheet(analysis, project_details)
-                
-                return render_template('results.html', 
-                                     analysis=analysis, 
-                                     project_details=project_details,
-                                     spreadsheet_file=spreadsheet_file)
-            else:
-                flash(f"Error in analysis: {analysis['error']}", 'error')
+            from sprint_planner import team_size_error
+            invalid_teams = team_size_error(project_details)
+            if invalid_teams:
+                flash(invalid_teams, 'error')
                 return redirect(url_for('index'))
+            
+            # Queue the analysis and spreadsheet generation; the job page polls for the result
+            job_id = job_queue.submit(project_details)
+            return redirect(url_for('job_page', job_id=job_id))
                 
         except Exception as e:
             flash(f"An error occurred: {str(e)}", 'error')
@@ -49,6 +135,25 @@ def index():
     
     return render_template('index.html')
 
+@app.route('/jobs/<job_id>')
+def job_page(job_id):
+    """Show a queued estimation, rendering the results once the job is done"""
+    job = job_queue.get(job_id)
+    if job is None:
+        flash('Unknown or expired estimation job', 'error')
+        return redirect(url_for('index'))
+    if job['status'] == FAILED:
+        flash(f"Error in analysis: {job['error']}", 'error')
+        return redirect(url_for('index'))
+    if job['status'] == DONE:
+        result = job['result']
+        return render_template('results.html',
+                             analysis=result['analysis'],
+                             project_details=result['project_details'],
+                             spreadsheet_file=result['spreadsheet_file'],
+                             download_url=result.get('download_url'))
+    return render_template('job.html', job_id=job_id, project_details=job['payload'])
+
 @app.route('/download/<filename>')
 def download_file(filename):
     """Download generated spreadsheet"""
@@ -58,6 +163,18 @@ def download_file(filename):
         flash(f"Error downloading file: {str(e)}", 'error')
         return redirect(url_for('index'))
 
+@app.route('/artifacts/<artifact_id>')
+def download_artifact(artifact_id):
+    """Stream a generated report from the artifact store"""
+    found = estimator.artifact_store.open(artifact_id)
+    if found is None:
+        return jsonify({'error': 'Report not found or expired'}), 404
+    metadata, chunks = found
+    response = Response(chunks, mimetype=metadata['mimetype'], direct_passthrough=True)
+    response.headers['Content-Length'] = str(metadata['size'])
+    response.headers['Content-Disposition'] = f"attachment; filename=\"{metadata['filename']}\""
+    return response
+
 @app.route('/api/estimate', methods=['POST'])
 def api_estimate():
     """API endpoint for programmatic access"""
@@ -66,23 +183,255 @@ def api_estimate():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        analysis = estimator.get_ai_analysis(data)
+        report_format = request.args.get('format', 'xlsx').lower()
+        if report_format not in estimator.exporters and report_format in estimator.unavailable_exporters:
+            return jsonify({'error': f"Format '{report_format}' is not available: {estimator.unavailable_exporters[report_format]}"}), 400
+        if report_format not in estimator.exporters:
+            return jsonify({'error': f"Unknown format '{report_format}', expected one of {', '.join(sorted(estimator.exporters))}"}), 400
+        invalid = invalid_teams_response(data)
+        if invalid:
+            return invalid
         
-        if 'error' in analysis:
-            return jsonify(analysis), 500
+        if request.args.get('async', '').lower() in ('1', 'true', 'yes'):
+            return submit_job_response(dict(data, report_format=report_format))
         
-        # Generate spreadsheet
-        spreadsheet_file = estimator.generate_sprint_spreadsheet(analysis, data)
+        structured = request.args.get('structured', '').lower() in ('1', 'true', 'yes') or None
+        # Analysis and report; identical requests in flight share one run
+        result = estimator.estimate_project(data, report_format=report_format, structured=structured)
+        
+        if 'error' in result:
+            return jsonify(result), 500
+        if result.get('download_url') is None:
+            # The analysis succeeded but the report could not be generated
+            return jsonify({'error': result['spreadsheet_file'], 'analysis': result['analysis']}), 500
         
         return jsonify({
-            'analysis': analysis,
-            'spreadsheet_file': spreadsheet_file,
-            'download_url': f'/download/{spreadsheet_file}'
+            'analysis': result['analysis'],
+            'report_format': report_format,
+            'forecast': result.get('forecast'),
+            'spreadsheet_file': result['spreadsheet_file'],
+            'download_url': result['download_url']
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def invalid_teams_response(project_details):
+    """A 400 response when a team has no people to schedule stories on, otherwise None"""
+    from sprint_planner import team_size_error
+    error = team_size_error(project_details)
+    return (jsonify({'error': error}), 400) if error else None
+
+def submit_job_response(project_details):
+    """Queue an estimation job and describe where to follow it"""
+    job_id = job_queue.submit(project_details)
+    return jsonify({
+        'job_id': job_id,
+        'status_url': f'/api/jobs/{job_id}',
+        'result_url': f'/api/jobs/{job_id}/result',
+        'events_url': f'/api/jobs/{job_id}/events'
+    }), 202
+
+@app.route('/api/jobs', methods=['POST'])
+def api_submit_job():
+    """Submit an estimation job without waiting for the LLM"""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    return invalid_teams_response(data) or submit_job_response(data)
+
+@app.route('/api/jobs/<job_id>')
+def api_job_status(job_id):
+    """Report the status of an estimation job"""
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(status)
+
+@app.route('/api/jobs/<job_id>/result')
+def api_job_result(job_id):
+    """Return a finished job's analysis, or 202 while it is still running"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] == FAILED:
+        return jsonify({'error': job['error']}), 500
+    if job['status'] != DONE:
+        return jsonify({'job_id': job_id, 'status': job['status']}), 202
+    result = job['result']
+    if result.get('download_url', '') is None:
+        return jsonify({'error': result['spreadsheet_file'], 'analysis': result['analysis']}), 500
+    return jsonify({
+        'analysis': result['analysis'],
+        'report_format': result.get('report_format', 'xlsx'),
+        'spreadsheet_file': result['spreadsheet_file'],
+        'download_url': result.get('download_url', f"/download/{result['spreadsheet_file']}")
+    })
+
+@app.route('/api/jobs/<job_id>/events')
+def api_job_events(job_id):
+    """Server-sent events announcing completed analysis sections and status changes until the job finishes"""
+    if job_queue.status(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def generate():
+        last_status = None
+        sent_sections = {}
+        while True:
+            job = job_queue.get(job_id)
+            if job is None:
+                return
+            for key, content in (job.get('progress') or {}).items():
+                # A repeated section is re-sent with its merged content
+                if sent_sections.get(key) != content:
+                    sent_sections[key] = content
+                    yield f"event: section\ndata: {json.dumps({'section': key, 'content': content})}\n\n"
+            if job['status'] != last_status:
+                last_status = job['status']
+                yield f"event: status\ndata: {json.dumps({'id': job_id, 'status': last_status, 'error': job['error']})}\n\n"
+            if last_status in FINISHED_STATES:
+                return
+            time.sleep(0.5)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+@app.route('/api/estimate/stories', methods=['POST'])
+def api_estimate_stories():
+    """Per-story estimates from historical actuals, falling back to the LLM when confidence is low"""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    narrative = request.args.get('narrative', '').lower() in ('1', 'true', 'yes')
+    result = estimator.get_story_estimates(data, narrative=narrative, min_confidence=request.args.get('min_confidence', type=float))
+    if 'error' in result:
+        return jsonify(result), 500
+    return jsonify(result)
+
+@app.route('/api/dependencies', methods=['POST'])
+def api_dependencies():
+    """Critical path, earliest/latest start and slack of the user stories, computed without the LLM"""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    invalid = invalid_teams_response(data)
+    if invalid:
+        return invalid
+    result = estimator.analyze_dependencies(data)
+    if 'error' in result:
+        return jsonify(result), 400
+    return jsonify(result)
+
+@app.route('/api/forecast', methods=['POST'])
+def api_forecast():
+    """Monte Carlo delivery forecast of the user stories from historical actuals, computed without the LLM"""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    return invalid_teams_response(data) or jsonify(estimator.forecast_delivery(data))
+
+@app.route('/api/estimate/stream', methods=['POST'])
+def api_estimate_stream():
+    """Stream the comprehensive analysis as server-sent events, one per completed section"""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    invalid = invalid_teams_response(data)
+    if invalid:
+        return invalid
+    
+    def generate():
+        for event in estimator.stream_ai_analysis(data):
+            yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+def parse_batch_payload():
+    """Read a batch of project details from a JSON array or NDJSON body"""
+    body = request.get_data(as_text=True).strip()
+    if not body:
+        return []
+    if body.startswith('['):
+        return json.loads(body)
+    return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+@app.route('/api/estimate/batch', methods=['POST'])
+def api_estimate_batch():
+    """Estimate many projects, streaming NDJSON results as each project finishes"""
+    try:
+        projects = parse_batch_payload()
+    except json.JSONDecodeError as e:
+        return jsonify({'error': f'Invalid batch payload: {str(e)}'}), 400
+    if not projects or not all(isinstance(project, dict) for project in projects):
+        return jsonify({'error': 'Expected a non-empty JSON array or NDJSON of project details'}), 400
+    
+    concurrency = min(request.args.get('concurrency', MAX_BATCH_CONCURRENCY, type=int), MAX_BATCH_CONCURRENCY)
+    bundle_zip = request.args.get('zip', '').lower() in ('1', 'true', 'yes')
+    
+    def generate():
+        archive_name = f"Sprint_Plans_Batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        in_memory = estimator.report_storage != 'disk'
+        archive_buffer = io.BytesIO() if in_memory else archive_name
+        archive = zipfile.ZipFile(archive_buffer, 'w', zipfile.ZIP_DEFLATED) if bundle_zip else None
+        results = estimator.estimate_many(projects, concurrency, batch_rate_limiter)
+        try:
+            for index, result in results:
+                line = {'index': index, 'project_name': projects[index].get('project_name', '')}
+                if 'error' in result:
+                    line['error'] = result['error']
+                else:
+                    spreadsheet_file = result['spreadsheet_file']
+                    line['analysis'] = result['analysis']
+                    arcname = f"{index:04d}_{os.path.basename(spreadsheet_file)}"
+                    artifact = estimator.artifact_store.get(result['artifact_id']) if archive is not None and result.get('artifact_id') else None
+                    if artifact is not None:
+                        archive.writestr(arcname, artifact['data'])
+                        estimator.artifact_store.delete(result['artifact_id'])
+                    elif archive is not None and os.path.exists(spreadsheet_file):
+                        archive.write(spreadsheet_file, arcname=arcname)
+                        os.remove(spreadsheet_file)
+                    else:
+                        line['spreadsheet_file'] = spreadsheet_file
+                        line['download_url'] = result['download_url']
+                yield json.dumps(line, default=str) + '\n'
+        finally:
+            # Cancels the projects not yet started when the client disconnects mid-stream
+            results.close()
+            if archive is not None:
+                archive.close()
+        if archive is None:
+            return
+        if not in_memory:
+            yield json.dumps({'archive_file': archive_name, 'download_url': f'/download/{archive_name}'}) + '\n'
+            return
+        try:
+            artifact_id = estimator.artifact_store.put(archive_buffer.getvalue(), archive_name, 'application/zip')
+        except ValueError as e:
+            yield json.dumps({'error': str(e)}) + '\n'
+            return
+        yield json.dumps({'archive_file': archive_name, 'download_url': f'/artifacts/{artifact_id}'}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/stories', methods=['POST'])
+def api_ingest_stories():
+    """Append completed stories (JSON array, {"stories": [...]} or NDJSON) to the historical data"""
+    stories = request.get_json(silent=True)
+    if stories is None:
+        try:
+            stories = parse_batch_payload()
+        except json.JSONDecodeError as e:
+            return jsonify({'error': f'Invalid stories payload: {str(e)}'}), 400
+    if isinstance(stories, dict):
+        stories = stories.get('stories', [stories])
+    if not stories:
+        return jsonify({'error': 'No stories provided'}), 400
+    result = estimator.ingest_stories(stories)
+    if 'error' in result:
+        return jsonify(result), 500
+    return jsonify(result), 200 if result['accepted'] or result['duplicates'] else 400
+
 @app.route('/historical-insights')
 def historical_insights():
     """Display historical data insights"""
@@ -93,5 +442,54 @@ def historical_insights():
         flash(f"Error loading insights: {str(e)}", 'error')
         return redirect(url_for('index'))
 
+def admin_denied():
+    """Error response for an admin request, or None when it carries the configured SPRINT_ADMIN_TOKEN.
+    Admin endpoints are off until a token is configured."""
+    admin_token = os.getenv('SPRINT_ADMIN_TOKEN')
+    if not admin_token:
+        return jsonify({'error': 'Admin endpoints disabled; set SPRINT_ADMIN_TOKEN'}), 404
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode(), admin_token.encode()):
+        return jsonify({'error': 'Forbidden'}), 403
+    return None
+
+@app.route('/api/admin/reload-historical-data', methods=['POST'])
+def reload_historical_data():
+    """Reload the historical data file in the background (or synchronously with ?wait=1)"""
+    denied = admin_denied()
+    if denied is not None:
+        return denied
+    if request.args.get('wait') in ('1', 'true', 'yes'):
+        result = estimator.reload_historical_data()
+        return jsonify(result), 500 if 'error' in result else 200
+    started = estimator.reload_historical_data_async()
+    return jsonify({'status': 'reloading' if started else 'already reloading',
+                    'snapshot': estimator.snapshot.summary(),
+                    'watchers': [estimator.reload_watcher.status(), estimator.store_watcher.status()]}), 202
+
+@app.route('/api/admin/profile', methods=['POST'])
+def profile_server():
+    """Sample every thread's stack for ?seconds= (default 5) and return collapsed stacks for a flame graph"""
+    if profiler is None:
+        return jsonify({'error': 'Profiler disabled; set SPRINT_PROFILER=true'}), 404
+    denied = admin_denied()
+    if denied is not None:
+        return denied
+    seconds = min(max(request.args.get('seconds', 5, type=float), 0.1), 60)
+    try:
+        stacks = profiler.profile(seconds)
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+    return Response(stacks, mimetype='text/plain')
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics: stage timings, request latency, token counts, cache and report sizes"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/cache-stats')
+def cache_stats():
+    """Expose LLM response cache hit/miss counters"""
+    return jsonify(estimator.cache_stats())
+
 if __name__ == '__main__':
     app.run(debug=True)
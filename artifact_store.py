@@ -0,0 +1,199 @@
+"""
+Bounded store for generated report files.
+Reports are rendered in memory and kept under an opaque, unguessable ID with a total byte cap,
+least-recently-used eviction and a TTL, instead of accumulating as files in the working directory.
+An optional SQLite backend lets every worker process serve downloads of reports another one built.
+"""
+
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ArtifactStore:
+    """LRU + TTL byte-capped artifact store with an optional SQLite backend"""
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024, ttl_seconds: float = 3600, db_path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.evictions = 0
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if db_path:
+            with self._connect() as conn:
+                # Readers streaming a download keep their snapshot while writers evict (see open)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS artifacts (id TEXT PRIMARY KEY, filename TEXT NOT NULL, "
+                    "mimetype TEXT NOT NULL, size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL, "
+                    "data BLOB NOT NULL)"
+                )
+
+    @classmethod
+    def from_env(cls) -> 'ArtifactStore':
+        """Create a store configured from SPRINT_ARTIFACT_* environment variables"""
+        return cls(
+            max_bytes=int(os.getenv('SPRINT_ARTIFACT_MAX_BYTES', 128 * 1024 * 1024)),
+            ttl_seconds=float(os.getenv('SPRINT_ARTIFACT_TTL', 3600)),
+            db_path=os.getenv('SPRINT_ARTIFACT_DB') or None
+        )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created > self.ttl_seconds
+
+    def put(self, data: bytes, filename: str, mimetype: str = 'application/octet-stream') -> str:
+        """Store data and return its opaque ID; raises ValueError if it exceeds the byte cap on its own"""
+        if len(data) > self.max_bytes:
+            raise ValueError(f"Artifact of {len(data)} bytes exceeds the {self.max_bytes} byte store limit")
+        artifact_id = secrets.token_urlsafe(16)
+        now = time.time()
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("INSERT INTO artifacts (id, filename, mimetype, size, created, accessed, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (artifact_id, filename, mimetype, len(data), now, now, sqlite3.Binary(data)))
+                self._evict_disk(conn, now)
+            return artifact_id
+
+        with self._lock:
+            self._entries[artifact_id] = {'data': data, 'filename': filename, 'mimetype': mimetype,
+                                          'size': len(data), 'created': now}
+            self._bytes += len(data)
+            self._evict_memory()
+        return artifact_id
+
+    def _evict_memory(self):
+        for artifact_id in [key for key, entry in self._entries.items() if self._expired(entry['created'])]:
+            self._bytes -= self._entries.pop(artifact_id)['size']
+        while self._bytes > self.max_bytes:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry['size']
+            self.evictions += 1
+
+    def _evict_disk(self, conn, now: float):
+        if self.ttl_seconds > 0:
+            conn.execute("DELETE FROM artifacts WHERE created < ?", (now - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for artifact_id, size in conn.execute("SELECT id, size FROM artifacts ORDER BY accessed").fetchall():
+            conn.execute("DELETE FROM artifacts WHERE id = ?", (artifact_id,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def get(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        """Return the artifact's metadata and bytes, or None if unknown or expired"""
+        found = self.open(artifact_id)
+        if found is None:
+            return None
+        metadata, chunks = found
+        return dict(metadata, data=b"".join(chunks))
+
+    def open(self, artifact_id: str, chunk_size: int = CHUNK_SIZE) -> Optional[Tuple[Dict[str, Any], Iterator[bytes]]]:
+        """Return (metadata, chunk iterator) for streaming the artifact, or None if unknown or expired"""
+        if self.db_path:
+            return self._open_disk(artifact_id, chunk_size)
+
+        with self._lock:
+            entry = self._entries.get(artifact_id)
+            if entry is None:
+                return None
+            if self._expired(entry['created']):
+                self._bytes -= self._entries.pop(artifact_id)['size']
+                return None
+            self._entries.move_to_end(artifact_id)
+        view = memoryview(entry['data'])
+        metadata = {key: entry[key] for key in ('filename', 'mimetype', 'size', 'created')}
+        return metadata, (bytes(view[start:start + chunk_size]) for start in range(0, len(view), chunk_size))
+
+    def _open_disk(self, artifact_id: str, chunk_size: int) -> Optional[Tuple[Dict[str, Any], Iterator[bytes]]]:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                conn.execute("UPDATE artifacts SET accessed = ? WHERE id = ?", (time.time(), artifact_id))
+            # The read transaction stays open until the download is streamed, so the artifact is read
+            # from one snapshot even if another request evicts or deletes it meanwhile
+            conn.execute("BEGIN")
+            row = conn.execute("SELECT rowid, filename, mimetype, size, created FROM artifacts WHERE id = ?",
+                               (artifact_id,)).fetchone()
+            if row is None or self._expired(row[4]):
+                conn.close()
+                return None
+            rowid, filename, mimetype, size, created = row
+            metadata = {'filename': filename, 'mimetype': mimetype, 'size': size, 'created': created}
+            if not hasattr(conn, 'blobopen'):
+                data = memoryview(conn.execute("SELECT data FROM artifacts WHERE rowid = ?", (rowid,)).fetchone()[0])
+                conn.close()
+                return metadata, (bytes(data[start:start + chunk_size]) for start in range(0, len(data), chunk_size))
+            return metadata, _BlobChunks(conn, rowid, size, chunk_size)
+        except Exception:
+            conn.close()
+            raise
+
+    def delete(self, artifact_id: str):
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM artifacts WHERE id = ?", (artifact_id,))
+            return
+        with self._lock:
+            entry = self._entries.pop(artifact_id, None)
+            if entry is not None:
+                self._bytes -= entry['size']
+
+    def stats(self) -> Dict[str, Any]:
+        """Return current size, entry count and eviction counter"""
+        if self.db_path:
+            with self._connect() as conn:
+                entries, stored = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts").fetchone()
+        else:
+            with self._lock:
+                entries, stored = len(self._entries), self._bytes
+        return {'entries': entries, 'bytes': stored, 'max_bytes': self.max_bytes, 'ttl_seconds': self.ttl_seconds,
+                'evictions': self.evictions, 'persistent': bool(self.db_path)}
+
+
+class _BlobChunks:
+    """Iterates an artifact's blob in chunks (Python 3.11+), so a download never holds the whole
+    artifact; finishing or closing it ends the read transaction and closes the connection"""
+
+    def __init__(self, conn: sqlite3.Connection, rowid: int, size: int, chunk_size: int):
+        self._conn = conn
+        self._blob = conn.blobopen('artifacts', 'data', rowid, readonly=True)
+        self._remaining = size
+        self._chunk_size = chunk_size
+
+    def __iter__(self) -> '_BlobChunks':
+        return self
+
+    def __next__(self) -> bytes:
+        chunk = self._blob.read(min(self._chunk_size, self._remaining)) if self._conn is not None and self._remaining > 0 else b""
+        if not chunk:
+            self.close()
+            raise StopIteration
+        self._remaining -= len(chunk)
+        return chunk
+
+    def close(self):
+        if self._conn is not None:
+            self._blob.close()
+            self._conn.close()
+            self._conn = None
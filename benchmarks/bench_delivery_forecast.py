@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Monte Carlo delivery forecast across trial counts and backlog sizes.
+Run from the repository root: python -m benchmarks.bench_delivery_forecast
+"""
+
+import time
+
+import numpy as np
+
+from delivery_forecast import simulate_delivery
+
+
+def synthetic_plan(stories, sprint_capacity=480.0, seed=3):
+    """Stories of 1-13 points packed into sprints of roughly sprint_capacity planned hours"""
+    rng = np.random.default_rng(seed)
+    points = rng.choice([1, 2, 3, 5, 8, 13], stories).astype(float)
+    planned = np.cumsum(points * 4.5)
+    sprint = (planned // sprint_capacity).astype(np.int64)
+    return points, sprint, np.full(int(sprint.max()) + 1, sprint_capacity)
+
+
+def main():
+    ratios = np.random.default_rng(7).lognormal(1.2, 0.6, 5000)
+    print("Delivery forecast (ms per full simulation)")
+    print(f"{'stories':>8} {'sprints':>8} " + " ".join(f"{f'{trials:,} trials':>15}" for trials in (10_000, 100_000, 1_000_000)))
+    for stories in (20, 100, 500):
+        points, sprint, capacity = synthetic_plan(stories)
+        cells = []
+        for trials in (10_000, 100_000, 1_000_000):
+            started = time.perf_counter()
+            forecast = simulate_delivery(ratios, points, sprint, capacity, trials=trials)
+            forecast.to_dict('2025-01-06')
+            cells.append(f"{(time.perf_counter() - started) * 1000:>15.1f}")
+        print(f"{stories:>8} {len(capacity):>8} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Benchmark: critical-path computation on story dependency graphs, full build versus incremental update.
+Run from the repository root: python -m benchmarks.bench_dependency_graph
+"""
+
+import time
+
+import numpy as np
+
+from dependency_graph import DependencyGraph
+
+
+def synthetic_graph(count, edges_per_story=2, seed=11):
+    """Random DAG: every edge points from a lower to a higher story number"""
+    rng = np.random.default_rng(seed)
+    first = rng.integers(0, count, count * edges_per_story)
+    then = rng.integers(0, count, count * edges_per_story)
+    keep = first < then
+    return rng.integers(1, 10, count).astype(float), first[keep], then[keep]
+
+
+def main():
+    print("Critical path (ms): build = CSR + both passes; update = one story's duration changed")
+    print(f"{'stories':>8} {'edges':>8} {'build':>9} {'path':>8} {'update':>8}")
+    for count in (1000, 10000, 100000):
+        durations, before, after = synthetic_graph(count)
+        started = time.perf_counter()
+        graph = DependencyGraph(durations, before, after)
+        build = time.perf_counter() - started
+        started = time.perf_counter()
+        graph.critical_path()
+        path = time.perf_counter() - started
+
+        rng = np.random.default_rng(5)
+        stories = rng.integers(0, count, 20)
+        started = time.perf_counter()
+        for story in stories:
+            graph.update_duration(int(story), durations[story] + 1)
+        update = (time.perf_counter() - started) / len(stories)
+        print(f"{count:>8} {len(before):>8} {build * 1000:>9.1f} {path * 1000:>8.1f} {update * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the web app under concurrent load against a local fake LLM, plus micro-benchmarks of
+the estimator's hot paths over synthetic historical datasets of increasing size.
+Reports p50/p95/p99 latency, throughput and peak RSS as JSON for tracking regressions.
+Run from the repository root: python -m benchmarks.bench_end_to_end [--output results.json]
+
+The app and the fake LLM run in their own processes so the load generator does not share their
+interpreter, and every dataset size is measured in a fresh process so its peak RSS is its own.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.bench_section_parser import synthetic_response
+from benchmarks.bench_story_index import ACTIONS, CRITERIA, OBJECTS, ROLES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEPENDENCIES = ["Third-party OAuth service", "Email service", "Payment gateway", "Search cluster", "CDN"]
+RISKS = ["Integration complexities", "Performance under load", "Data migration", "Unclear requirements"]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def summarize(latencies, wall_seconds):
+    """Latency percentiles (ms) and throughput of one measured run"""
+    milliseconds = np.asarray(latencies, dtype=np.float64) * 1000
+    if not len(milliseconds):
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(milliseconds, [50, 95, 99]).tolist()
+    return {"count": len(milliseconds), "p50_ms": round(p50, 3), "p95_ms": round(p95, 3), "p99_ms": round(p99, 3),
+            "mean_ms": round(float(milliseconds.mean()), 3), "max_ms": round(float(milliseconds.max()), 3),
+            "throughput_per_s": round(len(milliseconds) / wall_seconds, 2) if wall_seconds > 0 else None}
+
+
+def time_calls(function, repeats):
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeats):
+        call_started = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def write_historical_data(path, count, seed=7):
+    """Stream count synthetic completed stories to path as NDJSON"""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        for number in range(1, count + 1):
+            f.write(json.dumps({
+                "Story_ID": f"US{number:07d}",
+                "User_Story_Description": f"As a {rng.choice(ROLES)}, I want to {rng.choice(ACTIONS)} "
+                                          f"{rng.choice(OBJECTS)} by {rng.choice(OBJECTS)}",
+                "Acceptance_Criteria": rng.sample(CRITERIA, 3),
+                "Team_Size": rng.randint(2, 9),
+                "Dependencies": [[rng.choice(DEPENDENCIES)]],
+                "Risks": [[rng.choice(RISKS)]],
+                "Actual_Story_Points": rng.choice([1, 2, 3, 5, 8, 13]),
+                "Actual_Hours": rng.choice([2, 4, 8, 12, 16, 24, 40])
+            }) + "\n")
+
+
+def sample_project(name, stories=8, seed=3):
+    rng = random.Random(seed)
+    return {
+        "project_name": name,
+        "description": "Synthetic benchmark project",
+        "total_team_size": 6,
+        "duration_weeks": 8,
+        "priority": "High",
+        "user_stories": [f"As a {rng.choice(ROLES)}, I want to {rng.choice(ACTIONS)} {rng.choice(OBJECTS)}"
+                         for _ in range(stories)],
+        "dependencies": ["1 -> 2", "2 -> 3", "Payment gateway"],
+        "risks": ["Third-party API changes"],
+        "team_skills": ["Python", "React"],
+        "tech_stack": ["Flask", "PostgreSQL"]
+    }
+
+
+# Micro-benchmarks: one dataset size per process
+
+def micro_case(stories, data_path, repeats):
+    """Time estimator construction and the hot paths over one synthetic dataset"""
+    os.environ['SPRINT_HISTORICAL_DATA'] = data_path
+    os.environ.setdefault('SPRINT_LLM_BASE_URL', 'http://127.0.0.1:9/v1')
+    from enhanced_estimator import EnhancedSprintEstimator
+
+    started = time.perf_counter()
+    estimator = EnhancedSprintEstimator()
+    load_seconds = time.perf_counter() - started
+    response = synthetic_response(6000)
+    analysis = estimator.parse_text_response(response)
+    project = sample_project("Micro", stories=20)
+
+    def spreadsheet():
+        filename = estimator.generate_sprint_spreadsheet(analysis, project)
+        if filename.startswith("Error"):
+            raise RuntimeError(filename)
+        os.remove(filename)
+
+    return {
+        "stories": stories,
+        "load_seconds": round(load_seconds, 3),
+        "analyze_historical_patterns": time_calls(estimator.analyze_historical_patterns, repeats),
+        "parse_text_response": time_calls(lambda: estimator.parse_text_response(response), repeats * 10),
+        "generate_sprint_spreadsheet": time_calls(spreadsheet, max(1, repeats // 4)),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def run_micro(sizes, repeats, workdir):
+    results = []
+    for stories in sizes:
+        data_path = os.path.join(workdir, f"historical_{stories}.ndjson")
+        write_historical_data(data_path, stories)
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_end_to_end', '--micro-case', str(stories), '--data', data_path,
+             '--repeats', str(repeats)],
+            cwd=workdir, env=dict(os.environ, PYTHONPATH=ROOT, SPRINT_STORY_STORE=os.path.join(workdir, 'stories.ndjson')),
+            capture_output=True, text=True)
+        os.remove(data_path)
+        if output.returncode != 0:
+            results.append({"stories": stories, "error": output.stderr.strip().splitlines()[-1:]})
+            print(f"{stories:>9} stories: failed", file=sys.stderr)
+            continue
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"{stories:>9} stories: load {result['load_seconds']:.2f}s, "
+              f"insights p50 {result['analyze_historical_patterns']['p50_ms']:.2f}ms, "
+              f"parse p50 {result['parse_text_response']['p50_ms']:.3f}ms, "
+              f"spreadsheet p50 {result['generate_sprint_spreadsheet']['p50_ms']:.1f}ms, "
+              f"peak RSS {result['peak_rss_mb']:.0f}MB", file=sys.stderr)
+    return results
+
+
+# Load test: the app and the fake LLM in their own processes
+
+def serve_app(port):
+    """Serve the app with a threaded server until SIGTERM, then print its peak RSS"""
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    server.serve_forever()
+    print(json.dumps({"peak_rss_mb": peak_rss_mb()}), flush=True)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_until(url, timeout=120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout:.0f}s")
+
+
+def request(base, method, path, payload=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    call = urllib.request.Request(base + path, data=data, method=method,
+                                  headers={'Content-Type': 'application/json'} if data else {})
+    with urllib.request.urlopen(call, timeout=600) as response:
+        response.read()
+        return response.status
+
+
+def load_route(base, method, path, payload_for, concurrency, count):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def one(number):
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            request(base, method, path, payload_for(number) if payload_for else None)
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            with lock:
+                errors += 1
+            return
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(count)))
+    return dict(summarize(latencies, time.perf_counter() - started), errors=errors)
+
+
+def run_load(concurrency_levels, count, latency, response_chars, workdir):
+    llm_port, app_port = free_port(), free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    fake_llm = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.fake_llm', '--port', str(llm_port), '--latency', str(latency),
+         '--response-chars', str(response_chars)], cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    app_env = dict(env, SPRINT_LLM_BASE_URL=f"http://127.0.0.1:{llm_port}/v1",
+                   SPRINT_HISTORICAL_DATA=os.path.join(ROOT, 'historical_sprint_data.json'),
+                   SPRINT_STORY_STORE=os.path.join(workdir, 'stories.ndjson'))
+    app = subprocess.Popen([sys.executable, '-m', 'benchmarks.bench_end_to_end', '--serve', str(app_port)],
+                           cwd=workdir, env=app_env, stdout=subprocess.PIPE, text=True)
+    base = f"http://127.0.0.1:{app_port}"
+    results = []
+    try:
+        wait_until(f"{base}/readyz")
+        routes = [
+            ("GET", "/", None),
+            ("GET", "/historical-insights", None),
+            # A new project name per request, so every estimate misses the response cache
+            ("POST", "/api/estimate", lambda number: sample_project(f"Load {time.time_ns()} {number}"))
+        ]
+        for method, path, payload_for in routes:
+            for concurrency in concurrency_levels:
+                result = dict(load_route(base, method, path, payload_for, concurrency, count),
+                              route=f"{method} {path}", concurrency=concurrency)
+                results.append(result)
+                print(f"{result['route']:<26} c={concurrency:<4} p50 {result.get('p50_ms', 0):9.1f}ms "
+                      f"p95 {result.get('p95_ms', 0):9.1f}ms p99 {result.get('p99_ms', 0):9.1f}ms "
+                      f"{result.get('throughput_per_s') or 0:8.1f}/s errors {result['errors']}", file=sys.stderr)
+    finally:
+        app.send_signal(signal.SIGTERM)
+        output, _ = app.communicate(timeout=60)
+        fake_llm.terminate()
+        fake_llm.wait(timeout=10)
+    lines = output.strip().splitlines()
+    app_rss = json.loads(lines[-1])['peak_rss_mb'] if lines else None
+    return results, app_rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end and micro benchmarks; prints JSON results")
+    parser.add_argument('--output', help='write the JSON results here instead of stdout')
+    parser.add_argument('--sizes', default='1000,10000,100000,1000000', help='historical dataset sizes for the micro-benchmarks')
+    parser.add_argument('--repeats', type=int, default=20, help='timed calls per micro-benchmark')
+    parser.add_argument('--concurrency', default='1,8,32', help='concurrent clients per load level')
+    parser.add_argument('--requests', type=int, default=64, help='requests per route and load level')
+    parser.add_argument('--latency', type=float, default=0.2, help='fake LLM seconds per reply')
+    parser.add_argument('--response-chars', type=int, default=6000, help='fake LLM reply size')
+    parser.add_argument('--skip-load', action='store_true')
+    parser.add_argument('--skip-micro', action='store_true')
+    parser.add_argument('--micro-case', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--data', help=argparse.SUPPRESS)
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve_app(args.serve)
+        return
+    if args.micro_case is not None:
+        print(json.dumps(micro_case(args.micro_case, args.data, args.repeats)))
+        return
+
+    report = {
+        "benchmark": "end_to_end",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {"latency": args.latency, "response_chars": args.response_chars, "requests": args.requests}
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        if not args.skip_load:
+            report["load"], report["app_peak_rss_mb"] = run_load(
+                [int(level) for level in args.concurrency.split(',')], args.requests, args.latency,
+                args.response_chars, workdir)
+        if not args.skip_micro:
+            report["micro"] = run_micro([int(size) for size in args.sizes.split(',')], args.repeats, workdir)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: six-sheet sprint plan workbook, DataFrame path versus streaming writers.
+Run from the repository root: python -m benchmarks.bench_excel_writer
+"""
+
+import io
+import time
+from datetime import date, timedelta
+
+from excel_writer import write_workbook, xlsxwriter
+
+
+def synthetic_report(sprints):
+    """Report sheets shaped like build_report_sheets output for a project with the given sprint count"""
+    start = date(2025, 1, 6)
+    sprint_rows = [{
+        'Sprint Number': number, 'Sprint Goal': f'Sprint {number} deliverables', 'Duration (weeks)': 2,
+        'Stories Count': 4, 'Estimated Story Points': 21, 'Estimated Hours': 84.0, 'Team Capacity': 400,
+        'Capacity Utilization': '21.0%', 'Key Deliverables': f'Features for Sprint {number}',
+        'Dependencies': 'API integrations, Testing'
+    } for number in range(1, sprints + 1)]
+    bottleneck_rows = [{
+        'Bottleneck Type': 'Resource Constraint', 'Description': f'Limited backend developers ({number})',
+        'Impact Level': 'Medium', 'Affected Sprints': f'{number}-{number + 2}',
+        'Mitigation Strategy': 'Cross-training, External consultant', 'Timeline Impact': '+1 week',
+        'Owner': 'Project Manager'
+    } for number in range(1, max(3, sprints // 4) + 1)]
+    resource_rows = [dict({'Role': f'Engineer {number}', 'Allocated FTE': 1},
+                          **{f'Sprint {sprint} Utilization': '90%' for sprint in range(1, 5)},
+                          **{'Skills Required': 'Python, React', 'Skill Gap': 'None', 'Peak Load Period': 'Sprint 2',
+                             'Backup Resource': 'Cross-trained team member'})
+                     for number in range(1, max(5, sprints // 2) + 1)]
+    risk_rows = [{
+        'Risk Category': 'Technical', 'Risk Description': f'Integration complexity {number}', 'Probability': 'Medium',
+        'Impact': 'High', 'Risk Score': 6, 'Mitigation Plan': 'Early prototyping', 'Contingency Buffer': '5 days',
+        'Owner': 'Technical Lead', 'Status': 'Active'
+    } for number in range(1, max(3, sprints // 4) + 1)]
+    timeline_rows = [{
+        'Sprint': number, 'Start Date': str(start + timedelta(weeks=2 * (number - 1))),
+        'End Date': str(start + timedelta(weeks=2 * number)), 'Milestone': f'Sprint {number} Demo',
+        'Deliverables': f'Sprint {number} features completed', 'Dependencies': 'Previous sprint completion',
+        'Buffer Days': 2, 'Critical Path': 'Yes' if number % 2 == 0 else 'No',
+        'Stakeholder Review': str(start + timedelta(weeks=2 * number))
+    } for number in range(1, sprints + 1)]
+    overview = [{'Project Name': 'Benchmark', 'Description': 'Synthetic project', 'Team Size': 10,
+                 'Duration (weeks)': sprints * 2, 'Priority': 'High', 'Generated On': '2025-01-06 09:00:00'}]
+    return [('Project Overview', overview), ('Sprint Breakdown', sprint_rows), ('Bottleneck Analysis', bottleneck_rows),
+            ('Resource Planning', resource_rows), ('Risk Assessment', risk_rows), ('Timeline & Milestones', timeline_rows)]
+
+
+def measure(sheets, engine, repeats):
+    best = float('inf')
+    size = 0
+    for _ in range(repeats):
+        buffer = io.BytesIO()
+        started = time.perf_counter()
+        write_workbook(sheets, buffer, engine)
+        best = min(best, time.perf_counter() - started)
+        size = buffer.tell()
+    return best, size
+
+
+def main():
+    engines = ["pandas", "openpyxl"] + (["xlsxwriter"] if xlsxwriter is not None else [])
+    print("Sprint plan workbook write time (best of runs, ms) and size (KB)")
+    print(f"{'sprints':>8} " + " ".join(f"{engine + ' ms':>14} {'KB':>6}" for engine in engines))
+    for sprints in (4, 26, 260, 2600):
+        sheets = synthetic_report(sprints)
+        repeats = 5 if sprints < 1000 else 2
+        cells = []
+        for engine in engines:
+            seconds, size = measure(sheets, engine, repeats)
+            cells.append(f"{seconds * 1000:>14.1f} {size / 1024:>6.0f}")
+        print(f"{sprints:>8} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
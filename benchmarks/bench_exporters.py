@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the same sprint plan report through each registered exporter.
+Run from the repository root: python -m benchmarks.bench_exporters
+"""
+
+import time
+
+from benchmarks.bench_excel_writer import synthetic_report
+from report_exporters import EXPORTERS
+
+
+def measure(sheets, exporter, repeats):
+    best = float('inf')
+    size = 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        data = exporter.export(sheets)
+        best = min(best, time.perf_counter() - started)
+        size = len(data)
+    return best, size
+
+
+def available_exporters(sheets):
+    exporters = []
+    for name, exporter in EXPORTERS.items():
+        try:
+            exporter.export(sheets)
+        except ImportError as e:
+            print(f"Skipping {name}: {e}")
+            continue
+        exporters.append((name, exporter))
+    return exporters
+
+
+def main():
+    exporters = available_exporters(synthetic_report(4))
+    print("Report export time (best of runs, ms) and size (KB)")
+    print(f"{'sprints':>8} " + " ".join(f"{name + ' ms':>12} {'KB':>6}" for name, _ in exporters))
+    for sprints in (4, 26, 260, 2600):
+        sheets = synthetic_report(sprints)
+        repeats = 5 if sprints < 1000 else 2
+        cells = []
+        for _, exporter in exporters:
+            seconds, size = measure(sheets, exporter, repeats)
+            cells.append(f"{seconds * 1000:>12.1f} {size / 1024:>6.0f}")
+        print(f"{sprints:>8} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: single-pass section parser vs the original repeated str.find scanning.
+Run from the repository root: python -m benchmarks.bench_section_parser
+"""
+
+import random
+import timeit
+
+from section_parser import SECTION_HEADINGS, parse_sections
+
+
+def legacy_extract_section(content, section_name):
+    """The original extract_section: find the heading, then the next '**'"""
+    start_idx = content.find(section_name)
+    if start_idx == -1:
+        return "Section not found"
+    next_section_idx = content.find("**", start_idx + len(section_name))
+    if next_section_idx == -1:
+        return content[start_idx:]
+    return content[start_idx:next_section_idx]
+
+
+def legacy_parse(content):
+    return {key: legacy_extract_section(content, heading) for key, heading in SECTION_HEADINGS}
+
+
+def synthetic_response(approx_chars, seed=42):
+    """Build a markdown-style analysis response of roughly approx_chars characters"""
+    rng = random.Random(seed)
+    words = ["sprint", "capacity", "backend", "integration", "story", "points", "hours", "risk",
+             "mitigation", "velocity", "deploy", "testing", "review", "stakeholder", "buffer"]
+    per_section = max(1, approx_chars // len(SECTION_HEADINGS))
+    parts = ["Here is the complete analysis.\n"]
+    for number, (_, heading) in enumerate(SECTION_HEADINGS, 1):
+        parts.append(f"\n**{number}. {heading}**\n")
+        size = 0
+        while size < per_section:
+            line = f"- {' '.join(rng.choice(words) for _ in range(12))}: {rng.randint(1, 13)} points, {rng.randint(2, 40)} hours\n"
+            parts.append(line)
+            size += len(line)
+    return "".join(parts)
+
+
+def recovered_chars(sections):
+    return sum(len(text) for text in sections.values() if text != "Section not found")
+
+
+def main():
+    print("Section parser benchmark (best of 5, milliseconds per parse; chars = section text recovered)")
+    print(f"{'size (chars)':>14} {'legacy ms':>10} {'legacy chars':>13} {'single-pass ms':>15} {'single-pass chars':>18}")
+    for size in (4_000, 40_000, 400_000, 4_000_000):
+        content = synthetic_response(size)
+        number = max(1, 400_000 // size)
+        legacy = min(timeit.repeat(lambda: legacy_parse(content), number=number, repeat=5)) / number
+        single = min(timeit.repeat(lambda: parse_sections(content), number=number, repeat=5)) / number
+        print(f"{len(content):>14,} {legacy * 1000:>10.3f} {recovered_chars(legacy_parse(content)):>13,} "
+              f"{single * 1000:>15.3f} {recovered_chars(parse_sections(content)):>18,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the Sprint Breakdown sheet as the report builds it (StorySchedule.plan and
+StorySchedule.breakdown_rows), scaling sprint count x team count.
+Run from the repository root: python -m benchmarks.bench_sprint_planner
+"""
+
+import time
+from datetime import datetime
+
+import numpy as np
+
+from story_scheduler import schedule_stories
+
+
+def schedule(sprints, teams, stories_per_sprint=3, seed=7):
+    """A backlog of stories_per_sprint stories per planned sprint, without dependencies, over teams of 4-8"""
+    count = sprints * stories_per_sprint
+    hours = np.random.default_rng(seed).integers(4, 41, count).astype(float)
+    empty = np.empty(0, dtype=np.int64)
+    return schedule_stories([f"Story {number}" for number in range(1, count + 1)], hours / 4, hours,
+                            [f"Team {number}" for number in range(1, teams + 1)],
+                            [4 + number % 5 for number in range(1, teams + 1)], empty, empty, planned_sprints=sprints)
+
+
+def best_of(function, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    start = datetime(2025, 1, 6)
+    print("Sprint breakdown generation (best of runs, ms)")
+    print(f"{'sprints':>8} {'teams':>6} {'rows':>9} {'schedule':>10} {'plan only':>10} {'plan+rows':>10}")
+    for sprints in (26, 260, 2600):
+        for teams in (1, 10, 100):
+            repeats = 5 if sprints * teams <= 26000 else 2
+            scheduled = schedule(sprints, teams)
+            scheduling = best_of(lambda: schedule(sprints, teams), repeats)
+            plan = best_of(lambda: scheduled.plan(start).utilization_labels(), repeats)
+            rows = best_of(lambda: scheduled.breakdown_rows(start), repeats)
+            print(f"{sprints:>8} {teams:>6} {scheduled.sprint_count * teams:>9} {scheduling * 1000:>10.1f} "
+                  f"{plan * 1000:>10.1f} {rows * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
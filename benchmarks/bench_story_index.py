@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark: similar-story retrieval latency across index sizes.
+Run from the repository root: python -m benchmarks.bench_story_index
+"""
+
+import random
+import tempfile
+import time
+
+from story_index import StoryIndex
+
+ROLES = ["shopper", "admin", "vendor", "customer", "user", "support agent", "analyst", "manager"]
+ACTIONS = ["search", "filter", "export", "update", "delete", "review", "approve", "track", "share", "import",
+           "schedule", "archive", "compare", "subscribe", "configure", "audit"]
+OBJECTS = ["products", "orders", "invoices", "user roles", "inventory", "reports", "notifications", "payments",
+           "wishlists", "shipments", "discounts", "profiles", "dashboards", "tickets", "reviews", "catalogs"]
+CRITERIA = ["Input validation", "Error handling", "Pagination", "Audit logging", "Email verification",
+            "UI responsiveness", "Role checks", "CSV export", "Retry on failure", "Caching"]
+
+
+def synthetic_stories(count, seed=7):
+    rng = random.Random(seed)
+    return [{
+        "User_Story_Description": f"As a {rng.choice(ROLES)}, I want to {rng.choice(ACTIONS)} {rng.choice(OBJECTS)} "
+                                  f"by {rng.choice(OBJECTS)}",
+        "Acceptance_Criteria": rng.sample(CRITERIA, 3),
+        "Actual_Story_Points": rng.choice([1, 2, 3, 5, 8, 13]),
+        "Actual_Hours": rng.choice([2, 4, 8, 12, 16, 24])
+    } for _ in range(count)]
+
+
+def main():
+    queries = [story["User_Story_Description"] for story in synthetic_stories(200, seed=99)]
+    print("Similar-story retrieval (top-3, per story)")
+    print(f"{'stories':>10} {'build s':>9} {'load ms':>9} {'search us':>10}")
+    for count in (1_000, 10_000, 100_000, 250_000):
+        records = synthetic_stories(count)
+        started = time.perf_counter()
+        index = StoryIndex.build(records)
+        build = time.perf_counter() - started
+        with tempfile.TemporaryDirectory() as directory:
+            index.save(directory)
+            started = time.perf_counter()
+            index = StoryIndex.load(directory)
+            load = time.perf_counter() - started
+            index.search(queries[:5])
+            started = time.perf_counter()
+            for query in queries:
+                index.search([query], k=3)
+            search = (time.perf_counter() - started) / len(queries)
+        print(f"{count:>10,} {build:>9.2f} {load * 1000:>9.2f} {search * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
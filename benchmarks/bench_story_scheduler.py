@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Benchmark: capacity-constrained story scheduling with dependency chains.
+Run from the repository root: python -m benchmarks.bench_story_scheduler
+"""
+
+import time
+
+import numpy as np
+
+from story_scheduler import parse_story_dependencies, schedule_stories
+
+
+def synthetic_backlog(count, seed=7):
+    """Stories with 4-60 hour estimates, each depending on up to two earlier stories"""
+    rng = np.random.default_rng(seed)
+    hours = rng.integers(4, 61, count).astype(float)
+    dependencies = [f"{first + 1} -> {then + 1}" for then in range(1, count)
+                    for first in rng.choice(then, size=min(then, rng.integers(0, 3)), replace=False)]
+    return [f"Story {number}" for number in range(1, count + 1)], hours / 4, hours, dependencies
+
+
+def main():
+    print("Story scheduling (best of 3, ms)")
+    print(f"{'stories':>8} {'teams':>6} {'edges':>7} {'parse':>8} {'schedule':>9} {'sprints':>8}")
+    for count in (100, 1000, 5000, 20000):
+        stories, points, hours, dependencies = synthetic_backlog(count)
+        for teams in (1, 10):
+            parse = schedule = float('inf')
+            for _ in range(3):
+                started = time.perf_counter()
+                before, after, external = parse_story_dependencies(stories, dependencies)
+                parse = min(parse, time.perf_counter() - started)
+                started = time.perf_counter()
+                result = schedule_stories(stories, points, hours, [f"Team {number}" for number in range(teams)],
+                                          [6] * teams, before, after, planned_sprints=26)
+                schedule = min(schedule, time.perf_counter() - started)
+            print(f"{count:>8} {teams:>6} {len(before):>7} {parse * 1000:>8.1f} {schedule * 1000:>9.1f} {result.sprint_count:>8}")
+
+
+if __name__ == "__main__":
+    main()
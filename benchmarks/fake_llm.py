@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stub of /v1/chat/completions for benchmarks and tests.
+Replies after a configurable latency with a synthetic analysis of a configurable size, streamed
+as server-sent events when asked, or as a schema-valid tool call for structured output.
+Run from the repository root: python -m benchmarks.fake_llm --port 8089 --latency 0.5
+then start the app with SPRINT_LLM_BASE_URL=http://127.0.0.1:8089/v1.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.bench_section_parser import synthetic_response
+
+
+def structured_analysis(sprints=4):
+    """Arguments of a submit_sprint_plan call that pass validate_analysis"""
+    return {
+        "project_overview": "Synthetic project overview.",
+        "sprints": [{"number": number, "goal": f"Sprint {number} goal", "duration_weeks": 2,
+                     "stories": [{"title": f"Story {number}.{story}", "story_points": 5, "hours": 20}
+                                 for story in range(1, 4)]} for number in range(1, sprints + 1)],
+        "bottlenecks": [{"type": "Technical", "description": "Shared test environment", "impact": "Medium",
+                         "mitigation": "Book environment slots"}],
+        "risks": [{"category": "Integration", "description": "Third-party API changes", "probability": "Medium",
+                   "impact": "High", "mitigation": "Contract tests"}],
+        "milestones": [{"sprint": sprints, "name": "Release"}]
+    }
+
+
+class FakeLLMServer:
+    """Threaded stub server; use as a context manager or call start() and stop()"""
+
+    def __init__(self, latency=0.2, jitter=0.0, response_chars=6000, chunk_chars=200, chunk_delay=0.0,
+                 host='127.0.0.1', port=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.chunk_chars = chunk_chars
+        self.chunk_delay = chunk_delay
+        self.content = synthetic_response(response_chars)
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="fake-llm")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _delay(self):
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type='application/json'):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    self._send(404, b'{"error": {"message": "not found"}}')
+                    return
+                with server._lock:
+                    server.requests += 1
+                time.sleep(server._delay())
+                model = body.get('model', 'fake')
+                if body.get('stream'):
+                    self._stream(model)
+                    return
+                if body.get('tools'):
+                    name = body['tools'][0]['function']['name']
+                    message = {"role": "assistant", "content": None, "tool_calls": [{
+                        "id": "call_0", "type": "function",
+                        "function": {"name": name, "arguments": json.dumps(structured_analysis())}}]}
+                else:
+                    message = {"role": "assistant", "content": server.content}
+                self._send(200, json.dumps({
+                    "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+                }).encode())
+
+            def _stream(self, model):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                content = server.content
+                for offset in range(0, len(content), server.chunk_chars):
+                    chunk = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                             "model": model, "choices": [{"index": 0, "finish_reason": None,
+                                                          "delta": {"content": content[offset:offset + server.chunk_chars]}}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                    if server.chunk_delay:
+                        time.sleep(server.chunk_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds before each reply')
+    parser.add_argument('--jitter', type=float, default=0.0, help='uniform +/- seconds added to the latency')
+    parser.add_argument('--response-chars', type=int, default=6000, help='size of each text reply')
+    parser.add_argument('--chunk-chars', type=int, default=200, help='characters per streamed chunk')
+    parser.add_argument('--chunk-delay', type=float, default=0.0, help='seconds between streamed chunks')
+    args = parser.parse_args()
+    server = FakeLLMServer(args.latency, args.jitter, args.response_chars, args.chunk_chars, args.chunk_delay,
+                           args.host, args.port)
+    print(f"Fake LLM listening on {server.base_url}", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
-import pandas as pd
+from story_columns import load_columns
 
-def load_data(json_file='historical_sprint_data.json'):
-    data = pd.read_json(json_file)
+def load_data(json_file='historical_sprint_data.json', cache_dir=None):
+    """Stream a JSON array or NDJSON file into a DataFrame, via a columnar cache when cache_dir is given"""
+    data = load_columns(json_file, cache_dir).to_dataframe()
     return data
@@ -0,0 +1,194 @@
+"""
+Monte Carlo delivery-date forecast from historical actuals.
+Each trial redraws every story's hours as its story points times an hours-per-point ratio sampled
+from completed historical stories, optionally only those from similarly sized teams or sharing the
+project's risk categories. A sprint's total is the sum of its stories' hours, so its distribution is
+the convolution of theirs, computed once per sprint with FFTs; every trial then draws all sprint
+totals as whole arrays and one pass over the sprints carries unfinished work into the next, with no
+Python loop per trial or per story. Capacity is pooled across teams, so any team can pick up spill-over.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sprint_planner import date_strings
+
+PERCENTILES = (50, 80, 95)
+MIN_SAMPLES = 30
+_WORD = re.compile(r"[a-z][a-z0-9-]{3,}")
+
+
+def _words(text: str) -> set:
+    return set(_WORD.findall(str(text).lower()))
+
+
+def matching_rows(columns, kind: str, labels: Sequence[str]) -> np.ndarray:
+    """Rows with a `kind` label sharing a word of four or more letters with any of labels"""
+    wanted = set().union(*(_words(label) for label in labels)) if labels else set()
+    categories = getattr(columns, f"{kind}_categories").to_list()
+    matching = np.array([bool(_words(category) & wanted) for category in categories], dtype=bool)
+    codes = getattr(columns, f"{kind}_codes")
+    offsets = getattr(columns, f"{kind}_offsets")
+    rows = np.repeat(np.arange(len(columns)), np.diff(offsets))
+    hits = matching[codes] if len(matching) else np.zeros(len(codes), dtype=bool)
+    return np.bincount(rows, weights=hits, minlength=len(columns)) > 0
+
+
+def historical_ratios(segments: Sequence[Any], team_sizes: Optional[Sequence[int]] = None,
+                      risks: Optional[Sequence[str]] = None, min_samples: int = MIN_SAMPLES) -> Tuple[np.ndarray, List[str]]:
+    """Hours per point of completed stories and the conditions applied to select them.
+
+    segments are the StoryColumns holding the history (the loaded data, then stories added since).
+    Stories are narrowed to teams within one person of the project's team sizes and to stories
+    sharing a risk category with the project, dropping whichever condition leaves fewer than
+    min_samples stories (risks first, then team size).
+    """
+    points = np.concatenate([np.asarray(columns.story_points, dtype=np.float64) for columns in segments])
+    hours = np.concatenate([np.asarray(columns.hours, dtype=np.float64) for columns in segments])
+    valid = (points > 0) & (hours > 0)
+    conditions = []
+    if team_sizes is not None and len(team_sizes):
+        low, high = max(1, min(team_sizes) - 1), max(team_sizes) + 1
+        size = np.concatenate([np.asarray(columns.team_size) for columns in segments])
+        conditions.append((f"team size {low}-{high}", (size >= low) & (size <= high)))
+    risks = [risk for risk in (risks or []) if isinstance(risk, str) and risk.strip()]
+    if risks:
+        conditions.append(("risks: " + ", ".join(risks), np.concatenate([matching_rows(columns, 'risks', risks) for columns in segments])))
+    for count in range(len(conditions), 0, -1):
+        selected = valid.copy()
+        for _, mask in conditions[:count]:
+            selected &= mask
+        if selected.sum() >= min_samples:
+            return hours[selected] / points[selected], [name for name, _ in conditions[:count]]
+    return hours[valid] / points[valid], []
+
+
+class DeliveryForecast:
+    """Completion-time distribution and per-sprint overrun probabilities of a sprint plan"""
+
+    def __init__(self, trials: int, finish: np.ndarray, overrun: np.ndarray, slip: np.ndarray, ratios: np.ndarray,
+                 sprint_days: int, deadline_sprints: float, conditioned_on: List[str]):
+        self.trials = trials
+        # Completion of each trial in sprints from the project start
+        self.finish = finish
+        # Share of trials in which each sprint could not finish its own and carried-over work
+        self.sprint_overrun = overrun
+        # Percentiles (rows, as PERCENTILES) of the sprints needed after each sprint to clear its backlog
+        self.slip = slip
+        self.ratios = ratios
+        self.sprint_days = sprint_days
+        self.deadline_sprints = deadline_sprints
+        self.conditioned_on = conditioned_on
+
+    def completion_days(self, percentile: float) -> float:
+        """Calendar days from the start within which the project finishes in percentile % of trials"""
+        return float(np.percentile(self.finish, percentile)) * self.sprint_days
+
+    def buffer_days(self, percentile: int = 80) -> np.ndarray:
+        """Calendar days of buffer after each sprint covering its spill-over in percentile % of trials"""
+        return np.ceil(self.slip[PERCENTILES.index(percentile)] * self.sprint_days - 1e-9).astype(np.int64)
+
+    @property
+    def on_time_probability(self) -> float:
+        return float((self.finish <= self.deadline_sprints + 1e-9).mean()) if self.trials else 0.0
+
+    def to_dict(self, start) -> Dict[str, Any]:
+        start = np.datetime64(start, 'D')
+        completion = {}
+        for percentile in PERCENTILES:
+            days = self.completion_days(percentile)
+            completion[f"P{percentile}"] = {
+                "date": str(date_strings(start + np.timedelta64(int(np.ceil(days - 1e-9)), 'D'))),
+                "days": round(days, 1), "sprints": round(days / self.sprint_days, 2)
+            }
+        deadline = start + np.timedelta64(int(round(self.deadline_sprints * self.sprint_days)), 'D')
+        buffers = self.buffer_days(80).tolist()
+        return {
+            "trials": self.trials,
+            "historical_samples": len(self.ratios),
+            "conditioned_on": self.conditioned_on,
+            "hours_per_point": {
+                "mean": round(float(self.ratios.mean()), 2) if len(self.ratios) else None,
+                "p50": round(float(np.percentile(self.ratios, 50)), 2) if len(self.ratios) else None,
+                "p90": round(float(np.percentile(self.ratios, 90)), 2) if len(self.ratios) else None
+            },
+            "completion": completion,
+            "deadline": {"date": str(date_strings(deadline)), "on_time_probability": round(self.on_time_probability, 3)},
+            "sprints": [{"sprint": number, "overrun_probability": round(probability, 3), "buffer_days_p80": buffer}
+                        for number, (probability, buffer) in enumerate(zip(self.sprint_overrun.tolist(), buffers), start=1)]
+        }
+
+
+def _sprint_quantiles(ratio_bins: Dict[Any, np.ndarray], points: np.ndarray, step: float, grid: int,
+                      quantiles: int) -> np.ndarray:
+    """Hours of summed stories with the given points at quantiles + 1 evenly spaced probabilities.
+    Each story's hours are points x a sampled ratio, so the sum's distribution is the convolution
+    of the per-story distributions: a product of their spectra."""
+    values, counts = np.unique(points[points > 0], return_counts=True)
+    spectrum = np.ones(grid // 2 + 1, dtype=np.complex128)
+    for value, count in zip(values.tolist(), counts.tolist()):
+        bins = ratio_bins.get(value)
+        if bins is None:
+            bins = ratio_bins[value] = np.fft.rfft(np.bincount(np.rint(value * ratio_bins['ratios'] / step).astype(np.int64),
+                                                               minlength=grid)[:grid] / len(ratio_bins['ratios']))
+        spectrum *= bins ** count
+    cdf = np.cumsum(np.maximum(np.fft.irfft(spectrum, grid), 0.0))
+    # The end points stay clear of rounding noise in the first and last bins
+    probabilities = np.clip(np.linspace(0.0, 1.0, quantiles + 1), 1e-9, 1.0 - 1e-9)
+    return np.searchsorted(cdf, probabilities * cdf[-1]) * step
+
+
+def simulate_delivery(ratios: np.ndarray, story_points: Sequence[float], story_sprint: Sequence[int],
+                      sprint_capacity: Sequence[float], sprint_days: int = 14, deadline_sprints: Optional[float] = None,
+                      trials: int = 100_000, seed: int = 0, grid: int = 1 << 15, quantiles: int = 1 << 12,
+                      conditioned_on: Optional[List[str]] = None) -> DeliveryForecast:
+    """Simulate trials completions of stories assigned to sprints with the given hour capacities.
+
+    Stories belong to one sprint each, so sprint totals are independent: every trial draws each
+    sprint's total from its distribution (on a grid of `grid` hour steps, sampled by interpolating
+    `quantiles` quantiles small enough to stay in cache), at a cost that does not grow with the
+    number of stories, and carries unfinished work into the next sprint.
+    """
+    ratios = np.asarray(ratios, dtype=np.float64)
+    points = np.asarray(story_points, dtype=np.float64)
+    story_sprint = np.asarray(story_sprint, dtype=np.int64)
+    capacity = np.maximum(np.asarray(sprint_capacity, dtype=np.float64), 1e-9)
+    sprints = len(capacity)
+    rng = np.random.default_rng(seed)
+    if len(ratios) and ratios.min() == ratios.max():
+        # Every story's hours are fixed, so each sprint's total is too: one "story" per sprint
+        points = np.bincount(story_sprint, weights=points, minlength=sprints)
+        story_sprint = np.arange(sprints)
+    # One hour step for every sprint, fine enough that the largest sprint total cannot wrap around the grid
+    sprint_points = np.bincount(story_sprint, weights=points, minlength=sprints)
+    sprint_stories = np.bincount(story_sprint, minlength=sprints)
+    step = max(float(sprint_points.max(initial=0.0)) * float(ratios.max(initial=0.0)), 1e-9) / (grid - 2 - int(sprint_stories.max(initial=0)))
+    ratio_bins: Dict[Any, np.ndarray] = {'ratios': ratios}
+    order = np.argsort(story_sprint, kind='stable')
+    bounds = np.concatenate(([0], np.cumsum(sprint_stories)))
+    # Work left over after the plan drains at the last sprint's capacity
+    drain = capacity[-1]
+
+    backlog = np.zeros(trials)
+    done = np.zeros(trials)
+    overrun = np.zeros(sprints)
+    slip = np.zeros((len(PERCENTILES), sprints))
+    for sprint in range(sprints):
+        work = backlog.copy()
+        sprint_story_points = points[order[bounds[sprint]:bounds[sprint + 1]]]
+        if sprint_story_points.any():
+            table = _sprint_quantiles(ratio_bins, sprint_story_points, step, grid, quantiles)
+            position = rng.random(trials) * quantiles
+            index = position.astype(np.int64)
+            work += table[index] + (position - index) * (table[index + 1] - table[index])
+        overrun[sprint] = np.count_nonzero(work > capacity[sprint]) / max(1, trials)
+        # A sprint with work finishes part-way through, or at its end when work is left over
+        done = np.where(work > 0, sprint + np.minimum(work, capacity[sprint]) / capacity[sprint], done)
+        backlog = np.maximum(work - capacity[sprint], 0.0)
+        if trials:
+            slip[:, sprint] = np.percentile(backlog / drain, PERCENTILES)
+    finish = np.where(backlog > 0, sprints + backlog / drain, done)
+    return DeliveryForecast(trials, finish, overrun, slip, ratios, sprint_days,
+                            sprints if deadline_sprints is None else deadline_sprints, conditioned_on or [])
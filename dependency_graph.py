@@ -0,0 +1,217 @@
+"""
+Dependency graph of user stories with critical-path timings.
+The DAG is stored as CSR adjacency arrays: the successors (and predecessors) of story k are
+successors[successor_offsets[k]:successor_offsets[k + 1]]. Earliest/latest start, slack and the
+critical path come from one forward and one backward pass in topological order, linear in stories
+plus dependencies. Changing one story's duration re-propagates only through the stories whose
+timings it can move.
+"""
+
+import heapq
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class DependencyCycleError(ValueError):
+    """The declared dependencies contain a cycle; cycle lists its stories in dependency order"""
+
+    def __init__(self, cycle: List[int]):
+        super().__init__(f"Dependency cycle between stories {' -> '.join(str(index + 1) for index in cycle + cycle[:1])}")
+        self.cycle = cycle
+
+
+def csr(keys: np.ndarray, values: np.ndarray, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Offsets and values grouped by key: the values of key k are values[offsets[k]:offsets[k + 1]]"""
+    keys = np.asarray(keys, dtype=np.int64)
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=count), out=offsets[1:])
+    return offsets, np.asarray(values, dtype=np.int32)[np.argsort(keys, kind='stable')]
+
+
+def topological_order(count: int, before: np.ndarray, after: np.ndarray, by_index: bool = False) -> Tuple[List[int], List[int]]:
+    """Stories in dependency order and the stories left over because they sit on or behind a cycle.
+    With by_index the lowest-numbered ready story always goes first (O(E + V log V)); otherwise the
+    order is first-in first-out and linear."""
+    offsets, successors = csr(before, after, count)
+    offsets, successors = offsets.tolist(), successors.tolist()
+    waiting = np.bincount(np.asarray(after, dtype=np.int64), minlength=count).tolist()
+    ready = [index for index in range(count) if waiting[index] == 0]
+    order = []
+    if by_index:
+        heapq.heapify(ready)
+        pop, push = heapq.heappop, heapq.heappush
+    else:
+        ready = deque(ready)
+        pop, push = deque.popleft, deque.append
+    while ready:
+        index = pop(ready)
+        order.append(index)
+        for then in successors[offsets[index]:offsets[index + 1]]:
+            waiting[then] -= 1
+            if waiting[then] == 0:
+                push(ready, then)
+    return order, [index for index in range(count) if waiting[index] > 0]
+
+
+class DependencyGraph:
+    """Story DAG as CSR arrays with earliest/latest start, slack and critical path"""
+
+    def __init__(self, durations: Sequence[float], before: Sequence[int], after: Sequence[int]):
+        self.count = len(durations)
+        before = np.asarray(before, dtype=np.int64)
+        after = np.asarray(after, dtype=np.int64)
+        self.successor_offsets, self.successors = csr(before, after, self.count)
+        self.predecessor_offsets, self.predecessors = csr(after, before, self.count)
+        # The passes walk plain lists: per-story NumPy calls would cost more than the work itself
+        self._successor_offsets = self.successor_offsets.tolist()
+        self._successors = self.successors.tolist()
+        self._predecessor_offsets = self.predecessor_offsets.tolist()
+        self._predecessors = self.predecessors.tolist()
+
+        order, blocked = topological_order(self.count, before, after)
+        if blocked:
+            raise DependencyCycleError(self._find_cycle(set(blocked)))
+        self.order = np.array(order, dtype=np.int64)
+        self.position = np.empty(self.count, dtype=np.int64)
+        self.position[self.order] = np.arange(self.count)
+
+        self._durations = [float(duration) for duration in durations]
+        self._earliest_start = [0.0] * self.count
+        self._earliest_finish = [0.0] * self.count
+        self._latest_start = [0.0] * self.count
+        self.project_duration = 0.0
+        self._forward(order)
+        self.project_duration = max(self._earliest_finish, default=0.0)
+        self._backward(order[::-1])
+
+    def _preceding(self, index: int) -> List[int]:
+        return self._predecessors[self._predecessor_offsets[index]:self._predecessor_offsets[index + 1]]
+
+    def _following(self, index: int) -> List[int]:
+        return self._successors[self._successor_offsets[index]:self._successor_offsets[index + 1]]
+
+    def _find_cycle(self, blocked: set) -> List[int]:
+        # Every blocked story waits for a blocked predecessor, so walking back must revisit one
+        index = min(blocked)
+        seen: Dict[int, int] = {}
+        path = []
+        while index not in seen:
+            seen[index] = len(path)
+            path.append(index)
+            index = next(first for first in self._preceding(index) if first in blocked)
+        return path[seen[index]:][::-1]
+
+    def _forward(self, indices: List[int]):
+        earliest_finish = self._earliest_finish
+        for index in indices:
+            start = max([earliest_finish[first] for first in self._preceding(index)], default=0.0)
+            self._earliest_start[index] = start
+            earliest_finish[index] = start + self._durations[index]
+
+    def _backward(self, indices: List[int]):
+        latest_start = self._latest_start
+        for index in indices:
+            finish = min([latest_start[then] for then in self._following(index)], default=self.project_duration)
+            latest_start[index] = finish - self._durations[index]
+
+    @property
+    def durations(self) -> np.ndarray:
+        return np.array(self._durations)
+
+    @property
+    def earliest_start(self) -> np.ndarray:
+        return np.array(self._earliest_start)
+
+    @property
+    def earliest_finish(self) -> np.ndarray:
+        return np.array(self._earliest_finish)
+
+    @property
+    def latest_start(self) -> np.ndarray:
+        return np.array(self._latest_start)
+
+    @property
+    def slack(self) -> np.ndarray:
+        return np.maximum(self.latest_start - self.earliest_start, 0.0)
+
+    @property
+    def critical(self) -> np.ndarray:
+        """Stories with no slack: delaying any of them delays the project"""
+        return self.slack <= 1e-9 * max(1.0, self.project_duration)
+
+    def critical_path(self) -> List[int]:
+        """One chain of zero-slack stories from the project start to its end"""
+        critical = self.critical
+        tolerance = 1e-9 * max(1.0, self.project_duration)
+        index = next((index for index in self.order.tolist()
+                      if critical[index] and self._earliest_start[index] <= tolerance), None)
+        path = []
+        while index is not None:
+            path.append(index)
+            finish = self._earliest_finish[index]
+            index = min((then for then in self._following(index)
+                         if critical[then] and abs(self._earliest_start[then] - finish) <= tolerance), default=None)
+        return path
+
+    def update_duration(self, index: int, duration: float):
+        """Change one story's duration and re-propagate only the timings it can move"""
+        duration = float(duration)
+        if duration == self._durations[index]:
+            return
+        self._durations[index] = duration
+        # Forward: the story and the descendants whose earliest start moves, in topological order
+        position = self.position
+        pending = [(int(position[index]), index)]
+        queued = {index}
+        while pending:
+            _, current = heapq.heappop(pending)
+            queued.discard(current)
+            start = max([self._earliest_finish[first] for first in self._preceding(current)], default=0.0)
+            finish = start + self._durations[current]
+            if start == self._earliest_start[current] and finish == self._earliest_finish[current]:
+                continue
+            self._earliest_start[current], self._earliest_finish[current] = start, finish
+            for then in self._following(current):
+                if then not in queued:
+                    queued.add(then)
+                    heapq.heappush(pending, (int(position[then]), then))
+
+        project_duration = max(self._earliest_finish, default=0.0)
+        if project_duration != self.project_duration:
+            # A new project end moves every latest start
+            self.project_duration = project_duration
+            self._backward(self.order[::-1].tolist())
+            return
+        # Backward: the story and the ancestors whose latest start moves, in reverse topological order
+        pending = [(-int(position[index]), index)]
+        queued = {index}
+        while pending:
+            _, current = heapq.heappop(pending)
+            queued.discard(current)
+            finish = min([self._latest_start[then] for then in self._following(current)], default=self.project_duration)
+            start = finish - self._durations[current]
+            if start == self._latest_start[current] and current != index:
+                continue
+            self._latest_start[current] = start
+            for first in self._preceding(current):
+                if first not in queued:
+                    queued.add(first)
+                    heapq.heappush(pending, (-int(position[first]), first))
+
+    def to_dict(self, names: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Timings of every story and the critical path, by story name when given"""
+        names = list(names) if names is not None else [str(index + 1) for index in range(self.count)]
+        slack = self.slack.tolist()
+        critical = self.critical.tolist()
+        return {
+            "project_duration": self.project_duration,
+            "critical_path": [names[index] for index in self.critical_path()],
+            "stories": [{
+                "story": names[index], "duration": self._durations[index],
+                "earliest_start": self._earliest_start[index], "latest_start": self._latest_start[index],
+                "slack": slack[index], "critical": critical[index],
+                "depends_on": [names[first] for first in self._preceding(index)]
+            } for index in range(self.count)]
+        }
@@ -1,84 +1,365 @@
-from openai import OpenAI
+import contextvars
 import os
 import json
+import queue
+import threading
+import time
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Any
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from datetime import datetime
+from typing import Dict, List, Tuple, Any, Optional, Iterable, Iterator, Callable
 import numpy as np
 from dotenv import load_dotenv
-from prompt_templates import get_comprehensive_prompt, get_bottleneck_prompt, get_resource_optimization_prompt
+from prompt_templates import get_comprehensive_prompt, get_bottleneck_prompt, get_resource_optimization_prompt, get_structured_prompt, format_similar_stories
+from historical_stats import HistoricalStatsIndex
+from response_cache import ResponseCache, make_cache_key
+from single_flight import SingleFlight, canonical_key
+from rate_limiter import RateLimiter
+from llm_transport import get_transport
+from metrics import BYTE_BUCKETS, REGISTRY, timed, timer
+from local_estimator import LocalEstimator, story_text
+from story_index import StoryIndex
+from story_columns import StoryColumns, file_fingerprint, load_columns
+from story_store import StoryStore, validate_story
+from historical_snapshot import HistoricalSnapshot, FileWatcher
+from excel_writer import write_workbook
+from report_exporters import EXPORTERS, UNAVAILABLE_EXPORTERS, ReportExporter, XlsxExporter
+from sprint_planner import HOURS_PER_DAY, SPRINT_WEEKS, SprintPlan, date_strings, project_teams, rows_from_columns, sprint_dates, team_size_error
+from story_scheduler import StorySchedule, parse_story_dependencies, schedule_stories
+from dependency_graph import DependencyCycleError, DependencyGraph
+from delivery_forecast import DeliveryForecast, historical_ratios, simulate_delivery
+from artifact_store import ArtifactStore
+from analysis_schema import ANALYSIS_TOOL, validate_analysis
+from section_parser import IncrementalSectionDetector, parse_sections, parse_section_details, SECTION_HEADINGS, SECTION_NOT_FOUND
 
 load_dotenv()
 
+# Story size assumed when neither the story nor the historical data gives an estimate
+DEFAULT_STORY_POINTS = 5
+DEFAULT_STORY_HOURS = 20
+
 class EnhancedSprintEstimator:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.historical_data = self.load_historical_data()
+    def __init__(self, response_cache: Optional[ResponseCache] = None):
+        self.transport = get_transport()
+        self.response_cache = response_cache or ResponseCache.from_env()
+        self.single_flight = SingleFlight.from_env()
+        self.executor = ThreadPoolExecutor(max_workers=int(os.getenv("SPRINT_LLM_WORKERS", 6)), thread_name_prefix="llm")
+        self.call_timeout = float(os.getenv("SPRINT_LLM_TIMEOUT", 180))
+        self.structured_output = os.getenv("SPRINT_STRUCTURED_OUTPUT", "").lower() in ("1", "true", "yes")
+        self.excel_engine = os.getenv("SPRINT_EXCEL_ENGINE", "auto")
+        self.report_storage = os.getenv("SPRINT_REPORT_STORAGE", "memory").lower()
+        self.artifact_store = ArtifactStore.from_env()
+        self.exporters = dict(EXPORTERS, xlsx=XlsxExporter(self.excel_engine))
+        # Built-in formats missing an optional dependency, with what to install
+        self.unavailable_exporters = dict(UNAVAILABLE_EXPORTERS)
+        self.data_file = os.getenv("SPRINT_HISTORICAL_DATA", "historical_sprint_data.json")
+        self.local_confidence_threshold = float(os.getenv("SPRINT_LOCAL_CONFIDENCE", 0.6))
+        self.similar_stories_k = int(os.getenv("SPRINT_SIMILAR_STORIES", 3))
+        self.forecast_trials = int(os.getenv("SPRINT_FORECAST_TRIALS", 100_000))
+        self.story_store = StoryStore(os.getenv("SPRINT_STORY_STORE", "ingested_stories.ndjson"))
+        # Stories ingested by other worker processes, noticed when this process writes a batch
+        self.story_store.on_foreign = self.add_historical_stories
+        self.snapshot = self.load_snapshot() or self.with_stored_stories(HistoricalSnapshot.empty())
+        self._reload_lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        self.reload_watcher = FileWatcher(self.data_file, lambda: self.snapshot.fingerprint, self.reload_historical_data,
+                                          interval=float(os.getenv("SPRINT_RELOAD_INTERVAL", 0)) or 5.0)
+        self._store_fingerprint = file_fingerprint(self.story_store.path)
+        self.store_watcher = FileWatcher(self.story_store.path, lambda: self._store_fingerprint, self.sync_stored_stories,
+                                         interval=self.reload_watcher.interval)
+        self.start_reload_watcher()
+        REGISTRY.add_collector(self.collect_metrics)
+    
+    # The current snapshot's data and derived structures; methods that use several of them read
+    # self.snapshot once so a concurrent reload cannot mix two snapshots within one request
+    @property
+    def historical_data(self) -> pd.DataFrame:
+        return self.snapshot.data_frame
+    
+    @property
+    def historical_columns(self) -> List[StoryColumns]:
+        """Column segments of the historical data: as loaded, then stories added since"""
+        return self.snapshot.column_segments
+    
+    @property
+    def historical_stats(self) -> HistoricalStatsIndex:
+        return self.snapshot.stats
+    
+    @property
+    def local_estimator(self) -> LocalEstimator:
+        return self.snapshot.local_estimator
+    
+    @property
+    def story_index(self) -> StoryIndex:
+        return self.snapshot.story_index
         
     def load_historical_data(self) -> pd.DataFrame:
         """Load and prepare historical sprint data"""
         try:
-            with open('historical_sprint_data.json', 'r') as f:
-                data = json.load(f)
-            return pd.DataFrame(data)
+            return load_columns(self.data_file, os.getenv("SPRINT_COLUMN_CACHE_DIR")).to_dataframe()
         except Exception as e:
             print(f"Error loading historical data: {e}")
             return pd.DataFrame()
     
+    def load_snapshot(self) -> Optional[HistoricalSnapshot]:
+        """Load the historical data (JSON array or NDJSON) with its stats, local estimator and story index.
+        
+        SPRINT_COLUMN_CACHE_DIR and SPRINT_STORY_INDEX_DIR cache the columns and index as
+        memory-mappable files, rebuilt automatically when the data file changes.
+        """
+        try:
+            snapshot = HistoricalSnapshot.load(self.data_file, os.getenv("SPRINT_COLUMN_CACHE_DIR"), os.getenv("SPRINT_STORY_INDEX_DIR"))
+        except Exception as e:
+            print(f"Error loading historical data: {e}")
+            return None
+        return self.with_stored_stories(snapshot)
+    
+    def with_stored_stories(self, snapshot: HistoricalSnapshot) -> HistoricalSnapshot:
+        """Add the ingested stories from the story store that the data file does not already contain"""
+        story_ids = snapshot.story_ids()
+        self.story_store.add_known_ids(story_ids)
+        known = set(story_ids)
+        stored = [story for story in self.story_store.read_all() if str(story.get('Story_ID', '')) not in known]
+        if stored:
+            snapshot.add_stories(stored)
+        return snapshot
+    
+    def reload_historical_data(self) -> Dict[str, Any]:
+        """Build a snapshot from the current data file and swap it in; in-flight requests keep the old one"""
+        with self._reload_lock:
+            started = time.perf_counter()
+            snapshot = self.load_snapshot()
+            if snapshot is None:
+                return {"error": f"Could not load historical data from {self.data_file}", "snapshot": self.snapshot.summary()}
+            with self._swap_lock:
+                # Keep stories added at runtime, including those added while the snapshot was building
+                snapshot.carry_over(self.snapshot)
+                self.snapshot = snapshot
+            return {"reloaded": True, "load_seconds": round(time.perf_counter() - started, 3), "snapshot": snapshot.summary()}
+    
+    def reload_historical_data_async(self) -> bool:
+        """Start a background reload; False if one is already running"""
+        if self._reload_lock.locked():
+            return False
+        threading.Thread(target=self.reload_historical_data, name="historical-data-reload", daemon=True).start()
+        return True
+    
+    def start_reload_watcher(self):
+        """Poll the data file every SPRINT_RELOAD_INTERVAL seconds and reload when it changes (0 disables)"""
+        if float(os.getenv("SPRINT_RELOAD_INTERVAL", 0)) > 0:
+            self.reload_watcher.start()
+            self.store_watcher.start()
+    
+    def sync_stored_stories(self):
+        """Apply stories other worker processes appended to the story store"""
+        self._store_fingerprint = file_fingerprint(self.story_store.path)
+        self.add_historical_stories(self.story_store.catch_up())
+    
+    @timed("prompt")
     def generate_comprehensive_prompt(self, project_details: Dict[str, Any]) -> str:
         """Generate a comprehensive prompt for OpenAI analysis using advanced templates"""
         
-        # Analyze historical patterns
-        historical_insights = self.analyze_historical_patterns()
+        # Ground the prompt in the historical stories most similar to this project's stories
+        historical_insights = self.get_historical_context(project_details)
         
         # Use the advanced comprehensive prompt template
-        return get_comprehensive_prompt(project_details, historical_insights)
+        return get_comprehensive_prompt(project_details, historical_insights, self.describe_critical_path(project_details))
     
-    def analyze_historical_patterns(self) -> str:
+    def get_historical_context(self, project_details: Dict[str, Any]) -> str:
+        """Nearest historical examples for each user story, or the global summary when there are none"""
+        stories = [story for story in project_details.get('user_stories', []) if isinstance(story, str) and story.strip()]
+        snapshot = self.snapshot
+        if not stories or len(snapshot.story_index) == 0:
+            return self.analyze_historical_patterns(snapshot)
+        
+        matches = snapshot.story_index.search(stories, k=self.similar_stories_k)
+        return format_similar_stories(stories, matches, snapshot.stats.avg_hours_per_point, snapshot.stats.story_count)
+    
+    def analyze_historical_patterns(self, snapshot: Optional[HistoricalSnapshot] = None) -> str:
         """Analyze historical data to provide insights"""
-        if self.historical_data.empty:
+        stats = (snapshot or self.snapshot).stats
+        if stats.is_empty:
             return "No historical data available for analysis."
         
-        # Calculate key metrics
-        avg_velocity = self.historical_data['Actual_Story_Points'].mean()
-        avg_hours_per_point = self.historical_data['Actual_Hours'].mean() / self.historical_data['Actual_Story_Points'].mean()
+        # Metrics are maintained incrementally by the stats index
+        return stats.render_insights()
+    
+    def add_historical_stories(self, stories: List[Dict[str, Any]]):
+        """Append completed stories to the historical data and update statistics"""
+        if not stories:
+            return
+        with self._swap_lock:
+            self.snapshot.add_stories(stories)
+    
+    def ingest_stories(self, stories: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Durably record completed stories and fold them into the statistics, skipping known Story_IDs"""
+        if not isinstance(stories, list):
+            return {"error": "Expected a list of completed stories"}
+        valid, rejected = [], []
+        for position, story in enumerate(stories):
+            error = validate_story(story)
+            if error:
+                rejected.append({"index": position, "error": error})
+            else:
+                valid.append(story)
         
-        # Identify common bottlenecks
-        risk_analysis = self.historical_data['Risks'].explode().value_counts().head(5)
-        dependency_analysis = self.historical_data['Dependencies'].explode().value_counts().head(5)
+        result = self.story_store.append(valid)
+        if 'error' in result:
+            return result
+        self.add_historical_stories(result['accepted'])
+        return {
+            "accepted": len(result['accepted']),
+            "duplicates": result['duplicates'],
+            "rejected": rejected,
+            "story_count": self.snapshot.stats.story_count
+        }
+    
+    def project_stories(self, project_details: Dict[str, Any]) -> List[Any]:
+        """The project's user stories, without blank entries"""
+        return [story for story in project_details.get('user_stories', []) if story and (not isinstance(story, str) or story.strip())]
+    
+    def estimate_stories_locally(self, project_details: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Estimate each user story's points and hours from historical actuals, without the LLM"""
+        return self.local_estimator.estimate(self.project_stories(project_details), team_size=project_details.get('total_team_size'))
+    
+    def schedule_project(self, project_details: Dict[str, Any]) -> StorySchedule:
+        """Schedule the user stories into sprints under the teams' capacity, in dependency order.
         
-        insights = f"""
-        HISTORICAL PERFORMANCE METRICS:
-        - Average Story Points per Sprint: {avg_velocity:.1f}
-        - Average Hours per Story Point: {avg_hours_per_point:.1f}
-        - Total Stories Analyzed: {len(self.historical_data)}
+        Points and hours given on a story record are used as-is; otherwise they come from the
+        local estimator, falling back to 5 points and 20 hours without historical data.
+        """
+        stories = self.project_stories(project_details)
+        estimates = self.local_estimator.estimate(stories, team_size=project_details.get('total_team_size'))
+        story_points, hours = [], []
+        for story, estimate in zip(stories, estimates):
+            given = story if isinstance(story, dict) else {}
+            story_points.append(given.get('story_points') or estimate['story_points'] or DEFAULT_STORY_POINTS)
+            hours.append(given.get('hours') or estimate['hours'] or DEFAULT_STORY_HOURS)
+        before, after, external = parse_story_dependencies(stories, project_details.get('dependencies', []))
+        team_names, team_sizes = project_teams(project_details)
+        planned_sprints = -(-int(project_details.get('duration_weeks', 4)) // SPRINT_WEEKS)
+        return schedule_stories([story_text(story).strip() for story in stories], story_points, hours,
+                                team_names, team_sizes, before, after, planned_sprints, external=external)
+    
+    def get_story_estimates(self, project_details: Dict[str, Any], narrative: bool = False,
+                            min_confidence: Optional[float] = None) -> Dict[str, Any]:
+        """Estimate stories locally, calling the LLM only for low confidence or when a narrative is requested"""
+        threshold = self.local_confidence_threshold if min_confidence is None else min_confidence
+        estimates = self.estimate_stories_locally(project_details)
+        result = {
+            "stories": estimates,
+            "total_story_points": sum(estimate["story_points"] or 0 for estimate in estimates),
+            "total_hours": round(sum(estimate["hours"] or 0 for estimate in estimates), 1),
+            "min_confidence": min((estimate["confidence"] for estimate in estimates), default=0.0),
+            "confidence_threshold": threshold
+        }
+        if estimates and result["min_confidence"] >= threshold and not narrative:
+            result["source"] = "local"
+            return result
         
-        COMMON BOTTLENECKS:
-        {risk_analysis.to_string()}
+        analysis = self.get_full_analysis(project_details)
+        if "error" in analysis:
+            return {"error": analysis["error"], **result}
+        result["source"] = "llm"
+        result["analysis"] = analysis
+        return result
+    
+    def chat_completion(self, system_prompt: str, prompt: str, max_tokens: int, temperature: float, model: str = "gpt-4",
+                        on_delta: Optional[Callable[[str], None]] = None, tool: Optional[Dict[str, Any]] = None,
+                        cacheable: Optional[Callable[[str], bool]] = None) -> str:
+        """Run a chat completion, serving identical requests from the response cache.
         
-        FREQUENT DEPENDENCIES:
-        {dependency_analysis.to_string()}
+        When on_delta is given the response is streamed and each chunk of content is passed to it.
+        When tool is given the model is forced to call that function and its JSON arguments are returned.
+        When cacheable is given, only answers it accepts are cached, so a bad reply is asked for again.
         """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        tools = [tool] if tool else None
+        cache_key = make_cache_key(messages, model, temperature, max_tokens, tools)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            if on_delta is not None:
+                on_delta(cached)
+            return cached
         
-        return insights
+        # Identical requests already in flight, here or in another worker, share one call
+        led = []
+        def complete():
+            led.append(True)
+            return self._complete(messages, model, max_tokens, temperature, on_delta, tool, cache_key, cacheable)
+        content = self.single_flight.do(f"chat:{cache_key}", complete)
+        if not led and on_delta is not None:
+            on_delta(content)
+        return content
+    
+    def _complete(self, messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float,
+                  on_delta: Optional[Callable[[str], None]], tool: Optional[Dict[str, Any]], cache_key: str,
+                  cacheable: Optional[Callable[[str], bool]] = None) -> str:
+        """Call the model for a cache miss and cache its answer"""
+        content = self.transport.chat(messages, model, max_tokens, temperature, tool=tool, on_delta=on_delta)
+        if cacheable is None or cacheable(content):
+            self.response_cache.set(cache_key, content)
+        return content
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return response cache hit/miss statistics, how many calls were coalesced and LLM transport counters"""
+        return dict(self.response_cache.stats(), single_flight=self.single_flight.stats(), llm=self.transport.stats())
+    
+    def collect_metrics(self) -> List[Tuple[str, str, str, Dict[str, str], float]]:
+        """Cache, coalescing and LLM transport counters as metric samples for /metrics"""
+        cache = self.response_cache.stats()
+        flights = self.single_flight.stats()
+        samples = [
+            ("sprint_llm_cache_hits_total", "counter", "LLM responses served from the response cache", {}, cache["hits"]),
+            ("sprint_llm_cache_misses_total", "counter", "LLM response cache misses", {}, cache["misses"]),
+            ("sprint_llm_cache_hit_ratio", "gauge", "Share of LLM cache lookups that hit", {}, cache["hit_rate"]),
+            ("sprint_llm_cache_entries", "gauge", "LLM responses held in the response cache", {}, cache["entries"]),
+            ("sprint_single_flight_leaders_total", "counter", "Calls that ran their work", {}, flights["leaders"]),
+            ("sprint_single_flight_followers_total", "counter", "Calls that shared an identical in-flight call's result", {},
+             flights["followers"] + flights["remote_followers"]),
+            ("sprint_historical_stories", "gauge", "Stories in the current historical snapshot", {}, self.snapshot.stats.story_count)
+        ]
+        transport = self.transport.stats()
+        for name in ("calls", "requests", "retries", "hedges", "hedge_wins", "failures", "deadline_exceeded"):
+            samples.append((f"sprint_llm_{name}_total", "counter", f"LLM transport {name.replace('_', ' ')}", {}, transport[name]))
+        return samples
     
-    def get_ai_analysis(self, project_details: Dict[str, Any]) -> Dict[str, Any]:
-        """Get comprehensive AI analysis of the project"""
+    @timed("analysis")
+    def get_ai_analysis(self, project_details: Dict[str, Any],
+                        on_section: Optional[Callable[[str, str], None]] = None,
+                        structured: Optional[bool] = None) -> Dict[str, Any]:
+        """Get comprehensive AI analysis of the project.
+        
+        When on_section is given the response is streamed and on_section(key, content) is called
+        as soon as each analysis section is complete. With structured output (SPRINT_STRUCTURED_OUTPUT
+        or structured=True) the model returns schema-validated JSON instead of free text.
+        """
+        if structured if structured is not None else self.structured_output:
+            return self.get_structured_analysis(project_details, on_section)
+        
         prompt = self.generate_comprehensive_prompt(project_details)
+        detector = IncrementalSectionDetector()
+        
+        def forward_delta(delta):
+            for key, section in detector.feed(delta):
+                on_section(key, section)
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert Agile Project Manager specializing in sprint planning, bottleneck identification, and resource optimization."},
-                    {"role": "user", "content": prompt}
-                ],
+            content = self.chat_completion(
+                "You are an expert Agile Project Manager specializing in sprint planning, bottleneck identification, and resource optimization.",
+                prompt,
                 max_tokens=4000,
-                temperature=0.3
+                temperature=0.3,
+                on_delta=forward_delta if on_section is not None else None
             )
+            if on_section is not None:
+                for key, section in detector.finish():
+                    on_section(key, section)
             
             # Try to parse as JSON, fallback to text processing
-            content = response.choices[0].message.content.strip()
             try:
                 return json.loads(content)
             except json.JSONDecodeError:
@@ -87,22 +368,83 @@ class EnhancedSprintEstimator:
         except Exception as e:
             return {"error": f"Failed to get AI analysis: {str(e)}"}
     
+    def get_structured_analysis(self, project_details: Dict[str, Any],
+                                on_section: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
+        """Get the comprehensive analysis as typed, schema-validated JSON via function calling"""
+        with timer("prompt"):
+            prompt = get_structured_prompt(project_details, self.get_historical_context(project_details),
+                                           self.describe_critical_path(project_details))
+        
+        try:
+            arguments = self.chat_completion(
+                "You are an expert Agile Project Manager specializing in sprint planning, bottleneck identification, and resource optimization.",
+                prompt,
+                max_tokens=4000,
+                temperature=0.3,
+                tool=ANALYSIS_TOOL,
+                # Invalid replies stay out of the cache so the next attempt asks the model again
+                cacheable=lambda reply: "error" not in self.parse_structured_analysis(reply)
+            )
+        except Exception as e:
+            return {"error": f"Failed to get AI analysis: {str(e)}"}
+        
+        with timer("parse"):
+            analysis = self.parse_structured_analysis(arguments)
+        if "error" in analysis:
+            return analysis
+        
+        analysis["structured"] = True
+        if on_section is not None:
+            for key, _ in SECTION_HEADINGS:
+                if analysis.get(key):
+                    on_section(key, analysis[key])
+        return analysis
+    
+    def parse_structured_analysis(self, arguments: str) -> Dict[str, Any]:
+        """Decode and schema-validate the analysis tool's JSON arguments"""
+        try:
+            analysis = json.loads(arguments)
+        except json.JSONDecodeError as e:
+            return {"error": f"Structured analysis was not valid JSON: {str(e)}"}
+        errors = validate_analysis(analysis)
+        if errors:
+            return {"error": "Structured analysis failed schema validation: " + "; ".join(errors[:5])}
+        return analysis
+    
+    def stream_ai_analysis(self, project_details: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Stream the comprehensive analysis, yielding a 'section' event per completed section and a final 'done' event"""
+        events = queue.Queue()
+        
+        def run():
+            try:
+                analysis = self.get_ai_analysis(
+                    project_details,
+                    on_section=lambda key, content: events.put({"type": "section", "section": key, "content": content})
+                )
+                events.put({"type": "error", "error": analysis["error"]} if "error" in analysis else {"type": "done", "analysis": analysis})
+            except Exception as e:
+                events.put({"type": "error", "error": str(e)})
+        
+        self.executor.submit(run)
+        while True:
+            event = events.get()
+            yield event
+            if event["type"] in ("done", "error"):
+                return
+    
     def get_bottleneck_analysis(self, project_details: Dict[str, Any]) -> Dict[str, Any]:
         """Get specialized bottleneck analysis"""
         prompt = get_bottleneck_prompt(project_details)
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a specialized Project Bottleneck Analyst with expertise in identifying and resolving constraints."},
-                    {"role": "user", "content": prompt}
-                ],
+            content = self.chat_completion(
+                "You are a specialized Project Bottleneck Analyst with expertise in identifying and resolving constraints.",
+                prompt,
                 max_tokens=2000,
                 temperature=0.2
             )
             
-            return {"bottleneck_analysis": response.choices[0].message.content.strip()}
+            return {"bottleneck_analysis": content}
             
         except Exception as e:
             return {"error": f"Failed to get bottleneck analysis: {str(e)}"}
@@ -112,120 +454,327 @@ class EnhancedSprintEstimator:
         prompt = get_resource_optimization_prompt(project_details)
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a Resource Planning Specialist with expertise in team allocation and capacity optimization."},
-                    {"role": "user", "content": prompt}
-                ],
+            content = self.chat_completion(
+                "You are a Resource Planning Specialist with expertise in team allocation and capacity optimization.",
+                prompt,
                 max_tokens=2000,
                 temperature=0.2
             )
             
-            return {"resource_optimization": response.choices[0].message.content.strip()}
+            return {"resource_optimization": content}
             
         except Exception as e:
             return {"error": f"Failed to get resource optimization: {str(e)}"}
     
+    def get_full_analysis(self, project_details: Dict[str, Any], timeouts: Optional[Dict[str, float]] = None,
+                          on_section: Optional[Callable[[str, str], None]] = None,
+                          structured: Optional[bool] = None) -> Dict[str, Any]:
+        """Run the comprehensive, bottleneck and resource analyses concurrently and merge them"""
+        timeouts = timeouts or {}
+        started = time.monotonic()
+        # Each call runs in a copy of the caller's context so its stage timings reach the caller's request
+        submit = lambda function, *args: self.executor.submit(contextvars.copy_context().run, function, *args)
+        futures = {
+            "comprehensive": submit(self.get_ai_analysis, project_details, on_section, structured),
+            "bottleneck": submit(self.get_bottleneck_analysis, project_details),
+            "resource": submit(self.get_resource_optimization, project_details)
+        }
+        
+        results = {}
+        failures = {}
+        for name, future in futures.items():
+            remaining = timeouts.get(name, self.call_timeout) - (time.monotonic() - started)
+            try:
+                results[name] = future.result(timeout=max(remaining, 0))
+            except FutureTimeoutError:
+                future.cancel()
+                failures[name] = f"Timed out after {timeouts.get(name, self.call_timeout):.0f}s"
+                continue
+            except Exception as e:
+                failures[name] = str(e)
+                continue
+            if "error" in results[name]:
+                failures[name] = results.pop(name)["error"]
+        
+        if "comprehensive" not in results:
+            return {"error": failures.get("comprehensive", "Comprehensive analysis unavailable"), "partial_failures": failures}
+        
+        analysis = dict(results["comprehensive"])
+        if "bottleneck" in results:
+            analysis["bottleneck_focus"] = results["bottleneck"]["bottleneck_analysis"]
+        if "resource" in results:
+            analysis["resource_optimization"] = results["resource"]["resource_optimization"]
+        if failures:
+            analysis["partial_failures"] = failures
+        return analysis
+    
+    def estimate_project(self, project_details: Dict[str, Any],
+                         on_section: Optional[Callable[[str, str], None]] = None, report_format: str = "xlsx",
+                         structured: Optional[bool] = None) -> Dict[str, Any]:
+        """Run the full analysis for one project and generate its report.
+        
+        Identical requests arriving while one is running wait for it and share its analysis and report;
+        only the first caller's on_section sees the sections stream in.
+        """
+        structured = self.structured_output if structured is None else structured
+        invalid_teams = team_size_error(project_details)
+        if invalid_teams:
+            return {"error": invalid_teams}
+        
+        def run():
+            analysis = self.get_full_analysis(project_details, on_section=on_section, structured=structured)
+            if "error" in analysis:
+                return analysis
+            # One schedule and one forecast serve both the report and the response
+            schedule = self.schedule_project(project_details)
+            forecast = self.delivery_forecast(schedule, project_details)
+            report = self.publish_report(analysis, project_details, report_format, schedule=schedule, forecast=forecast)
+            return {"analysis": analysis, "report_format": report_format, "forecast": forecast.to_dict(datetime.now()), **report}
+        
+        key = canonical_key("project", project_details, report_format, structured)
+        return dict(self.single_flight.do(key, run))
+    
+    def estimate_many(self, projects: Iterable[Dict[str, Any]], max_concurrency: int = 4,
+                      rate_limiter: Optional[RateLimiter] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Estimate many projects with bounded concurrency, yielding (index, result) as each finishes"""
+        def run(project_details):
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            try:
+                return self.estimate_project(project_details)
+            except Exception as e:
+                return {"error": str(e)}
+        
+        # A dedicated pool so batch items never wait on the pool their own LLM calls use
+        pool = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="batch")
+        try:
+            futures = {pool.submit(run, project): index for index, project in enumerate(projects)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # A reader that stops early (the NDJSON client disconnected) closes this generator:
+            # projects not yet started are cancelled instead of being estimated for nobody
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    @timed("parse")
     def parse_text_response(self, content: str) -> Dict[str, Any]:
         """Parse text response into structured format"""
+        # One pass over the response indexes every heading line
+        sections = parse_sections(content)
         return {
             "raw_analysis": content,
-            "project_overview": self.extract_section(content, "PROJECT OVERVIEW"),
-            "sprint_breakdown": self.extract_section(content, "SPRINT BREAKDOWN"),
-            "bottleneck_analysis": self.extract_section(content, "BOTTLENECK ANALYSIS"),
-            "resource_planning": self.extract_section(content, "RESOURCE PLANNING"),
-            "risk_assessment": self.extract_section(content, "RISK ASSESSMENT"),
-            "dependencies_mapping": self.extract_section(content, "DEPENDENCIES MAPPING"),
-            "timeline_milestones": self.extract_section(content, "TIMELINE & MILESTONES"),
-            "recommendations": self.extract_section(content, "RECOMMENDATIONS")
+            **sections,
+            "section_details": {key: parse_section_details(text) for key, text in sections.items() if text != SECTION_NOT_FOUND}
         }
     
     def extract_section(self, content: str, section_name: str) -> str:
         """Extract a specific section from the response"""
         try:
-            start_idx = content.find(section_name)
-            if start_idx == -1:
-                return "Section not found"
-            
-            # Find the next section or end of content
-            next_section_idx = content.find("**", start_idx + len(section_name))
-            if next_section_idx == -1:
-                return content[start_idx:]
-            else:
-                return content[start_idx:next_section_idx]
-        except:
+            headings = [(heading, heading) for _, heading in SECTION_HEADINGS]
+            if (section_name, section_name) not in headings:
+                headings.append((section_name, section_name))
+            return parse_sections(content, headings)[section_name]
+        except Exception:
             return "Error extracting section"
     
-    def generate_sprint_spreadsheet(self, analysis: Dict[str, Any], project_details: Dict[str, Any]) -> str:
+    @timed("spreadsheet")
+    def generate_sprint_spreadsheet(self, analysis: Dict[str, Any], project_details: Dict[str, Any],
+                                    schedule: Optional[StorySchedule] = None, forecast: Optional[DeliveryForecast] = None) -> str:
         """Generate Excel spreadsheet with sprint planning data"""
         try:
             # Create multiple sheets for comprehensive reporting
             filename = f"Sprint_Plan_{project_details.get('project_name', 'Project')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                # Sheet 1: Project Overview
-                overview_data = {
-                    'Project Name': [project_details.get('project_name', 'N/A')],
-                    'Description': [project_details.get('description', 'N/A')],
-                    'Team Size': [project_details.get('total_team_size', 'N/A')],
-                    'Duration (weeks)': [project_details.get('duration_weeks', 'N/A')],
-                    'Priority': [project_details.get('priority', 'Medium')],
-                    'Generated On': [datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
-                }
-                pd.DataFrame(overview_data).to_excel(writer, sheet_name='Project Overview', index=False)
-                
-                # Sheet 2: Sprint Breakdown
-                sprint_data = self.create_sprint_breakdown_data(analysis, project_details)
-                pd.DataFrame(sprint_data).to_excel(writer, sheet_name='Sprint Breakdown', index=False)
-                
-                # Sheet 3: Bottleneck Analysis
-                bottleneck_data = self.create_bottleneck_data(analysis)
-                pd.DataFrame(bottleneck_data).to_excel(writer, sheet_name='Bottleneck Analysis', index=False)
-                
-                # Sheet 4: Resource Planning
-                resource_data = self.create_resource_planning_data(analysis, project_details)
-                pd.DataFrame(resource_data).to_excel(writer, sheet_name='Resource Planning', index=False)
-                
-                # Sheet 5: Risk Assessment
-                risk_data = self.create_risk_assessment_data(analysis)
-                pd.DataFrame(risk_data).to_excel(writer, sheet_name='Risk Assessment', index=False)
-                
-                # Sheet 6: Timeline & Milestones
-                timeline_data = self.create_timeline_data(analysis, project_details)
-                pd.DataFrame(timeline_data).to_excel(writer, sheet_name='Timeline & Milestones', index=False)
-            
+            write_workbook(self.build_report_sheets(analysis, project_details, schedule, forecast), filename, engine=self.excel_engine)
+            REGISTRY.observe('sprint_report_bytes', os.path.getsize(filename), BYTE_BUCKETS, format="xlsx")
             return filename
             
         except Exception as e:
             return f"Error generating spreadsheet: {str(e)}"
     
-    def create_sprint_breakdown_data(self, analysis: Dict[str, Any], project_details: Dict[str, Any]) -> List[Dict]:
+    def register_exporter(self, exporter: ReportExporter):
+        """Add or replace a report format for export_report and publish_report"""
+        self.exporters[exporter.name] = exporter
+    
+    def export_report(self, analysis: Dict[str, Any], project_details: Dict[str, Any], report_format: str = "xlsx",
+                      schedule: Optional[StorySchedule] = None, forecast: Optional[DeliveryForecast] = None) -> bytes:
+        """Render the report sheets in the given format, reusing a schedule and forecast already computed"""
+        exporter = self.exporters.get(report_format)
+        if exporter is None:
+            raise ValueError(f"Unknown report format '{report_format}', expected one of {', '.join(sorted(self.exporters))}")
+        sheets = self.build_report_sheets(analysis, project_details, schedule, forecast)
+        with timer("export"):
+            data = exporter.export(sheets)
+        REGISTRY.observe('sprint_report_bytes', len(data), BYTE_BUCKETS, format=report_format)
+        return data
+    
+    def render_sprint_spreadsheet(self, analysis: Dict[str, Any], project_details: Dict[str, Any]) -> bytes:
+        """Render the sprint plan workbook in memory"""
+        return self.export_report(analysis, project_details, "xlsx")
+    
+    def publish_report(self, analysis: Dict[str, Any], project_details: Dict[str, Any], report_format: str = "xlsx",
+                       schedule: Optional[StorySchedule] = None, forecast: Optional[DeliveryForecast] = None) -> Dict[str, Any]:
+        """Generate the report and return where to download it.
+        
+        With SPRINT_REPORT_STORAGE=memory (the default) the report is kept in the artifact store and
+        downloaded by opaque ID; with disk it is written to the working directory as before.
+        """
+        if self.report_storage == "disk" and report_format == "xlsx":
+            spreadsheet_file = self.generate_sprint_spreadsheet(analysis, project_details, schedule, forecast)
+            if spreadsheet_file.startswith("Error generating spreadsheet"):
+                return {"spreadsheet_file": spreadsheet_file, "download_url": None}
+            return {"spreadsheet_file": spreadsheet_file, "download_url": f"/download/{spreadsheet_file}"}
+        
+        exporter = self.exporters.get(report_format)
+        if exporter is None:
+            return {"spreadsheet_file": f"Error generating spreadsheet: unknown report format '{report_format}'", "download_url": None}
+        suffix = "" if exporter.extension == exporter.name else f"_{exporter.name}"
+        filename = f"Sprint_Plan_{project_details.get('project_name', 'Project')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{suffix}.{exporter.extension}"
+        try:
+            sheets = self.build_report_sheets(analysis, project_details, schedule, forecast)
+            with timer("export"):
+                data = exporter.export(sheets)
+            REGISTRY.observe('sprint_report_bytes', len(data), BYTE_BUCKETS, format=report_format)
+            if self.report_storage == "disk":
+                with open(filename, 'wb') as f:
+                    f.write(data)
+                return {"spreadsheet_file": filename, "download_url": f"/download/{filename}"}
+            artifact_id = self.artifact_store.put(data, filename, exporter.mimetype)
+        except Exception as e:
+            return {"spreadsheet_file": f"Error generating spreadsheet: {str(e)}", "download_url": None}
+        return {"spreadsheet_file": filename, "artifact_id": artifact_id, "download_url": f"/artifacts/{artifact_id}"}
+    
+    def dependency_graph(self, schedule: StorySchedule) -> DependencyGraph:
+        """Critical-path graph of the scheduled stories, with durations in working days"""
+        return DependencyGraph(schedule.hours / HOURS_PER_DAY, schedule.before, schedule.after)
+    
+    def analyze_dependencies(self, project_details: Dict[str, Any]) -> Dict[str, Any]:
+        """Earliest/latest start, slack and critical path of the user stories, in working days"""
+        schedule = self.schedule_project(project_details)
+        try:
+            graph = self.dependency_graph(schedule)
+        except DependencyCycleError as e:
+            return {"error": str(e), "cycle": [schedule.stories[index] for index in e.cycle]}
+        result = graph.to_dict(schedule.stories)
+        for story, sprint in zip(result["stories"], schedule.sprint.tolist()):
+            for key in ("duration", "earliest_start", "latest_start", "slack"):
+                story[key] = round(story[key], 2) + 0.0
+            story["sprint"] = sprint + 1
+        return {
+            "project_duration_days": round(result["project_duration"], 2),
+            "critical_path": result["critical_path"],
+            "stories": result["stories"],
+            "external_dependencies": schedule.external_dependencies
+        }
+    
+    @timed("forecast")
+    def delivery_forecast(self, schedule: StorySchedule, project_details: Dict[str, Any]) -> DeliveryForecast:
+        """Monte Carlo completion forecast of the scheduled stories from historical hours per point"""
+        ratios, conditioned_on = historical_ratios(self.historical_columns, schedule.team_sizes.tolist(),
+                                                   project_details.get('risks'))
+        points = schedule.story_points
+        if not len(ratios):
+            # Without history every trial uses the planned hours
+            ratios, points, conditioned_on = np.ones(1), schedule.hours, ["planned hours only"]
+        capacity = float(schedule.team_sizes.sum()) * schedule.sprint_weeks * schedule.hours_per_person_week
+        return simulate_delivery(ratios, points, schedule.sprint, np.full(schedule.sprint_count, capacity),
+                                 sprint_days=schedule.sprint_weeks * 7,
+                                 deadline_sprints=int(project_details.get('duration_weeks', 4)) / schedule.sprint_weeks,
+                                 trials=self.forecast_trials, conditioned_on=conditioned_on)
+    
+    def forecast_delivery(self, project_details: Dict[str, Any]) -> Dict[str, Any]:
+        """P50/P80/P95 completion dates, on-time probability and per-sprint overrun probabilities"""
+        schedule = self.schedule_project(project_details)
+        return self.delivery_forecast(schedule, project_details).to_dict(datetime.now())
+    
+    def describe_critical_path(self, project_details: Dict[str, Any]) -> str:
+        """One-line critical path summary for the prompts, so the model does not have to guess it"""
+        analysis = self.analyze_dependencies(project_details)
+        if "error" in analysis:
+            return analysis["error"]
+        if not analysis["critical_path"]:
+            return "No user stories to analyze"
+        critical = {story["story"]: story for story in analysis["stories"]}
+        chain = " -> ".join(f"{story} ({critical[story]['duration']:.1f}d)" for story in analysis["critical_path"])
+        return f"{chain}; {analysis['project_duration_days']:.1f} working days without resource limits"
+    
+    def critical_sprints(self, schedule: StorySchedule) -> np.ndarray:
+        """Sprints (0-based) holding stories on the critical path; none when the dependencies have a cycle"""
+        try:
+            graph = self.dependency_graph(schedule)
+        except DependencyCycleError:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(schedule.sprint[graph.critical])
+    
+    def build_report_sheets(self, analysis: Dict[str, Any], project_details: Dict[str, Any],
+                            schedule: Optional[StorySchedule] = None,
+                            forecast: Optional[DeliveryForecast] = None) -> List[Tuple[str, List[Dict]]]:
+        """Rows for each report sheet, in workbook order; the schedule and forecast are computed when not given"""
+        # Sheet 1: Project Overview
+        overview_data = [{
+            'Project Name': project_details.get('project_name', 'N/A'),
+            'Description': project_details.get('description', 'N/A'),
+            'Team Size': project_details.get('total_team_size', 'N/A'),
+            'Duration (weeks)': project_details.get('duration_weeks', 'N/A'),
+            'Priority': project_details.get('priority', 'Medium'),
+            'Generated On': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }]
+        schedule = schedule or self.schedule_project(project_details)
+        return [
+            ('Project Overview', overview_data),
+            ('Sprint Breakdown', self.create_sprint_breakdown_data(analysis, project_details, schedule)),
+            ('Bottleneck Analysis', self.create_bottleneck_data(analysis)),
+            ('Resource Planning', self.create_resource_planning_data(analysis, project_details, schedule)),
+            ('Risk Assessment', self.create_risk_assessment_data(analysis)),
+            ('Timeline & Milestones', self.create_timeline_data(analysis, project_details, schedule, forecast))
+        ]
+    
+    def create_sprint_breakdown_data(self, analysis: Dict[str, Any], project_details: Dict[str, Any],
+                                     schedule: Optional[StorySchedule] = None) -> List[Dict]:
         """Create sprint breakdown data for spreadsheet"""
-        # Sample sprint breakdown based on typical project structure
-        sprints = []
-        total_stories = len(project_details.get('user_stories', []))
-        stories_per_sprint = max(1, total_stories // int(project_details.get('duration_weeks', 4)))
-        
-        for i in range(1, int(project_details.get('duration_weeks', 4)) + 1):
-            sprint = {
-                'Sprint Number': i,
-                'Sprint Goal': f'Sprint {i} deliverables',
-                'Duration (weeks)': 2,
-                'Stories Count': stories_per_sprint,
-                'Estimated Story Points': stories_per_sprint * 5,  # Assuming avg 5 points per story
-                'Estimated Hours': stories_per_sprint * 20,  # Assuming 20 hours per story
-                'Team Capacity': project_details.get('total_team_size', 5) * 80,  # 80 hours per person per 2-week sprint
-                'Capacity Utilization': f"{(stories_per_sprint * 20) / (project_details.get('total_team_size', 5) * 80) * 100:.1f}%",
-                'Key Deliverables': f'Features for Sprint {i}',
-                'Dependencies': 'API integrations, Testing' if i > 1 else 'Initial setup'
-            }
-            sprints.append(sprint)
+        if analysis.get('sprints'):
+            return self.create_structured_sprint_data(analysis['sprints'], project_details)
         
-        return sprints
+        # One row per team and sprint of the capacity-constrained schedule
+        schedule = schedule or self.schedule_project(project_details)
+        return schedule.breakdown_rows(datetime.now())
+    
+    def create_structured_sprint_data(self, sprints: List[Dict[str, Any]], project_details: Dict[str, Any]) -> List[Dict]:
+        """Create sprint breakdown rows from structured analysis sprints"""
+        # The model plans project-wide sprints, so every team's capacity is pooled
+        _, team_sizes = project_teams(project_details)
+        stories = [sprint.get('stories', []) for sprint in sprints]
+        plan = SprintPlan([''], [team_sizes.sum()], [sprint['number'] for sprint in sprints],
+                          [sprint.get('duration_weeks', 2) for sprint in sprints], datetime.now(),
+                          stories=[len(items) for items in stories],
+                          story_points=[sum(story['story_points'] for story in items) for items in stories],
+                          hours=[sum(story['hours'] for story in items) for items in stories])
+        return rows_from_columns({
+            'Sprint Number': plan.sprint_number,
+            'Sprint Goal': [sprint['goal'] for sprint in sprints],
+            'Duration (weeks)': plan.duration_weeks,
+            'Stories Count': plan.stories,
+            'Estimated Story Points': plan.story_points,
+            'Estimated Hours': plan.hours,
+            'Team Capacity': plan.capacity,
+            'Capacity Utilization': plan.utilization_labels(),
+            'Key Deliverables': [sprint.get('deliverables') or ', '.join(story['title'] for story in items)
+                                 for sprint, items in zip(sprints, stories)],
+            'Dependencies': [sprint.get('dependencies', 'None') for sprint in sprints]
+        }, len(plan))
     
     def create_bottleneck_data(self, analysis: Dict[str, Any]) -> List[Dict]:
         """Create bottleneck analysis data"""
+        if analysis.get('bottlenecks'):
+            return [{
+                'Bottleneck Type': bottleneck['type'],
+                'Description': bottleneck['description'],
+                'Impact Level': bottleneck['impact'],
+                'Affected Sprints': bottleneck.get('affected_sprints', 'N/A'),
+                'Mitigation Strategy': bottleneck['mitigation'],
+                'Timeline Impact': bottleneck.get('timeline_impact', 'N/A'),
+                'Owner': bottleneck.get('owner', 'Project Manager')
+            } for bottleneck in analysis['bottlenecks']]
+        
         bottlenecks = [
             {
                 'Bottleneck Type': 'Technical Debt',
@@ -257,31 +806,50 @@ class EnhancedSprintEstimator:
         ]
         return bottlenecks
     
-    def create_resource_planning_data(self, analysis: Dict[str, Any], project_details: Dict[str, Any]) -> List[Dict]:
-        """Create resource planning data"""
-        team_size = project_details.get('total_team_size', 5)
-        resources = []
+    def create_resource_planning_data(self, analysis: Dict[str, Any], project_details: Dict[str, Any],
+                                      schedule: Optional[StorySchedule] = None) -> List[Dict]:
+        """Create resource planning data from the scheduled load of each sprint"""
+        schedule = schedule or self.schedule_project(project_details)
+        plan = schedule.plan(datetime.now())
+        utilization = plan.utilization_labels().reshape(plan.team_count, plan.sprint_count).tolist()
+        peaks = np.nan_to_num(plan.utilization.reshape(plan.team_count, plan.sprint_count), nan=-1.0).argmax(axis=1)
         
-        roles = ['Frontend Developer', 'Backend Developer', 'QA Engineer', 'DevOps Engineer', 'UI/UX Designer']
-        for i, role in enumerate(roles[:team_size]):
-            resource = {
-                'Role': role,
-                'Allocated FTE': 1.0,
-                'Sprint 1 Utilization': '90%',
-                'Sprint 2 Utilization': '95%',
-                'Sprint 3 Utilization': '85%',
-                'Sprint 4 Utilization': '80%',
-                'Skills Required': 'React, Node.js' if 'Developer' in role else role.replace(' ', ', '),
-                'Skill Gap': 'None' if i < 2 else 'Training needed',
-                'Peak Load Period': f'Sprint {i % 4 + 1}',
+        def sprint_columns(team):
+            return {f'Sprint {number} Utilization': value for number, value in enumerate(utilization[team], start=1)}
+        
+        if plan.multi_team:
+            return [dict({'Role': name, 'Allocated FTE': float(size)}, **sprint_columns(team), **{
+                'Skills Required': ', '.join(project_details.get('team_skills', [])) or 'N/A',
+                'Skill Gap': 'N/A',
+                'Peak Load Period': f'Sprint {peaks[team] + 1}',
                 'Backup Resource': 'Cross-trained team member'
-            }
-            resources.append(resource)
+            }) for team, (name, size) in enumerate(zip(plan.team_names, plan.team_sizes.tolist()))]
         
-        return resources
+        # Everyone on a single team carries the team's load
+        roles = ['Frontend Developer', 'Backend Developer', 'QA Engineer', 'DevOps Engineer', 'UI/UX Designer']
+        return [dict({'Role': role, 'Allocated FTE': 1.0}, **sprint_columns(0), **{
+            'Skills Required': 'React, Node.js' if 'Developer' in role else role.replace(' ', ', '),
+            'Skill Gap': 'None' if i < 2 else 'Training needed',
+            'Peak Load Period': f'Sprint {peaks[0] + 1}',
+            'Backup Resource': 'Cross-trained team member'
+        }) for i, role in enumerate(roles[:int(plan.team_sizes[0])])]
     
     def create_risk_assessment_data(self, analysis: Dict[str, Any]) -> List[Dict]:
         """Create risk assessment data"""
+        if analysis.get('risks'):
+            levels = {'Low': 1, 'Medium': 2, 'High': 3, 'Critical': 3}
+            return [{
+                'Risk Category': risk['category'],
+                'Risk Description': risk['description'],
+                'Probability': risk['probability'],
+                'Impact': risk['impact'],
+                'Risk Score': risk.get('score', levels[risk['probability']] * levels[risk['impact']]),
+                'Mitigation Plan': risk['mitigation'],
+                'Contingency Buffer': risk.get('contingency_buffer', 'N/A'),
+                'Owner': risk.get('owner', 'Project Manager'),
+                'Status': risk.get('status', 'Active')
+            } for risk in analysis['risks']]
+        
         risks = [
             {
                 'Risk Category': 'Technical',
@@ -319,26 +887,52 @@ class EnhancedSprintEstimator:
         ]
         return risks
     
-    def create_timeline_data(self, analysis: Dict[str, Any], project_details: Dict[str, Any]) -> List[Dict]:
+    def create_timeline_data(self, analysis: Dict[str, Any], project_details: Dict[str, Any],
+                             schedule: Optional[StorySchedule] = None,
+                             forecast: Optional[DeliveryForecast] = None) -> List[Dict]:
         """Create timeline and milestones data"""
         start_date = datetime.now()
-        timeline = []
         
-        for i in range(1, int(project_details.get('duration_weeks', 4)) + 1):
-            sprint_start = start_date + timedelta(weeks=(i-1)*2)
-            sprint_end = sprint_start + timedelta(weeks=2)
-            
-            milestone = {
-                'Sprint': i,
-                'Start Date': sprint_start.strftime('%Y-%m-%d'),
-                'End Date': sprint_end.strftime('%Y-%m-%d'),
-                'Milestone': f'Sprint {i} Demo',
-                'Deliverables': f'Sprint {i} features completed',
-                'Dependencies': 'Previous sprint completion',
-                'Buffer Days': 2,
-                'Critical Path': 'Yes' if i in [2, 4] else 'No',
-                'Stakeholder Review': sprint_end.strftime('%Y-%m-%d')
-            }
-            timeline.append(milestone)
+        if analysis.get('sprints') and analysis.get('milestones'):
+            sprints = analysis['sprints']
+            milestones = {milestone['sprint']: milestone for milestone in analysis['milestones']}
+            sprint_start, sprint_end = sprint_dates(start_date, [sprint.get('duration_weeks', 2) for sprint in sprints])
+            sprint_milestones = [milestones.get(sprint['number'], {}) for sprint in sprints]
+            end_dates = date_strings(sprint_end)
+            return rows_from_columns({
+                'Sprint': [sprint['number'] for sprint in sprints],
+                'Start Date': date_strings(sprint_start),
+                'End Date': end_dates,
+                'Milestone': [milestone.get('name', f"Sprint {sprint['number']} Demo")
+                              for sprint, milestone in zip(sprints, sprint_milestones)],
+                'Deliverables': [milestone.get('deliverables') or sprint.get('deliverables', sprint['goal'])
+                                 for sprint, milestone in zip(sprints, sprint_milestones)],
+                'Dependencies': [milestone.get('dependencies') or sprint.get('dependencies', 'Previous sprint completion')
+                                 for sprint, milestone in zip(sprints, sprint_milestones)],
+                'Buffer Days': [milestone.get('buffer_days', 2) for milestone in sprint_milestones],
+                'Critical Path': ['Yes' if milestone.get('critical_path') else 'No' for milestone in sprint_milestones],
+                'Stakeholder Review': end_dates
+            }, len(sprints))
         
-        return timeline 
\ No newline at end of file
+        schedule = schedule or self.schedule_project(project_details)
+        sprint_count = schedule.sprint_count
+        numbers = np.arange(1, sprint_count + 1)
+        sprint_start, sprint_end = sprint_dates(start_date, np.full(sprint_count, schedule.sprint_weeks))
+        end_dates = date_strings(sprint_end)
+        sprint_stories = schedule.sprint_stories()
+        forecast = forecast or self.delivery_forecast(schedule, project_details)
+        return rows_from_columns({
+            'Sprint': numbers,
+            'Start Date': date_strings(sprint_start),
+            'End Date': end_dates,
+            'Milestone': np.char.add(np.char.add('Sprint ', numbers.astype(str)), ' Demo'),
+            'Deliverables': [f"{len(indices)} {'story' if len(indices) == 1 else 'stories'}, "
+                             f"{schedule.story_points[indices].sum():g} points completed"
+                             for indices in sprint_stories],
+            'Dependencies': [', '.join(f'Sprint {sprint + 1}' for sprint in sprints) or 'None'
+                             for sprints in schedule.prerequisite_sprints()],
+            'Buffer Days': forecast.buffer_days(80),
+            'Overrun Probability': np.char.mod('%.0f%%', forecast.sprint_overrun * 100),
+            'Critical Path': np.where(np.isin(numbers - 1, self.critical_sprints(schedule)), 'Yes', 'No'),
+            'Stakeholder Review': end_dates
+        }, sprint_count)
@@ -1,11 +1,8 @@
-from openai import OpenAI
-import os
 from dotenv import load_dotenv
+from llm_transport import get_transport
 
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 def generate_prompt(description, criteria, team_size, dependencies, risks):
     prompt = f"""
     You're an agile sprint estimator with deep knowledge of software development tasks and complexities. Based on historical data, estimate the effort in Story Points and Hours.
@@ -31,12 +28,9 @@ def generate_prompt(description, criteria, team_size, dependencies, risks):
     return prompt
 
 def get_estimation(prompt):
-    response = client.chat.completions.create(
+    return get_transport().chat(
+        [{"role": "user", "content": prompt}],
         model="gpt-3.5-turbo",
-        messages=[
-            {"role": "user", "content": prompt}
-        ],
         max_tokens=200,
         temperature=0.3
     )
-    return response.choices[0].message.content.strip()
@@ -0,0 +1,113 @@
+"""
+Workbook writers for sprint plan reports.
+A report is a list of (sheet name, rows) where each row is a dict; columns follow the order in which
+keys first appear, as with pd.DataFrame(rows). The fast engines stream rows straight into the file
+without building DataFrames: xlsxwriter in constant-memory mode, or openpyxl write-only mode when
+xlsxwriter is not installed. The pandas engine is the original DataFrame path.
+"""
+
+import math
+from typing import Any, BinaryIO, Dict, List, Sequence, Tuple, Union
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+Sheet = Tuple[str, Sequence[Dict[str, Any]]]
+
+ENGINES = ("auto", "xlsxwriter", "openpyxl", "pandas")
+
+
+def sheet_columns(rows: Sequence[Dict[str, Any]]) -> List[str]:
+    """Union of the rows' keys in first-seen order"""
+    columns: Dict[str, None] = {}
+    for row in rows:
+        for key in row:
+            columns.setdefault(key)
+    return list(columns)
+
+
+def cell_value(value: Any) -> Any:
+    """Convert a row value to a plain cell value; missing values become blank cells"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        return cell_value(value.item())
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def write_workbook(sheets: Sequence[Sheet], target: Union[str, BinaryIO], engine: str = "auto"):
+    """Write the sheets to a path or binary file object with the given engine"""
+    if engine == "auto":
+        engine = "xlsxwriter" if xlsxwriter is not None else "openpyxl"
+    if engine == "xlsxwriter":
+        if xlsxwriter is None:
+            raise ImportError("xlsxwriter is not installed")
+        _write_xlsxwriter(sheets, target)
+    elif engine == "openpyxl":
+        _write_openpyxl(sheets, target)
+    elif engine == "pandas":
+        _write_pandas(sheets, target)
+    else:
+        raise ValueError(f"Unknown Excel engine '{engine}', expected one of {', '.join(ENGINES)}")
+
+
+def _write_xlsxwriter(sheets: Sequence[Sheet], target):
+    # Same header style pandas uses, so both paths produce the same looking workbook
+    workbook = xlsxwriter.Workbook(target, {
+        'constant_memory': True, 'strings_to_formulas': False, 'strings_to_urls': False
+    })
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    try:
+        for name, rows in sheets:
+            worksheet = workbook.add_worksheet(name)
+            columns = sheet_columns(rows)
+            worksheet.write_row(0, 0, columns, header_format)
+            for row_number, row in enumerate(rows, start=1):
+                for column_number, column in enumerate(columns):
+                    value = cell_value(row.get(column))
+                    if value is None:
+                        continue
+                    if isinstance(value, str):
+                        worksheet.write_string(row_number, column_number, value)
+                    elif isinstance(value, bool):
+                        worksheet.write_boolean(row_number, column_number, value)
+                    else:
+                        worksheet.write_number(row_number, column_number, value)
+    finally:
+        workbook.close()
+
+
+def _write_openpyxl(sheets: Sequence[Sheet], target):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    workbook = Workbook(write_only=True)
+    side = Side(style='thin')
+    border = Border(left=side, right=side, top=side, bottom=side)
+    font = Font(bold=True)
+    alignment = Alignment(horizontal='center', vertical='top')
+    for name, rows in sheets:
+        worksheet = workbook.create_sheet(name)
+        columns = sheet_columns(rows)
+        header = []
+        for column in columns:
+            cell = WriteOnlyCell(worksheet, value=column)
+            cell.font, cell.border, cell.alignment = font, border, alignment
+            header.append(cell)
+        worksheet.append(header)
+        for row in rows:
+            worksheet.append([cell_value(row.get(column)) for column in columns])
+    workbook.save(target)
+
+
+def _write_pandas(sheets: Sequence[Sheet], target):
+    import pandas as pd
+
+    with pd.ExcelWriter(target, engine='openpyxl') as writer:
+        for name, rows in sheets:
+            pd.DataFrame(list(rows)).to_excel(writer, sheet_name=name, index=False)
@@ -0,0 +1,31 @@
+# Gunicorn settings: gunicorn -c gunicorn.conf.py app:app
+import gc
+import os
+
+# Load the app, estimator and historical data once in the master; workers share them copy-on-write
+preload_app = True
+os.environ.setdefault('SPRINT_PRELOAD', 'true')
+# Any worker may serve the poll or download for a job another worker ran
+os.environ.setdefault('SPRINT_JOB_DB', 'sprint_jobs.db')
+os.environ.setdefault('SPRINT_ARTIFACT_DB', 'sprint_artifacts.db')
+# Identical estimations submitted to different workers share one LLM call
+os.environ.setdefault('SPRINT_SINGLE_FLIGHT_DB', 'sprint_flights.db')
+
+bind = os.getenv('SPRINT_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('SPRINT_WEB_WORKERS', 2))
+threads = int(os.getenv('SPRINT_WEB_THREADS', 8))
+timeout = int(os.getenv('SPRINT_WEB_TIMEOUT', 300))
+
+
+def when_ready(server):
+    # Move preloaded objects out of the collector's generations so collections in the
+    # workers do not write to (and un-share) their pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Background threads do not survive fork, so each worker resumes leftover jobs and
+    # restarts the historical data watcher itself
+    from app import estimator, job_queue
+    job_queue.resume_pending()
+    estimator.start_reload_watcher()
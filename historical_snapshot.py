@@ -0,0 +1,199 @@
+"""
+Immutable-by-reference snapshots of historical data and everything derived from it.
+The estimator reads one snapshot per request and a reload builds a new one in the background,
+swapping it in with a single assignment, so in-flight requests finish on the data they started with.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from historical_stats import HistoricalStatsIndex
+from local_estimator import LocalEstimator, hash_features, normalize_rows
+from metrics import REGISTRY
+from story_columns import StoryColumns, file_fingerprint, load_columns, publish_cache, versioned_cache_dir
+from story_index import StoryIndex
+
+
+class HistoricalSnapshot:
+    """Historical columns with the statistics, local estimator and story index built from them"""
+
+    def __init__(self, columns: StoryColumns, stats: HistoricalStatsIndex, local_estimator: LocalEstimator,
+                 story_index: StoryIndex, fingerprint: Optional[str] = None):
+        self.columns = columns
+        # Columns of stories added at runtime, kept apart so adding them never copies the loaded columns
+        self.extra_segments: List[StoryColumns] = []
+        self.stats = stats
+        self.local_estimator = local_estimator
+        self.story_index = story_index
+        self.fingerprint = fingerprint
+        self.loaded_at = time.time()
+        # Stories added at runtime, replayed onto the next snapshot if its data does not have them
+        self.appended: List[Dict[str, Any]] = []
+        self._frame = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, data_file: str, column_cache_dir: Optional[str] = None,
+             index_dir: Optional[str] = None) -> 'HistoricalSnapshot':
+        """Load the data file (through the column cache) and build or load everything derived from it"""
+        fingerprint = file_fingerprint(data_file)
+        columns = load_columns(data_file, column_cache_dir)
+        stats = HistoricalStatsIndex.from_columns(columns)
+        cache = versioned_cache_dir(index_dir, fingerprint) if index_dir else None
+
+        story_index = local_features = None
+        if cache:
+            story_index = StoryIndex.load(cache, fingerprint)
+            local_features = LocalEstimator.load_features(cache, len(columns)) if story_index is not None else None
+        if story_index is None or local_features is None:
+            # Story texts are hashed once, for both the index and the local estimator
+            story_texts = columns.story_texts()
+            counts = hash_features(story_texts, normalize=False)
+            if story_index is None:
+                story_index = StoryIndex.build_from_counts(counts, story_texts, columns.story_points, columns.hours)
+            local_features = normalize_rows(counts)
+        local_estimator = LocalEstimator.from_columns(columns, features=local_features)
+
+        if cache and fingerprint is not None and not isinstance(local_features, np.memmap):
+            def save(directory: str):
+                story_index.save(directory, fingerprint)
+                local_estimator.save_features(directory)
+            if os.path.isdir(cache):
+                # An index cached before the estimator's features were
+                local_estimator.save_features(cache)
+            else:
+                publish_cache(index_dir, fingerprint, save)
+        return cls(columns, stats, local_estimator, story_index, fingerprint)
+
+    @classmethod
+    def empty(cls) -> 'HistoricalSnapshot':
+        columns = StoryColumns.empty()
+        return cls(columns, HistoricalStatsIndex(), LocalEstimator(),
+                   StoryIndex.build_from_texts([], columns.story_points, columns.hours))
+
+    @property
+    def column_segments(self) -> List[StoryColumns]:
+        """The loaded columns followed by those of stories added since"""
+        return [self.columns] + self.extra_segments
+
+    def __len__(self) -> int:
+        return sum(len(columns) for columns in self.column_segments)
+
+    def story_ids(self) -> List[str]:
+        return [story_id for columns in self.column_segments for story_id in columns.story_ids.to_list()]
+
+    @property
+    def data_frame(self):
+        """Historical data as a DataFrame, materialised from the columns on first use"""
+        frame = self._frame
+        if frame is None:
+            segments = self.column_segments
+            if len(segments) == 1:
+                frame = segments[0].to_dataframe()
+            else:
+                import pandas as pd
+                frame = pd.concat([columns.to_dataframe() for columns in segments], ignore_index=True)
+            self._frame = frame
+        return frame
+
+    def add_stories(self, stories: List[Dict[str, Any]]):
+        """Fold completed stories into this snapshot's data and derived structures"""
+        with self._lock:
+            self.appended.extend(stories)
+            segments = self.extra_segments + [StoryColumns.from_records(stories)]
+            # Merge trailing segments no bigger than the one after them, like carries in a binary
+            # counter: a few segments stay, and each story is re-encoded O(log n) times
+            while len(segments) > 1 and len(segments[-2]) <= len(segments[-1]):
+                merged = len(segments[-2]) + len(segments[-1])
+                segments[-2:] = [StoryColumns.from_records(self.appended[len(self.appended) - merged:])]
+            self.extra_segments = segments
+            self._frame = None
+            self.stats.add_stories(stories)
+            self.local_estimator.add_stories(stories)
+            self.story_index.add(stories)
+
+    def carry_over(self, previous: 'HistoricalSnapshot'):
+        """Re-apply stories added to the previous snapshot that this snapshot's data lacks"""
+        if not previous.appended:
+            return
+        known = set(self.story_ids())
+        missing = [story for story in previous.appended if str(story.get('Story_ID', '')) not in known]
+        if missing:
+            self.add_stories(missing)
+
+    def summary(self) -> Dict[str, Any]:
+        return {'stories': len(self), 'fingerprint': self.fingerprint, 'loaded_at': self.loaded_at}
+
+
+class FileWatcher:
+    """Polls a file's size and modification time and calls on_change when it differs from current().
+
+    on_change fails by raising or returning {"error": ...}. The version of the file it failed on is
+    then skipped until the file changes again, and each further failure doubles the wait before the
+    next attempt (up to max_backoff seconds), so a half-written or invalid file is not reloaded on
+    every poll. Failures are counted in sprint_file_watcher_failures_total and kept in last_error.
+    """
+
+    def __init__(self, path: str, current: Callable[[], Optional[str]], on_change: Callable[[], Any],
+                 interval: float = 5.0, max_backoff: float = 300.0):
+        self.path = path
+        self.current = current
+        self.on_change = on_change
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._failed_fingerprint: Optional[str] = None
+        self._retry_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        # Threads do not survive fork, so a watcher inherited from a preloading parent reports stopped
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='historical-data-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self) -> bool:
+        """Call on_change if the file changed and is not the version that last failed; True if it was called"""
+        fingerprint = file_fingerprint(self.path)
+        if fingerprint is None or fingerprint == self.current() or fingerprint == self._failed_fingerprint \
+                or time.monotonic() < self._retry_at:
+            return False
+        try:
+            result = self.on_change()
+            error = result.get('error') if isinstance(result, dict) else None
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        if error is None:
+            self.failures, self.last_error, self._failed_fingerprint, self._retry_at = 0, None, None, 0.0
+            return True
+        self.failures += 1
+        self.last_error = error
+        self._failed_fingerprint = fingerprint
+        self._retry_at = time.monotonic() + min(self.interval * 2 ** self.failures, self.max_backoff)
+        REGISTRY.inc('sprint_file_watcher_failures_total', path=self.path)
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        return {'path': self.path, 'running': self.running, 'failures': self.failures, 'last_error': self.last_error}
+
+
+REGISTRY.describe('sprint_file_watcher_failures_total', 'Failed reloads of a watched data file')
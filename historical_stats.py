@@ -0,0 +1,148 @@
+"""
+Incrementally maintained statistics over historical sprint data.
+The index is built once when the data is loaded and updated as stories are appended,
+so insights can be served without rescanning the full dataset on every request.
+"""
+
+import math
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+def flatten_labels(value: Any) -> List[str]:
+    """Flatten a Risks/Dependencies value (string, list or nested lists) into labels"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        label = value.strip()
+        return [label] if label else []
+    if isinstance(value, float) and math.isnan(value):
+        return []
+    if isinstance(value, (list, tuple)) or hasattr(value, 'tolist'):
+        labels = []
+        for item in (value.tolist() if hasattr(value, 'tolist') else value):
+            labels.extend(flatten_labels(item))
+        return labels
+    return [str(value)]
+
+
+class HistoricalStatsIndex:
+    """Running sums, counts and label counters for historical stories"""
+
+    def __init__(self):
+        self.story_count = 0
+        self.total_story_points = 0.0
+        self.total_hours = 0.0
+        self.risk_counts: Counter = Counter()
+        self.dependency_counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._insights_cache = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> 'HistoricalStatsIndex':
+        """Build an index from an iterable of story records"""
+        index = cls()
+        index.add_stories(records)
+        return index
+
+    @classmethod
+    def from_dataframe(cls, df) -> 'HistoricalStatsIndex':
+        """Build an index from a historical data DataFrame"""
+        index = cls()
+        if df is None or df.empty:
+            return index
+        index.story_count = len(df)
+        index.total_story_points = float(df['Actual_Story_Points'].sum())
+        index.total_hours = float(df['Actual_Hours'].sum())
+        for value in df['Risks']:
+            index.risk_counts.update(flatten_labels(value))
+        for value in df['Dependencies']:
+            index.dependency_counts.update(flatten_labels(value))
+        return index
+
+    @classmethod
+    def from_columns(cls, columns) -> 'HistoricalStatsIndex':
+        """Build an index from StoryColumns using vectorised sums and code counts"""
+        index = cls()
+        index.story_count = len(columns)
+        index.total_story_points = float(columns.story_points.sum(dtype='float64'))
+        index.total_hours = float(columns.hours.sum(dtype='float64'))
+        index.risk_counts = columns.label_counts("risks")
+        index.dependency_counts = columns.label_counts("dependencies")
+        return index
+
+    def add_story(self, story: Dict[str, Any]):
+        """Fold a single completed story into the running statistics"""
+        self.add_stories([story])
+
+    def add_stories(self, stories: Iterable[Dict[str, Any]]):
+        """Fold completed stories into the running statistics"""
+        with self._lock:
+            for story in stories:
+                self.story_count += 1
+                self.total_story_points += float(story.get('Actual_Story_Points') or 0)
+                self.total_hours += float(story.get('Actual_Hours') or 0)
+                self.risk_counts.update(flatten_labels(story.get('Risks')))
+                self.dependency_counts.update(flatten_labels(story.get('Dependencies')))
+            self._insights_cache = None
+
+    @property
+    def is_empty(self) -> bool:
+        return self.story_count == 0
+
+    @property
+    def avg_story_points(self) -> float:
+        return self.total_story_points / self.story_count if self.story_count else 0.0
+
+    @property
+    def avg_hours_per_point(self) -> float:
+        return self.total_hours / self.total_story_points if self.total_story_points else 0.0
+
+    def top_risks(self, n: int = 5) -> List[Tuple[str, int]]:
+        return self.risk_counts.most_common(n)
+
+    def top_dependencies(self, n: int = 5) -> List[Tuple[str, int]]:
+        return self.dependency_counts.most_common(n)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the headline statistics as a plain dict"""
+        return {
+            'total_stories': self.story_count,
+            'avg_story_points': self.avg_story_points,
+            'avg_hours_per_point': self.avg_hours_per_point,
+            'common_risks': self.top_risks(),
+            'frequent_dependencies': self.top_dependencies()
+        }
+
+    def render_insights(self) -> str:
+        """Render the insights text, reusing the cached copy until the index changes"""
+        cached = self._insights_cache
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            insights = f"""
+        HISTORICAL PERFORMANCE METRICS:
+        - Average Story Points per Sprint: {self.avg_story_points:.1f}
+        - Average Hours per Story Point: {self.avg_hours_per_point:.1f}
+        - Total Stories Analyzed: {self.story_count}
+
+        COMMON BOTTLENECKS:
+        {format_counts('Risks', self.top_risks())}
+
+        FREQUENT DEPENDENCIES:
+        {format_counts('Dependencies', self.top_dependencies())}
+        """
+            self._insights_cache = insights
+        return insights
+
+
+def format_counts(title: str, counts: List[Tuple[str, int]]) -> str:
+    """Format label counts as an aligned two-column table"""
+    if not counts:
+        return f"{title}\nNone recorded"
+    width = max(len(label) for label, _ in counts)
+    count_width = max(len(str(count)) for _, count in counts)
+    rows = [f"{label.ljust(width)}    {str(count).rjust(count_width)}" for label, count in counts]
+    return "\n".join([title] + rows)
@@ -0,0 +1,292 @@
+"""
+In-process job queue for long-running estimations.
+Jobs are executed by a worker pool so web requests only submit work and poll for results.
+Job records live in a pluggable backend: in memory by default, or SQLite so that status
+survives restarts and can be read by every worker process on the host.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+FINISHED_STATES = (DONE, FAILED)
+
+
+class MemoryJobBackend:
+    """Keeps job records in a process-local dict"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict[str, Any]):
+        with self._lock:
+            self._jobs[job['id']] = dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def claim(self, job_id: str) -> bool:
+        """Atomically move a queued job to running"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job['status'] != QUEUED:
+                return False
+            job['status'] = RUNNING
+            job['updated'] = time.time()
+            return True
+
+    def update_progress(self, job_id: str, key: str, value: Any):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job['progress'] = dict(job.get('progress') or {}, **{key: value})
+                job['updated'] = time.time()
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update(status=status, result=result, error=error, updated=time.time())
+
+    def queued_ids(self) -> List[str]:
+        with self._lock:
+            return [job_id for job_id, job in self._jobs.items() if job['status'] == QUEUED]
+
+    def touch(self, job_ids: List[str]):
+        """Renew the lease of running jobs"""
+        with self._lock:
+            now = time.time()
+            for job_id in job_ids:
+                job = self._jobs.get(job_id)
+                if job and job['status'] == RUNNING:
+                    job['updated'] = now
+
+    def fail_stale(self, older_than: float, error: str) -> List[str]:
+        """Fail running jobs whose lease was last renewed before older_than"""
+        with self._lock:
+            stale = [job_id for job_id, job in self._jobs.items() if job['status'] == RUNNING and job['updated'] < older_than]
+            for job_id in stale:
+                self._jobs[job_id].update(status=FAILED, error=error, updated=time.time())
+            return stale
+
+    def purge(self, older_than: float):
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job['status'] in FINISHED_STATES and job['updated'] < older_than]:
+                del self._jobs[job_id]
+
+
+class SQLiteJobBackend:
+    """Stores job records in a local SQLite file shared by all processes on the host"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, progress TEXT, "
+                "result TEXT, error TEXT, created REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, job: Dict[str, Any]):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, payload, result, error, created, updated) VALUES (?, ?, ?, NULL, NULL, ?, ?)",
+                (job['id'], job['status'], json.dumps(job['payload'], default=str), job['created'], job['updated'])
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, status, payload, progress, result, error, created, updated FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'id': row[0], 'status': row[1], 'payload': json.loads(row[2]),
+            'progress': json.loads(row[3]) if row[3] else {},
+            'result': json.loads(row[4]) if row[4] else None, 'error': row[5],
+            'created': row[6], 'updated': row[7]
+        }
+
+    def claim(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, updated = ? WHERE id = ? AND status = ?",
+                (RUNNING, time.time(), job_id, QUEUED)
+            )
+            return cursor.rowcount == 1
+
+    def update_progress(self, job_id: str, key: str, value: Any):
+        with self._connect() as conn:
+            row = conn.execute("SELECT progress FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            progress = json.loads(row[0]) if row[0] else {}
+            progress[key] = value
+            conn.execute("UPDATE jobs SET progress = ?, updated = ? WHERE id = ?",
+                         (json.dumps(progress, default=str), time.time(), job_id))
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated = ? WHERE id = ?",
+                (status, json.dumps(result, default=str) if result is not None else None, error, time.time(), job_id)
+            )
+
+    def queued_ids(self) -> List[str]:
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created", (QUEUED,))]
+
+    def touch(self, job_ids: List[str]):
+        if not job_ids:
+            return
+        with self._connect() as conn:
+            conn.executemany("UPDATE jobs SET updated = ? WHERE id = ? AND status = ?",
+                             [(time.time(), job_id, RUNNING) for job_id in job_ids])
+
+    def fail_stale(self, older_than: float, error: str) -> List[str]:
+        with self._connect() as conn:
+            stale = [row[0] for row in conn.execute("SELECT id FROM jobs WHERE status = ? AND updated < ?", (RUNNING, older_than))]
+            for job_id in stale:
+                conn.execute("UPDATE jobs SET status = ?, error = ?, updated = ? WHERE id = ? AND status = ? AND updated < ?",
+                             (FAILED, error, time.time(), job_id, RUNNING, older_than))
+            return stale
+
+    def purge(self, older_than: float):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND updated < ?", (DONE, FAILED, older_than))
+
+
+class JobQueue:
+    """Submits payloads to a handler running on a bounded worker pool.
+
+    The handler is called as handler(payload, report_progress), where report_progress(key, value)
+    records partial results that status readers can show before the job finishes.
+
+    Running jobs hold a lease that this process renews every lease_seconds / 3. A job whose lease
+    runs out was left running by a worker that crashed or restarted, and is failed so that clients
+    polling it stop waiting; its payload is kept for resubmitting.
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any], Callable[[str, Any], None]], Dict[str, Any]], backend=None,
+                 workers: int = 4, retention_seconds: float = 3600, resume: bool = True, lease_seconds: float = 60):
+        self.handler = handler
+        self.backend = backend or MemoryJobBackend()
+        self.retention_seconds = retention_seconds
+        self.lease_seconds = lease_seconds
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._running: set = set()
+        self._lock = threading.Lock()
+        self._monitor: Optional[threading.Thread] = None
+        if resume:
+            self.resume_pending()
+
+    def resume_pending(self):
+        """Pick up work left queued by a previous process using the same backend, and fail jobs
+        left running by a worker that is gone"""
+        self._start_monitor()
+        self.fail_abandoned()
+        for job_id in self.backend.queued_ids():
+            self._pool.submit(self._run, job_id)
+
+    def fail_abandoned(self) -> List[str]:
+        """Fail running jobs whose lease expired; returns their ids"""
+        return self.backend.fail_stale(time.time() - self.lease_seconds,
+                                       'The worker running this job stopped before it finished; please submit it again')
+
+    def _start_monitor(self):
+        # Threads do not survive fork, so a monitor inherited from a preloading parent is restarted
+        with self._lock:
+            if self._monitor is not None and self._monitor.is_alive():
+                return
+            self._monitor = threading.Thread(target=self._renew_leases, name='job-lease-monitor', daemon=True)
+            self._monitor.start()
+
+    def _renew_leases(self):
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            try:
+                with self._lock:
+                    running = list(self._running)
+                self.backend.touch(running)
+                self.fail_abandoned()
+            except Exception as e:
+                print(f"Error renewing job leases: {e}")
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        """Queue a payload and return its job id"""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        self.backend.create({'id': job_id, 'status': QUEUED, 'payload': payload, 'progress': {},
+                             'result': None, 'error': None, 'created': now, 'updated': now})
+        self._start_monitor()
+        self._pool.submit(self._run, job_id)
+        return job_id
+
+    def _run(self, job_id: str):
+        if not self.backend.claim(job_id):
+            return
+        with self._lock:
+            self._running.add(job_id)
+        try:
+            self._execute(job_id)
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+
+    def _execute(self, job_id: str):
+        job = self.backend.get(job_id)
+        try:
+            result = self.handler(job['payload'], lambda key, value: self.backend.update_progress(job_id, key, value))
+        except Exception as e:
+            self.backend.finish(job_id, FAILED, error=str(e))
+            return
+        if isinstance(result, dict) and 'error' in result:
+            self.backend.finish(job_id, FAILED, error=result['error'])
+        else:
+            self.backend.finish(job_id, DONE, result=result)
+        self.backend.purge(time.time() - self.retention_seconds)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the full job record, including payload and result"""
+        return self.backend.get(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job's status without its payload or result"""
+        job = self.backend.get(job_id)
+        if job is None:
+            return None
+        return {'id': job['id'], 'status': job['status'], 'error': job['error'],
+                'progress': sorted(job.get('progress') or {}),
+                'created': job['created'], 'updated': job['updated']}
+
+    def wait(self, job_id: str, timeout: float, poll_interval: float = 0.5) -> Optional[Dict[str, Any]]:
+        """Poll until the job finishes or timeout elapses, returning its latest status"""
+        deadline = time.monotonic() + timeout
+        status = self.status(job_id)
+        while status and status['status'] not in FINISHED_STATES and time.monotonic() < deadline:
+            time.sleep(poll_interval)
+            status = self.status(job_id)
+        return status
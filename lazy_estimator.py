@@ -0,0 +1,74 @@
+"""
+Deferred construction of the estimator.
+Building EnhancedSprintEstimator imports pandas, NumPy and openai and loads the historical data,
+so the web app creates it on first use or in a background warm-up instead of at import time.
+Under a preloading server (gunicorn --preload) it is built once in the master process and shared
+copy-on-write by the forked workers.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class LazyEstimator:
+    """Builds an object with factory on first use and delegates attribute access to it"""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._instance = None
+        self._error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._warm_up_thread: Optional[threading.Thread] = None
+        self._load_seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._instance is not None
+
+    def get(self):
+        """Return the instance, building it on the calling thread if no one has yet"""
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                started = time.perf_counter()
+                try:
+                    self._instance = self._factory()
+                except Exception as e:
+                    self._error = str(e)
+                    raise
+                self._error = None
+                self._load_seconds = time.perf_counter() - started
+            return self._instance
+
+    def warm_up(self):
+        """Start building the instance on a background thread"""
+        if self.ready or self._warm_up_thread is not None:
+            return
+
+        def run():
+            try:
+                self.get()
+            except Exception as e:
+                print(f"Error warming up estimator: {e}")
+
+        self._warm_up_thread = threading.Thread(target=run, name='estimator-warm-up', daemon=True)
+        self._warm_up_thread.start()
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness for health checks, without triggering a build"""
+        if self.ready:
+            state = 'ready'
+        elif self._error is not None:
+            state = 'failed'
+        elif self._lock.locked():
+            state = 'warming'
+        else:
+            state = 'cold'
+        return {'status': state, 'error': self._error,
+                'load_seconds': round(self._load_seconds, 3) if self._load_seconds is not None else None}
+
+    def __getattr__(self, name: str):
+        return getattr(self.get(), name)
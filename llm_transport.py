@@ -0,0 +1,271 @@
+"""
+Shared transport for every LLM call in the process.
+One OpenAI client over a pooled, keep-alive HTTP connection pool replaces a client per module.
+Calls are admitted against per-model request and token budgets (token buckets), retried with
+jittered exponential backoff on rate limits, timeouts and server errors (honouring Retry-After),
+optionally hedged with a duplicate request when the first is slow, and bounded by a deadline that
+covers queueing, retries and hedges. SPRINT_LLM_BASE_URL points it at any OpenAI-compatible server,
+such as a local stub for tests and benchmarks.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from typing import Any, Callable, Dict, List, Optional
+
+import openai
+from openai import OpenAI
+
+from metrics import REGISTRY, record_stage
+from rate_limiter import RateLimiter
+
+try:
+    import httpx
+except ImportError:  # the SDK then keeps its own default connection pool
+    httpx = None
+
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+CHARS_PER_TOKEN = 4
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """The call's deadline passed while queued for budget, waiting to retry or waiting for a reply"""
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_tokens: int) -> int:
+    """Rough token cost of a call for budgeting: prompt characters / 4 plus the completion limit"""
+    return sum(len(str(message.get('content') or '')) for message in messages) // CHARS_PER_TOKEN + max_tokens
+
+
+class ModelBudget:
+    """Requests and tokens per minute allowed for one model; 0 means unlimited"""
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        # A full minute's allowance may be spent at once, as the provider's per-minute limits allow
+        self.requests = RateLimiter(rate=requests_per_minute / 60.0, capacity=max(requests_per_minute, 1.0))
+        self.tokens = RateLimiter(rate=tokens_per_minute / 60.0, capacity=max(tokens_per_minute, 1.0))
+
+    def acquire(self, tokens: float, timeout: Optional[float]) -> bool:
+        return self.requests.acquire(1, timeout) and self.tokens.acquire(tokens, timeout)
+
+
+class LLMTransport:
+    """Pooled, budgeted, retrying and optionally hedging chat-completion client"""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, max_connections: int = 20,
+                 max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 20.0,
+                 hedge_after: Optional[float] = None, deadline: float = 180.0, requests_per_minute: float = 0,
+                 tokens_per_minute: float = 0, model_limits: Optional[Dict[str, Dict[str, float]]] = None):
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after or None
+        self.deadline = deadline
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.model_limits = model_limits or {}
+        http_client = None
+        if httpx is not None:
+            http_client = httpx.Client(limits=httpx.Limits(max_connections=max_connections,
+                                                           max_keepalive_connections=max_connections))
+        # Retries are ours, so the SDK's own are turned off
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0, http_client=http_client)
+        # Connection slots: calls beyond the pool wait here rather than inside the HTTP client
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._hedges = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="llm-hedge")
+        self._budgets: Dict[str, ModelBudget] = {}
+        self._lock = threading.Lock()
+        self.counters = {'calls': 0, 'requests': 0, 'retries': 0, 'hedges': 0, 'hedge_wins': 0,
+                         'failures': 0, 'deadline_exceeded': 0}
+
+    @classmethod
+    def from_env(cls) -> 'LLMTransport':
+        """Create a transport configured from SPRINT_LLM_* environment variables"""
+        base_url = os.getenv('SPRINT_LLM_BASE_URL') or os.getenv('OPENAI_BASE_URL') or None
+        # A stub server needs no real key
+        api_key = os.getenv('OPENAI_API_KEY') or ('stub' if base_url else None)
+        return cls(
+            api_key=api_key,
+            base_url=base_url,
+            max_connections=int(os.getenv('SPRINT_LLM_MAX_CONNECTIONS', 20)),
+            max_retries=int(os.getenv('SPRINT_LLM_MAX_RETRIES', 4)),
+            hedge_after=float(os.getenv('SPRINT_LLM_HEDGE_AFTER', 0)),
+            deadline=float(os.getenv('SPRINT_LLM_TIMEOUT', 180)),
+            requests_per_minute=float(os.getenv('SPRINT_LLM_RPM', 0)),
+            tokens_per_minute=float(os.getenv('SPRINT_LLM_TPM', 0)),
+            model_limits=json.loads(os.getenv('SPRINT_LLM_MODEL_LIMITS') or '{}')
+        )
+
+    def _budget(self, model: str) -> ModelBudget:
+        with self._lock:
+            budget = self._budgets.get(model)
+            if budget is None:
+                limits = self.model_limits.get(model, {})
+                budget = self._budgets[model] = ModelBudget(limits.get('rpm', self.requests_per_minute),
+                                                            limits.get('tpm', self.tokens_per_minute))
+            return budget
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def chat(self, messages: List[Dict[str, Any]], model: str = "gpt-4", max_tokens: int = 1000,
+             temperature: float = 0.3, tool: Optional[Dict[str, Any]] = None,
+             on_delta: Optional[Callable[[str], None]] = None, deadline: Optional[float] = None) -> str:
+        """Return the reply text, or the forced tool call's JSON arguments when tool is given.
+
+        With on_delta the reply is streamed and on_delta receives each piece as it arrives; streamed
+        calls are not hedged and are only retried if they fail before the first piece. deadline is
+        the total seconds allowed (default SPRINT_LLM_TIMEOUT).
+        """
+        request: Dict[str, Any] = dict(model=model, messages=messages, max_tokens=max_tokens, temperature=temperature)
+        if tool is not None:
+            request.update(tools=[tool], tool_choice={"type": "function", "function": {"name": tool["function"]["name"]}})
+        started = time.perf_counter()
+        try:
+            return self._chat(request, on_delta, deadline)
+        finally:
+            record_stage("llm", time.perf_counter() - started)
+
+    def _chat(self, request: Dict[str, Any], on_delta: Optional[Callable[[str], None]], deadline: Optional[float]) -> str:
+        model, messages, max_tokens = request['model'], request['messages'], request['max_tokens']
+        ends = time.monotonic() + (deadline or self.deadline)
+        budget = self._budget(model)
+        tokens = estimate_tokens(messages, max_tokens)
+        self._count('calls')
+        streamed = []
+        attempt = 0
+        while True:
+            if not budget.acquire(tokens, timeout=max(0.0, ends - time.monotonic())):
+                self._count('deadline_exceeded')
+                raise LLMDeadlineExceeded(f"No {model} budget available before the deadline")
+            try:
+                if on_delta is not None:
+                    return self._stream(request, ends, on_delta, streamed)
+                return self._hedged(request, ends, budget, tokens)
+            except Exception as e:
+                if isinstance(e, LLMDeadlineExceeded):
+                    self._count('deadline_exceeded')
+                    raise
+                if isinstance(e, openai.APITimeoutError) and time.monotonic() >= ends:
+                    # The HTTP timeout was what was left of the deadline
+                    self._count('deadline_exceeded')
+                    raise LLMDeadlineExceeded("No reply before the deadline") from e
+                delay = self._backoff(attempt, e)
+                if delay is None or attempt >= self.max_retries or streamed or time.monotonic() + delay >= ends:
+                    self._count('failures')
+                    raise
+            self._count('retries')
+            time.sleep(delay)
+            attempt += 1
+
+    def _backoff(self, attempt: int, error: Exception) -> Optional[float]:
+        """Seconds to wait before retrying after error, or None when retrying cannot help"""
+        if isinstance(error, openai.APIStatusError):
+            if error.status_code not in RETRY_STATUS:
+                return None
+        elif not isinstance(error, openai.APIConnectionError):
+            return None
+        # Full jitter keeps retrying callers from synchronizing; a server's Retry-After is a floor
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        response = getattr(error, 'response', None)
+        try:
+            retry_after = float(response.headers.get('retry-after')) if response is not None else None
+        except (TypeError, ValueError):
+            retry_after = None
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def _request(self, request: Dict[str, Any], ends: float):
+        remaining = ends - time.monotonic()
+        if remaining <= 0 or not self._slots.acquire(timeout=remaining):
+            raise LLMDeadlineExceeded("No connection free before the deadline")
+        try:
+            self._count('requests')
+            return self.client.with_options(timeout=max(0.001, ends - time.monotonic())).chat.completions.create(**request)
+        finally:
+            self._slots.release()
+
+    def _count_tokens(self, request: Dict[str, Any], prompt_tokens: int, completion_tokens: int):
+        REGISTRY.inc('sprint_llm_prompt_tokens_total', prompt_tokens, model=request['model'])
+        REGISTRY.inc('sprint_llm_completion_tokens_total', completion_tokens, model=request['model'])
+
+    def _send(self, request: Dict[str, Any], ends: float) -> str:
+        response = self._request(request, ends)
+        message = response.choices[0].message
+        content = message.tool_calls[0].function.arguments if 'tools' in request else (message.content or '').strip()
+        usage = getattr(response, 'usage', None)
+        if usage is not None and usage.prompt_tokens:
+            self._count_tokens(request, usage.prompt_tokens, usage.completion_tokens or 0)
+        else:
+            self._count_tokens(request, estimate_tokens(request['messages'], 0), len(content) // CHARS_PER_TOKEN)
+        return content
+
+    def _hedged(self, request: Dict[str, Any], ends: float, budget: ModelBudget, tokens: int) -> str:
+        if self.hedge_after is None:
+            return self._send(request, ends)
+        first = self._hedges.submit(self._send, request, ends)
+        try:
+            return first.result(timeout=max(0.0, min(self.hedge_after, ends - time.monotonic())))
+        except FutureTimeoutError:
+            pass
+        # Slow: race a duplicate, if the budget has room for it right now, and take whichever answers first
+        pending = {first}
+        if budget.acquire(tokens, timeout=0):
+            self._count('hedges')
+            hedge = self._hedges.submit(self._send, request, ends)
+            pending.add(hedge)
+        else:
+            hedge = None
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, ends - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                raise LLMDeadlineExceeded("No reply before the deadline")
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count('hedge_wins')
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _stream(self, request: Dict[str, Any], ends: float, on_delta: Callable[[str], None], parts: List[str]) -> str:
+        stream = self._request(dict(request, stream=True), ends)
+        for chunk in stream:
+            if time.monotonic() > ends:
+                close = getattr(stream, 'close', None)
+                if close is not None:
+                    close()
+                raise LLMDeadlineExceeded("Streamed reply did not finish before the deadline")
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                on_delta(delta)
+        content = "".join(parts).strip()
+        # Streamed replies carry no usage, so both counts are estimates
+        self._count_tokens(request, estimate_tokens(request['messages'], 0), len(content) // CHARS_PER_TOKEN)
+        return content
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call, retry and hedge counters"""
+        with self._lock:
+            return dict(self.counters, base_url=self.base_url, hedge_after=self.hedge_after,
+                        max_connections=self.max_connections)
+
+
+_shared: Optional[LLMTransport] = None
+_shared_lock = threading.Lock()
+
+
+def get_transport() -> LLMTransport:
+    """The process-wide transport, created from the environment on first use"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = LLMTransport.from_env()
+        return _shared
@@ -0,0 +1,237 @@
+"""
+Local statistical story estimator fitted on historical actuals.
+Stories are embedded as signed hashed bag-of-words vectors (NumPy, no vocabulary to store) and
+estimated by similarity-weighted k-nearest neighbours, so per-story points and hours come back in
+milliseconds. A confidence score tells callers when the estimate is too uncertain to skip the LLM.
+"""
+
+import os
+import re
+import tempfile
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from historical_stats import flatten_labels
+
+FIBONACCI_POINTS = np.array([1, 2, 3, 5, 8, 13, 21], dtype=np.float32)
+FEATURES_FILE = "local_features.npy"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset(["a", "an", "the", "to", "i", "as", "want", "so", "that", "my", "of", "and", "or", "in", "on", "for", "be", "can", "with"])
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens plus adjacent-word bigrams, without stop words"""
+    words = [word for word in _TOKEN_RE.findall(text.lower()) if word not in _STOP_WORDS]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def hash_features(texts: Sequence[str], n_features: int = 256, normalize: bool = True) -> np.ndarray:
+    """Embed texts as signed hashed token counts (float32, one row per text), L2-normalised by default"""
+    matrix = np.zeros((len(texts), n_features), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for token in tokenize(text):
+            digest = zlib.crc32(token.encode("utf-8"))
+            matrix[row, digest % n_features] += 1.0 if digest & 0x80000000 else -1.0
+    return normalize_rows(matrix) if normalize else matrix
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalise the rows of a float matrix in place, leaving all-zero rows untouched"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def story_text(story: Any) -> str:
+    """Description plus acceptance criteria for a story given as a record or a plain string"""
+    if isinstance(story, str):
+        return story
+    criteria = ", ".join(flatten_labels(story.get("Acceptance_Criteria", story.get("acceptance_criteria"))))
+    description = story.get("User_Story_Description", story.get("description", ""))
+    return f"{description} | {criteria}" if criteria else description
+
+
+class AppendBuffer:
+    """Same-length arrays that rows are appended to in place, doubling their capacity when full.
+
+    Appends write the new rows past the current length and then publish the new length together
+    with the arrays in one assignment, so view() needs no lock and always sees whole rows.
+    """
+
+    def __init__(self, *empty: np.ndarray):
+        self._state = (empty, 0)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._state[1]
+
+    def view(self) -> tuple:
+        arrays, length = self._state
+        return tuple(array[:length] for array in arrays)
+
+    def append(self, *rows):
+        count = len(rows[0])
+        with self._lock:
+            arrays, length = self._state
+            if length + count > len(arrays[0]):
+                capacity = max(16, 2 * (length + count))
+                grown = []
+                for array in arrays:
+                    copy = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+                    copy[:length] = array[:length]
+                    grown.append(copy)
+                arrays = tuple(grown)
+            for array, values in zip(arrays, rows):
+                array[length:length + count] = values
+            self._state = (arrays, length + count)
+
+
+class LocalEstimator:
+    """Similarity-weighted k-NN over hashed text features and team size"""
+
+    def __init__(self, k: int = 7, n_features: int = 256, team_size_scale: float = 4.0):
+        self.k = k
+        self.n_features = n_features
+        self.team_size_scale = team_size_scale
+        self.features = np.zeros((0, n_features), dtype=np.float32)
+        self.team_sizes = np.zeros(0, dtype=np.float32)
+        self.story_points = np.zeros(0, dtype=np.float32)
+        self.hours = np.zeros(0, dtype=np.float32)
+        # Stories added after fitting: features, team sizes, points and hours, grown in place
+        self._extra = self._no_extra()
+
+    @classmethod
+    def from_dataframe(cls, df, **kwargs) -> 'LocalEstimator':
+        """Fit an estimator on a historical data DataFrame"""
+        estimator = cls(**kwargs)
+        if df is not None and not df.empty:
+            estimator.fit(
+                [story_text(row) for row in df.to_dict('records')],
+                df['Team_Size'].to_numpy(),
+                df['Actual_Story_Points'].to_numpy(),
+                df['Actual_Hours'].to_numpy()
+            )
+        return estimator
+
+    @classmethod
+    def from_columns(cls, columns, texts: Optional[Sequence[str]] = None, features: Optional[np.ndarray] = None,
+                     **kwargs) -> 'LocalEstimator':
+        """Fit an estimator on StoryColumns, reusing precomputed story texts or normalised features when given"""
+        estimator = cls(**kwargs)
+        if len(columns):
+            if features is None:
+                features = hash_features(texts if texts is not None else columns.story_texts(), estimator.n_features)
+            estimator.fit_features(features, columns.team_size, columns.story_points, columns.hours)
+        return estimator
+
+    def save_features(self, directory: str):
+        """Write the feature matrix into directory, replacing any previous one atomically"""
+        handle, staging = tempfile.mkstemp(prefix='.staging-', suffix='.npy', dir=directory)
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                np.save(f, np.ascontiguousarray(self.features))
+            os.replace(staging, os.path.join(directory, FEATURES_FILE))
+        except OSError:
+            if os.path.exists(staging):
+                os.remove(staging)
+            raise
+
+    @staticmethod
+    def load_features(directory: str, rows: int, n_features: int = 256, mmap: bool = True) -> Optional[np.ndarray]:
+        """Memory-map features saved by save_features; None when missing or of another shape"""
+        path = os.path.join(directory, FEATURES_FILE)
+        try:
+            features = np.load(path, mmap_mode='r' if mmap else None)
+        except (OSError, ValueError):
+            return None
+        return features if features.shape == (rows, n_features) and features.dtype == np.float32 else None
+
+    def _no_extra(self) -> AppendBuffer:
+        return AppendBuffer(np.zeros((0, self.n_features), dtype=np.float32), *(np.zeros(0, dtype=np.float32) for _ in range(3)))
+
+    @property
+    def is_fitted(self) -> bool:
+        return len(self.story_points) + len(self._extra) > 0
+
+    def fit(self, texts: Sequence[str], team_sizes, story_points, hours):
+        """Fit on story texts with their team sizes and actual points and hours"""
+        return self.fit_features(hash_features(texts, self.n_features), team_sizes, story_points, hours)
+
+    def fit_features(self, features: np.ndarray, team_sizes, story_points, hours):
+        """Fit on already hashed, L2-normalised story features"""
+        self.features = features
+        self.team_sizes = np.asarray(team_sizes, dtype=np.float32)
+        self.story_points = np.asarray(story_points, dtype=np.float32)
+        self.hours = np.asarray(hours, dtype=np.float32)
+        self._extra = self._no_extra()
+        return self
+
+    def add_stories(self, records: Sequence[Dict[str, Any]]):
+        """Append completed story records without refitting the existing ones"""
+        if not records:
+            return
+        self._extra.append(
+            hash_features([story_text(record) for record in records], self.n_features),
+            [record.get('Team_Size', 0) for record in records],
+            [record.get('Actual_Story_Points', 0) for record in records],
+            [record.get('Actual_Hours', 0) for record in records]
+        )
+
+    def estimate(self, stories: Sequence[Any], team_size: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Estimate points, hours and confidence for each story (records or plain strings)"""
+        if not stories:
+            return []
+        if not self.is_fitted:
+            return [{"story": story_text(story), "story_points": None, "hours": None, "confidence": 0.0, "neighbors": 0}
+                    for story in stories]
+
+        queries = hash_features([story_text(story) for story in stories], self.n_features)
+        query_team = np.array([
+            float(story.get("Team_Size", team_size or 0)) if isinstance(story, dict) else float(team_size or 0)
+            for story in stories
+        ], dtype=np.float32)
+
+        # Cosine text similarity, damped by team size difference when the team size is known
+        similarity = queries @ self.features.T
+        team_sizes, story_points, hours = self.team_sizes, self.story_points, self.hours
+        extra_features, extra_team_sizes, extra_points, extra_hours = self._extra.view()
+        if len(extra_points):
+            similarity = np.hstack([similarity, queries @ extra_features.T])
+            team_sizes = np.concatenate([team_sizes, extra_team_sizes])
+            story_points = np.concatenate([story_points, extra_points])
+            hours = np.concatenate([hours, extra_hours])
+        np.clip(similarity, 0.0, None, out=similarity)
+        known = query_team > 0
+        similarity[known] *= np.exp(-np.abs(query_team[known, None] - team_sizes[None, :]) / self.team_size_scale)
+
+        k = min(self.k, similarity.shape[1])
+        neighbors = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        weights = np.take_along_axis(similarity, neighbors, axis=1)
+        points = story_points[neighbors]
+        hours = hours[neighbors]
+
+        weight_sums = weights.sum(axis=1)
+        safe_sums = np.where(weight_sums > 0, weight_sums, 1.0)
+        uniform = weight_sums == 0
+        weights[uniform] = 1.0
+        safe_sums[uniform] = k
+        point_estimates = (weights * points).sum(axis=1) / safe_sums
+        hour_estimates = (weights * hours).sum(axis=1) / safe_sums
+
+        # Confidence: how similar the neighbours are times how much their actuals agree
+        point_spread = np.sqrt((weights * (points - point_estimates[:, None]) ** 2).sum(axis=1) / safe_sums)
+        agreement = 1.0 - np.minimum(1.0, point_spread / np.maximum(point_estimates, 1e-6))
+        confidence = np.where(uniform, 0.0, weights.mean(axis=1) * agreement)
+        snapped = FIBONACCI_POINTS[np.abs(point_estimates[:, None] - FIBONACCI_POINTS[None, :]).argmin(axis=1)]
+
+        return [{
+            "story": story_text(story),
+            "story_points": int(snapped[row]),
+            "hours": round(float(hour_estimates[row]), 1),
+            "confidence": round(float(confidence[row]), 3),
+            "neighbors": k
+        } for row, story in enumerate(stories)]
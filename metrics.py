@@ -0,0 +1,186 @@
+"""
+Process-wide counters and latency histograms rendered in the Prometheus text format, plus the
+stage timings of the current request for Server-Timing headers.
+A timer costs two perf_counter calls and a bucket increment under a lock, so hot paths can be
+instrumented unconditionally. Stage timings follow the request into worker threads that run with
+a copy of its context (contextvars.copy_context), as the estimator's analysis pool does.
+"""
+
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+BYTE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+# A collector returns (name, kind, help, labels, value) samples computed at scrape time
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+_request_timings: contextvars.ContextVar = contextvars.ContextVar('request_timings', default=None)
+
+
+def _label_text(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = ','.join('{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                     for key, value in labels)
+    return '{' + pairs + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) or abs(value) >= 1e15 else str(int(value))
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Labelled counters and histograms, plus collectors sampled when rendered"""
+
+    def __init__(self):
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple], _Histogram] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def inc(self, name: str, amount: float = 1.0, **labels: Any):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS, **labels: Any):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]):
+        """Register a callable whose samples (e.g. cache counters) are read on every render"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0.0)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(((key, (h.buckets, list(h.counts), h.sum, h.count)) for key, h in self._histograms.items()),
+                                key=lambda item: item[0])
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        described = set()
+
+        def header(name: str, kind: str, help_text: Optional[str] = None):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {help_text or self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, 'counter')
+            lines.append(f"{name}{_label_text(labels)} {_number(value)}")
+        for (name, labels), (buckets, counts, total, count) in histograms:
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else _number(bound)
+                lines.append(f"{name}_bucket{_label_text(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_label_text(labels)} {count}")
+        for collector in collectors:
+            for name, kind, help_text, labels, value in collector():
+                header(name, kind, help_text)
+                lines.append(f"{name}{_label_text(sorted(labels.items()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+REGISTRY.describe('sprint_stage_seconds', 'Time spent in each estimation pipeline stage')
+REGISTRY.describe('sprint_http_request_seconds', 'HTTP request latency by endpoint')
+REGISTRY.describe('sprint_llm_prompt_tokens_total', 'Prompt tokens sent to the LLM (estimated when not reported)')
+REGISTRY.describe('sprint_llm_completion_tokens_total', 'Completion tokens received from the LLM (estimated when not reported)')
+REGISTRY.describe('sprint_report_bytes', 'Size of generated reports')
+
+
+def record_stage(stage: str, seconds: float):
+    """Count a stage's duration in the registry and in the current request's timings"""
+    REGISTRY.observe('sprint_stage_seconds', seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+@contextmanager
+def timer(stage: str):
+    """Time the enclosed block as one run of stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def timed(stage: str):
+    """Decorator timing every call of the function as one run of stage"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record_stage(stage, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+def start_request() -> contextvars.Token:
+    """Begin collecting stage timings for the current request"""
+    return _request_timings.set([])
+
+
+def finish_request(token: contextvars.Token) -> List[Tuple[str, float]]:
+    """Stop collecting and return the request's (stage, seconds) timings"""
+    timings = _request_timings.get() or []
+    _request_timings.reset(token)
+    return timings
+
+
+def server_timing(timings: List[Tuple[str, float]], total: Optional[float] = None) -> str:
+    """Server-Timing header value: each stage's total duration in ms, with a call count when repeated"""
+    stages: Dict[str, List[float]] = {}
+    for stage, seconds in list(timings):
+        stages.setdefault(stage, []).append(seconds)
+    entries = []
+    for stage, durations in stages.items():
+        entry = f"{stage};dur={sum(durations) * 1000:.1f}"
+        if len(durations) > 1:
+            entry += f';desc="{len(durations)} calls"'
+        entries.append(entry)
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
@@ -30,6 +30,7 @@ PROJECT DETAILS TO ANALYZE:
 - Priority Level: {priority}
 - User Stories: {user_stories}
 - Known Dependencies: {dependencies}
+- Computed Critical Path: {critical_path}
 - Known Risks: {risks}
 - Team Skills: {team_skills}
 - Technology Stack: {tech_stack}
@@ -82,7 +83,7 @@ COMPREHENSIVE ANALYSIS REQUIREMENTS:
 6. **DEPENDENCIES & CRITICAL PATH**:
    - Inter-sprint dependencies mapping
    - External dependencies and their timeline impact
-   - Critical path analysis and timeline optimization
+   - Critical path analysis and timeline optimization, starting from the computed critical path above
    - Dependency resolution strategies
    - Parallel work opportunities
 
@@ -199,10 +200,32 @@ Duration: {duration_weeks} weeks
 Provide detailed resource optimization recommendations with specific allocation percentages and timelines.
 """
 
-def get_comprehensive_prompt(project_details, historical_insights=""):
+STRUCTURED_OUTPUT_INSTRUCTIONS = """
+STRUCTURED OUTPUT:
+Return the complete analysis by calling the submit_sprint_plan function. Fill every sprint with the
+user stories it contains and their story points (1, 2, 3, 5, 8, 13, 21 scale) and hour estimates,
+list the bottlenecks and risks with their impact ratings, and give one milestone per sprint marking
+whether it is on the critical path. Put the narrative analysis for each section in the matching
+text fields.
+"""
+
+def format_similar_stories(stories, matches, avg_hours_per_point, total_stories):
+    """Format the nearest historical stories for each user story as prompt context."""
+    lines = [
+        f"Baseline across {total_stories} completed stories: {avg_hours_per_point:.1f} hours per story point.",
+        "Most similar completed stories (actual story points / hours):"
+    ]
+    for story, similar in zip(stories, matches):
+        lines.append(f"- {story.strip()}")
+        for match in similar:
+            lines.append(f"    * {match['story']}: {match['story_points']:g} points / {match['hours']:g} hours")
+    return "\n".join(lines)
+
+def get_comprehensive_prompt(project_details, historical_insights="", critical_path="Not computed"):
     """Generate the comprehensive analysis prompt with project-specific data."""
     return COMPREHENSIVE_ANALYSIS_PROMPT.format(
         historical_insights=historical_insights,
+        critical_path=critical_path,
         project_name=project_details.get('project_name', 'N/A'),
         description=project_details.get('description', 'N/A'),
         total_team_size=project_details.get('total_team_size', 'N/A'),
@@ -227,4 +250,8 @@ def get_resource_optimization_prompt(project_details):
         project_details=str(project_details),
         team_skills=project_details.get('team_skills', []),
         duration_weeks=project_details.get('duration_weeks', 'N/A')
-    ) 
\ No newline at end of file
+    ) 
+
+def get_structured_prompt(project_details, historical_insights="", critical_path="Not computed"):
+    """Generate the comprehensive prompt with instructions for function-call structured output."""
+    return get_comprehensive_prompt(project_details, historical_insights, critical_path) + STRUCTURED_OUTPUT_INSTRUCTIONS
@@ -0,0 +1,135 @@
+"""
+Pluggable exporters for sprint plan reports.
+Every exporter turns the report sheets (a list of (sheet name, rows)) into one downloadable file.
+The tabular formats skip workbook rendering entirely: CSV files in a zip, one JSON document, or
+Parquet tables in a zip. Parquet is only offered when the optional pyarrow package is installed.
+Register additional formats with register_exporter.
+"""
+
+import csv
+import importlib.util
+import io
+import json
+import re
+import zipfile
+from typing import Any, Dict, List, Sequence
+
+from excel_writer import Sheet, cell_value, sheet_columns, write_workbook
+
+
+class ReportExporter:
+    """Base class: subclasses set name, extension and mimetype and implement export"""
+
+    name = ""
+    extension = ""
+    mimetype = "application/octet-stream"
+
+    def export(self, sheets: Sequence[Sheet]) -> bytes:
+        raise NotImplementedError
+
+
+def table_filename(sheet_name: str) -> str:
+    """File-system friendly name for a sheet, e.g. 'Timeline & Milestones' -> 'timeline_milestones'"""
+    return re.sub(r"[^a-z0-9]+", "_", sheet_name.lower()).strip("_")
+
+
+class XlsxExporter(ReportExporter):
+    name = "xlsx"
+    extension = "xlsx"
+    mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    def __init__(self, engine: str = "auto"):
+        self.engine = engine
+
+    def export(self, sheets: Sequence[Sheet]) -> bytes:
+        buffer = io.BytesIO()
+        write_workbook(sheets, buffer, engine=self.engine)
+        return buffer.getvalue()
+
+
+class CsvBundleExporter(ReportExporter):
+    name = "csv"
+    extension = "zip"
+    mimetype = "application/zip"
+
+    def export(self, sheets: Sequence[Sheet]) -> bytes:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for sheet_name, rows in sheets:
+                columns = sheet_columns(rows)
+                text = io.StringIO()
+                writer = csv.writer(text)
+                writer.writerow(columns)
+                for row in rows:
+                    writer.writerow(["" if value is None else value
+                                     for value in (cell_value(row.get(column)) for column in columns)])
+                archive.writestr(f"{table_filename(sheet_name)}.csv", text.getvalue())
+        return buffer.getvalue()
+
+
+class JsonExporter(ReportExporter):
+    name = "json"
+    extension = "json"
+    mimetype = "application/json"
+
+    def export(self, sheets: Sequence[Sheet]) -> bytes:
+        document = {}
+        for sheet_name, rows in sheets:
+            columns = sheet_columns(rows)
+            document[sheet_name] = [{column: cell_value(row.get(column)) for column in columns} for row in rows]
+        return json.dumps(document, ensure_ascii=False).encode('utf-8')
+
+
+class ParquetExporter(ReportExporter):
+    """One Parquet table per sheet in a zip; requires pyarrow"""
+
+    name = "parquet"
+    extension = "zip"
+    mimetype = "application/zip"
+
+    def export(self, sheets: Sequence[Sheet]) -> bytes:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        buffer = io.BytesIO()
+        # Parquet is already compressed, so the zip only stores the tables
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+            for sheet_name, rows in sheets:
+                columns = {column: _parquet_column([cell_value(row.get(column)) for row in rows])
+                           for column in sheet_columns(rows)}
+                table_buffer = io.BytesIO()
+                pq.write_table(pa.table(columns), table_buffer)
+                archive.writestr(f"{table_filename(sheet_name)}.parquet", table_buffer.getvalue())
+        return buffer.getvalue()
+
+
+def _parquet_column(values: List[Any]) -> List[Any]:
+    # A column of mixed numbers and text ('N/A') is stored as text, since Parquet columns have one type
+    present = [value for value in values if value is not None]
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return values
+    if all(isinstance(value, bool) for value in present):
+        return values
+    return [None if value is None else str(value) for value in values]
+
+
+EXPORTERS: Dict[str, ReportExporter] = {}
+# Built-in formats whose optional dependency is missing, with what to install
+UNAVAILABLE_EXPORTERS: Dict[str, str] = {}
+
+
+def register_exporter(exporter: ReportExporter):
+    """Make an exporter available by its name"""
+    EXPORTERS[exporter.name] = exporter
+
+
+for _exporter in (XlsxExporter(), CsvBundleExporter(), JsonExporter()):
+    register_exporter(_exporter)
+# pyarrow is found without importing it, which would slow every start by a fraction of a second
+if importlib.util.find_spec("pyarrow") is not None:
+    register_exporter(ParquetExporter())
+else:
+    UNAVAILABLE_EXPORTERS[ParquetExporter.name] = "requires pyarrow (pip install pyarrow)"
@@ -0,0 +1,136 @@
+"""
+Content-addressed cache for LLM responses.
+Entries are keyed on a canonical hash of the request (messages, model, temperature, max_tokens),
+held in an in-memory LRU with a TTL, and optionally persisted to SQLite so they survive restarts.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+def make_cache_key(messages: List[Dict[str, str]], model: str, temperature: float, max_tokens: int,
+                   tools: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Return a canonical SHA-256 hash for a chat completion request"""
+    request = {'messages': messages, 'model': model, 'temperature': temperature, 'max_tokens': max_tokens}
+    if tools:
+        request['tools'] = tools
+    payload = json.dumps(request, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """LRU + TTL cache of completion text with an optional SQLite backend"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        if db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+                )
+
+    @classmethod
+    def from_env(cls) -> 'ResponseCache':
+        """Create a cache configured from SPRINT_CACHE_* environment variables"""
+        return cls(
+            max_entries=int(os.getenv('SPRINT_CACHE_SIZE', 256)),
+            ttl_seconds=float(os.getenv('SPRINT_CACHE_TTL', 3600)),
+            db_path=os.getenv('SPRINT_CACHE_DB') or None
+        )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, created = entry
+                if not self._expired(created):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        value = self._disk_get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, value[0], value[1])
+            return value[0]
+
+    def set(self, key: str, value: str):
+        """Store a value under key"""
+        created = time.time()
+        with self._lock:
+            self._remember(key, value, created)
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)", (key, value, created))
+                if self.ttl_seconds > 0:
+                    conn.execute("DELETE FROM responses WHERE created < ?", (created - self.ttl_seconds,))
+
+    def _remember(self, key: str, value: str, created: float):
+        self._entries[key] = (value, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        if not self.db_path:
+            return None
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1]):
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            return row
+
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'persistent': bool(self.db_path)
+            }
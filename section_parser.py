@@ -0,0 +1,160 @@
+"""
+Section parsing for free-text analysis responses.
+All heading lines are indexed up front in one pass and a heading only counts at the start of a
+line (after markdown decoration such as '#', '**' or '3.') when it is not followed by more words,
+so a heading name mentioned inside another section's prose, or '**' used for emphasis, does not
+cut a section short.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Analysis keys and the headings the comprehensive response uses for them
+SECTION_HEADINGS = [
+    ("project_overview", "PROJECT OVERVIEW"),
+    ("sprint_breakdown", "SPRINT BREAKDOWN"),
+    ("bottleneck_analysis", "BOTTLENECK ANALYSIS"),
+    ("resource_planning", "RESOURCE PLANNING"),
+    ("risk_assessment", "RISK ASSESSMENT"),
+    ("dependencies_mapping", "DEPENDENCIES MAPPING"),
+    ("timeline_milestones", "TIMELINE & MILESTONES"),
+    ("recommendations", "RECOMMENDATIONS")
+]
+
+SECTION_NOT_FOUND = "Section not found"
+
+_BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.*\S)", re.MULTILINE)
+_STORY_POINTS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:story\s*points?|points?|SP)\b", re.IGNORECASE)
+_HOURS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:hours?|hrs?|h)\b", re.IGNORECASE)
+
+# Markdown decoration, numbering and an optional qualifier the prompts use ("DETAILED") before a heading
+_HEADING_PREFIX_RE = re.compile(r"[ \t>#*_\d.):]*(?:(?:DETAILED|COMPREHENSIVE|STRATEGIC) )?")
+# A heading ends its line or is followed by decoration, not by prose ("RISK ASSESSMENT is due")
+_HEADING_END_RE = r"\b(?![ \t]+\w)"
+# Decoration closing a heading ("**", ":", " -") before any body text on the same line
+_HEADING_SUFFIX_RE = re.compile(r"[ \t#*_:.)\-]*")
+
+_pattern_cache: Dict[Tuple[Tuple[str, str], ...], Tuple[Any, Any, Dict[str, str]]] = {}
+
+
+def _heading_patterns(headings: Optional[List[Tuple[str, str]]] = None):
+    headings = tuple(headings or SECTION_HEADINGS)
+    cached = _pattern_cache.get(headings)
+    if cached is None:
+        names = sorted((heading for _, heading in headings), key=len, reverse=True)
+        line = (_HEADING_PREFIX_RE.pattern + r"(?P<heading>" + "|".join(re.escape(name) for name in names) + ")"
+                + _HEADING_END_RE + ".*$")
+        # The scan variant starts with a literal newline, which the regex engine skips to directly
+        # instead of trying a match at every position as it does for '^'
+        cached = (re.compile("^" + line, re.MULTILINE), re.compile("\n" + line, re.MULTILINE),
+                  {heading: key for key, heading in headings})
+        _pattern_cache[headings] = cached
+    return cached
+
+
+def heading_pattern(headings: Optional[List[Tuple[str, str]]] = None):
+    """Return (compiled heading-line regex, heading -> key map) for the given headings"""
+    pattern, _, keys = _heading_patterns(headings)
+    return pattern, keys
+
+
+def index_headings(content: str, headings: Optional[List[Tuple[str, str]]] = None) -> List[Tuple[str, int, int]]:
+    """Return (key, line_start, body_start) for every heading line, in document order.
+
+    The body starts right after the heading and its closing decoration, so text on the heading's
+    own line ("**RECOMMENDATIONS**: ...") belongs to the section. One regex pass over the content,
+    with every heading in a single alternation, finds all heading lines.
+    """
+    _, scan, keys = _heading_patterns(headings)
+    # Scanned with a leading newline so the first line is found like the others; a match starts at
+    # the newline before its line, which is the line's own offset in content
+    return [(keys[match.group("heading")], match.start(), _HEADING_SUFFIX_RE.match(content, match.end("heading") - 1).end())
+            for match in scan.finditer("\n" + content)]
+
+
+def split_sections(content: str, headings: Optional[List[Tuple[str, str]]] = None) -> Dict[str, str]:
+    """Split content into section bodies keyed by analysis key.
+
+    A section runs from the end of its heading to the start of the next heading line.
+    Repeated headings are merged in order.
+    """
+    index = index_headings(content, headings)
+    sections: Dict[str, List[str]] = {}
+    for position, (key, _, body_start) in enumerate(index):
+        body_end = index[position + 1][1] if position + 1 < len(index) else len(content)
+        sections.setdefault(key, []).append(content[body_start:body_end].strip())
+    return {key: "\n\n".join(part for part in parts if part) for key, parts in sections.items()}
+
+
+def parse_sections(content: str, headings: Optional[List[Tuple[str, str]]] = None) -> Dict[str, str]:
+    """Return every known section's body, with SECTION_NOT_FOUND for missing ones"""
+    sections = split_sections(content, headings)
+    return {key: sections.get(key, SECTION_NOT_FOUND) for key, _ in (headings or SECTION_HEADINGS)}
+
+
+def parse_bullets(text: str) -> List[str]:
+    """Return the bullet and numbered list items in a section"""
+    return [item.strip("* ") for item in _BULLET_RE.findall(text)]
+
+
+def parse_section_details(text: str) -> Dict[str, Any]:
+    """Parse a section body into bullets and numeric story point / hour figures"""
+    return {
+        "bullets": parse_bullets(text),
+        "story_points": [float(value) for value in _STORY_POINTS_RE.findall(text)],
+        "hours": [float(value) for value in _HOURS_RE.findall(text)]
+    }
+
+
+class IncrementalSectionDetector:
+    """Detects section headings in streamed text and reports each section once it completes.
+
+    Uses the same heading-line rule as split_sections, one complete line at a time, so a section
+    is reported as soon as the next heading line arrives (or the stream ends). A repeated heading
+    reports its section again with all of its parts merged, to replace the earlier report.
+    """
+
+    def __init__(self, headings: Optional[List[Tuple[str, str]]] = None):
+        self.pattern, self.keys = heading_pattern(headings)
+        self.buffer = ""
+        self.sections: Dict[str, str] = {}
+        self._line_start = 0
+        self._open: Optional[Tuple[str, int]] = None
+
+    def feed(self, text: str) -> List[Tuple[str, str]]:
+        """Append streamed text and return the (key, content) sections it completed"""
+        self.buffer += text
+        completed = []
+        line_end = self.buffer.find("\n", self._line_start)
+        while line_end != -1:
+            self._close_line(self._line_start, line_end, completed)
+            self._line_start = line_end + 1
+            line_end = self.buffer.find("\n", self._line_start)
+        return completed
+
+    def finish(self) -> List[Tuple[str, str]]:
+        """Process the final line and close the open section at the end of the stream"""
+        completed = []
+        if self._line_start < len(self.buffer):
+            self._close_line(self._line_start, len(self.buffer), completed)
+            self._line_start = len(self.buffer)
+        if self._open is not None:
+            self._complete(self._open, len(self.buffer), completed)
+            self._open = None
+        return completed
+
+    def _close_line(self, start: int, end: int, completed: List[Tuple[str, str]]):
+        match = self.pattern.match(self.buffer, start, end)
+        if match is None:
+            return
+        if self._open is not None:
+            self._complete(self._open, start, completed)
+        self._open = (self.keys[match.group("heading")], _HEADING_SUFFIX_RE.match(self.buffer, match.end("heading")).end())
+
+    def _complete(self, section: Tuple[str, int], end: int, completed: List[Tuple[str, str]]):
+        key, body_start = section
+        body = self.buffer[body_start:end].strip()
+        if key in self.sections:
+            body = "\n\n".join(part for part in (self.sections[key], body) if part)
+        self.sections[key] = body
+        completed.append((key, body))
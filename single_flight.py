@@ -0,0 +1,165 @@
+"""
+Single-flight coalescing of identical in-flight work.
+The first caller for a key runs the work and callers arriving while it runs share its result
+instead of repeating it. Within a process followers wait on the leader's Future. With a SQLite
+lease file, worker processes coalesce too: the leader holds a lease row for the key and publishes
+its JSON result there, followers in other processes poll for it, and a lease whose holder died
+expires so another caller can take over.
+"""
+
+import hashlib
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+_RETRY = object()
+
+
+def canonical_key(*parts: Any) -> str:
+    """SHA-256 of the parts as canonical JSON, for keying calls on their inputs"""
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SingleFlightError(RuntimeError):
+    """The leader in another process failed; carries its error message"""
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key, across threads and optionally processes"""
+
+    def __init__(self, db_path: Optional[str] = None, lease_seconds: float = 300, poll_interval: float = 0.1,
+                 retention_seconds: float = 60):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.leaders = 0
+        self.followers = 0
+        self.remote_followers = 0
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        if db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS flights (key TEXT PRIMARY KEY, token TEXT NOT NULL, expires REAL NOT NULL, "
+                    "done INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT, finished REAL)"
+                )
+
+    @classmethod
+    def from_env(cls) -> 'SingleFlight':
+        """Create a coalescer configured from SPRINT_SINGLE_FLIGHT_* environment variables"""
+        return cls(
+            db_path=os.getenv('SPRINT_SINGLE_FLIGHT_DB') or None,
+            lease_seconds=float(os.getenv('SPRINT_SINGLE_FLIGHT_LEASE', 300))
+        )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Return fn(), or the result of an identical call already in flight.
+
+        Results shared across processes travel as JSON, so fn should return JSON-compatible data.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.followers += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._lead(key, fn)
+        except BaseException as e:
+            with self._lock:
+                del self._calls[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._calls[key]
+        future.set_result(result)
+        return result
+
+    def _lead(self, key: str, fn: Callable[[], Any]) -> Any:
+        if not self.db_path:
+            with self._lock:
+                self.leaders += 1
+            return fn()
+
+        while True:
+            token = secrets.token_hex(8)
+            holder = self._acquire(key, token)
+            if holder == token:
+                break
+            result = self._wait_remote(key, holder)
+            if result is not _RETRY:
+                return result
+
+        with self._lock:
+            self.leaders += 1
+        try:
+            value = fn()
+        except Exception as e:
+            self._finish(key, token, error=str(e) or e.__class__.__name__)
+            raise
+        self._finish(key, token, result=json.dumps(value, default=str))
+        return value
+
+    def _acquire(self, key: str, token: str) -> str:
+        """Take the lease unless a live one is held; return the holder's token"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO flights (key, token, expires, done) VALUES (?, ?, ?, 0) "
+                "ON CONFLICT(key) DO UPDATE SET token = excluded.token, expires = excluded.expires, done = 0, "
+                "result = NULL, error = NULL, finished = NULL WHERE flights.done = 1 OR flights.expires < ?",
+                (key, token, now + self.lease_seconds, now)
+            )
+            return conn.execute("SELECT token FROM flights WHERE key = ?", (key,)).fetchone()[0]
+
+    def _wait_remote(self, key: str, token: str) -> Any:
+        # Poll the other process's lease until it publishes a result; retry the lease if it is
+        # replaced or expires
+        with self._lock:
+            self.remote_followers += 1
+        while True:
+            with self._connect() as conn:
+                row = conn.execute("SELECT token, expires, done, result, error FROM flights WHERE key = ?", (key,)).fetchone()
+            if row is None or row[0] != token:
+                return _RETRY
+            if row[2]:
+                if row[4] is not None:
+                    raise SingleFlightError(row[4])
+                return json.loads(row[3])
+            if row[1] < time.time():
+                return _RETRY
+            time.sleep(self.poll_interval)
+
+    def _finish(self, key: str, token: str, result: Optional[str] = None, error: Optional[str] = None):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("UPDATE flights SET done = 1, result = ?, error = ?, finished = ? WHERE key = ? AND token = ?",
+                         (result, error, now, key, token))
+            conn.execute("DELETE FROM flights WHERE done = 1 AND finished < ?", (now - self.retention_seconds,))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return how many calls ran and how many shared another call's result"""
+        with self._lock:
+            return {'leaders': self.leaders, 'followers': self.followers, 'remote_followers': self.remote_followers,
+                    'in_flight': len(self._calls), 'persistent': bool(self.db_path)}
@@ -0,0 +1,129 @@
+"""
+Vectorized sprint planning core.
+Sprint boundaries, capacities and utilization for every (team, sprint) pair are computed as NumPy
+arrays in a few whole-array operations instead of a Python loop building one dict per sprint, so
+multi-year plans for many parallel teams stay cheap. Rows for the report sheets are materialized
+only at the end, from whole columns.
+"""
+
+import itertools
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+HOURS_PER_PERSON_WEEK = 40
+HOURS_PER_DAY = 8
+SPRINT_WEEKS = 2
+
+
+def project_teams(project_details: Dict[str, Any]) -> Tuple[List[str], np.ndarray]:
+    """Team names and sizes from the optional 'teams' list, or one unnamed team of total_team_size"""
+    teams = project_details.get('teams') or []
+    if not teams:
+        return [''], np.array([int(project_details.get('total_team_size', 5))], dtype=np.int64)
+    names, sizes = [], []
+    for number, team in enumerate(teams, start=1):
+        if isinstance(team, dict):
+            names.append(str(team.get('name') or f'Team {number}'))
+            sizes.append(int(team.get('size', 5)))
+        else:
+            names.append(f'Team {number}')
+            sizes.append(int(team))
+    return names, np.array(sizes, dtype=np.int64)
+
+
+def team_size_error(project_details: Dict[str, Any]) -> Optional[str]:
+    """Why the project's team sizes cannot be planned with, or None when every team has people"""
+    teams = project_details.get('teams') or [{'size': project_details.get('total_team_size', 5)}]
+    for number, team in enumerate(teams, start=1):
+        size = team.get('size', 5) if isinstance(team, dict) else team
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            return f"Team {number} size must be a whole number, got {size!r}"
+        if size <= 0:
+            return f"Team {number} size must be at least 1, got {size}"
+    return None
+
+
+def sprint_dates(start, duration_weeks: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end dates (datetime64[D]) of back-to-back sprints with the given lengths in weeks"""
+    days = np.asarray(duration_weeks, dtype=np.int64) * 7
+    boundaries = np.datetime64(start, 'D') + np.concatenate(([0], np.cumsum(days))).astype('timedelta64[D]')
+    return boundaries[:-1], boundaries[1:]
+
+
+def date_strings(days: np.ndarray) -> np.ndarray:
+    """Format datetime64 dates as YYYY-MM-DD strings in one call"""
+    return np.datetime_as_string(days, unit='D')
+
+
+def rows_from_columns(columns: Dict[str, Any], length: int) -> List[Dict[str, Any]]:
+    """Build row dicts from column arrays or lists; scalar columns are repeated on every row"""
+    values = []
+    for value in columns.values():
+        if isinstance(value, np.ndarray):
+            values.append(value.tolist())
+        elif isinstance(value, list):
+            values.append(value)
+        else:
+            values.append(itertools.repeat(value, length))
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*values)] if length else []
+
+
+class SprintPlan:
+    """Planning arrays for every (team, sprint) pair, ordered team by team"""
+
+    def __init__(self, team_names: List[str], team_sizes: np.ndarray, sprint_number: np.ndarray,
+                 duration_weeks: np.ndarray, start, stories: Any = 0, story_points: Any = 0, hours: Any = 0,
+                 hours_per_person_week: float = HOURS_PER_PERSON_WEEK):
+        # Per-sprint inputs have one entry per sprint; stories, story_points and hours broadcast
+        # against (teams, sprints), so pass per-team values with shape (teams, 1)
+        self.team_names = list(team_names)
+        self.team_sizes = np.asarray(team_sizes, dtype=np.int64)
+        self.team_count = len(self.team_sizes)
+        self.sprint_count = len(sprint_number)
+        shape = (self.team_count, self.sprint_count)
+        sprint_start, sprint_end = sprint_dates(start, duration_weeks)
+
+        self.team_index = np.repeat(np.arange(self.team_count), self.sprint_count)
+        self.sprint_number = np.tile(np.asarray(sprint_number, dtype=np.int64), self.team_count)
+        self.duration_weeks = np.tile(np.asarray(duration_weeks, dtype=np.int64), self.team_count)
+        self.start = np.tile(sprint_start, self.team_count)
+        self.end = np.tile(sprint_end, self.team_count)
+        self.stories = np.broadcast_to(stories, shape).reshape(-1)
+        self.story_points = np.broadcast_to(story_points, shape).reshape(-1)
+        self.hours = np.broadcast_to(hours, shape).reshape(-1)
+        self.capacity = np.repeat(self.team_sizes, self.sprint_count) * self.duration_weeks * hours_per_person_week
+        self.utilization = np.divide(self.hours * 100.0, self.capacity, out=np.full(len(self), np.nan),
+                                     where=self.capacity > 0)
+
+    def __len__(self) -> int:
+        return len(self.team_index)
+
+    @property
+    def multi_team(self) -> bool:
+        return self.team_count > 1 or self.team_names != ['']
+
+    def team_labels(self) -> np.ndarray:
+        """Team name of every row"""
+        return np.asarray(self.team_names, dtype=object)[self.team_index]
+
+    def utilization_labels(self) -> np.ndarray:
+        """Capacity utilization formatted like '42.5%', or 'N/A' for zero-capacity sprints"""
+        return np.where(self.capacity > 0, np.char.mod('%.1f%%', self.utilization), 'N/A')
+
+    def team_columns(self) -> Dict[str, Any]:
+        """A leading Team column for multi-team plans, nothing for a single team"""
+        return {'Team': self.team_labels()} if self.multi_team else {}
+
+    def to_frame(self):
+        """The plan as a DataFrame, one row per team and sprint"""
+        import pandas as pd
+
+        return pd.DataFrame({
+            'team': self.team_labels(), 'sprint': self.sprint_number, 'start': self.start, 'end': self.end,
+            'duration_weeks': self.duration_weeks, 'stories': self.stories, 'story_points': self.story_points,
+            'hours': self.hours, 'capacity': self.capacity, 'utilization': self.utilization
+        })
@@ -0,0 +1,341 @@
+"""
+Streaming, columnar storage for historical sprint data.
+Records are parsed one at a time from a JSON array or NDJSON file into compact typed columns:
+int32 arrays for numbers, and dictionary codes plus row offsets for descriptions, acceptance
+criteria, dependencies and risks. Converted columns are cached as .npy files that later startups
+memory-map in milliseconds.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from historical_stats import flatten_labels
+
+LIST_COLUMNS = {
+    "criteria": "Acceptance_Criteria",
+    "dependencies": "Dependencies",
+    "risks": "Risks"
+}
+
+
+def file_fingerprint(path: str) -> Optional[str]:
+    """Identify a data file by path, size and modification time"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def versioned_cache_dir(root: str, fingerprint: Optional[str]) -> str:
+    """Directory under root holding the cache built from the data identified by fingerprint"""
+    return os.path.join(root, hashlib.sha1(str(fingerprint).encode('utf-8')).hexdigest()[:16])
+
+
+def publish_cache(root: str, fingerprint: Optional[str], save) -> str:
+    """Write a cache with save(directory) into a temporary directory and rename it into place.
+
+    Readers never see a partly written cache, concurrent writers (several worker processes
+    reloading the same data) keep whichever finished first, and caches of older data are removed
+    (memory-mapped files stay valid for readers that still hold them).
+    """
+    os.makedirs(root, exist_ok=True)
+    final = versioned_cache_dir(root, fingerprint)
+    if not os.path.isdir(final):
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=root)
+        save(staging)
+        try:
+            os.rename(staging, final)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if path != final and not name.startswith('.staging-') and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+    return final
+
+
+def iter_records(path: str, chunk_size: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+    """Yield records one at a time from a JSON array or NDJSON file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        head = f.read(chunk_size)
+        stripped = head.lstrip()
+        if stripped.startswith('['):
+            yield from _iter_json_array(f, head, chunk_size)
+            return
+        buffer = head
+        while True:
+            *lines, buffer = buffer.split('\n')
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            buffer += chunk
+        if buffer.strip():
+            yield json.loads(buffer)
+
+
+def _iter_json_array(f, buffer: str, chunk_size: int) -> Iterator[Dict[str, Any]]:
+    decoder = json.JSONDecoder()
+    pos = buffer.index('[') + 1
+    eof = False
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Unterminated JSON array")
+            buffer, pos = buffer[pos:] + f.read(chunk_size), 0
+            eof = pos == len(buffer)
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise
+            # Drop consumed text so the buffer only holds the record being parsed
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield record
+        pos = end
+
+
+class StringTable:
+    """Immutable list of strings stored as one UTF-8 byte blob plus offsets"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings: Sequence[str]) -> 'StringTable':
+        encoded = [string.encode('utf-8') for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def concat(self, other: 'StringTable') -> 'StringTable':
+        if not len(other):
+            return self
+        return StringTable(np.concatenate([self.blob, other.blob]),
+                           np.concatenate([self.offsets[:-1], other.offsets + self.offsets[-1]]))
+
+    def __getitem__(self, position: int) -> str:
+        return bytes(self.blob[self.offsets[position]:self.offsets[position + 1]]).decode('utf-8')
+
+    def to_list(self) -> List[str]:
+        data = bytes(self.blob)
+        offsets = self.offsets.tolist()
+        return [data[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+
+
+class _CategoryEncoder:
+    """Assigns int32 codes to strings in first-seen order"""
+
+    def __init__(self, categories: Sequence[str] = ()):
+        self.categories = list(categories)
+        self.codes = {category: code for code, category in enumerate(self.categories)}
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.categories)
+            self.categories.append(value)
+        return code
+
+
+class StoryColumns:
+    """Historical stories as typed columns"""
+
+    _ARRAYS = ("team_size", "story_points", "hours", "description_codes",
+               "criteria_codes", "criteria_offsets", "dependencies_codes", "dependencies_offsets",
+               "risks_codes", "risks_offsets")
+    _TABLES = ("story_ids", "descriptions", "criteria_categories", "dependencies_categories", "risks_categories")
+
+    def __init__(self, **columns):
+        for name in self._ARRAYS + self._TABLES:
+            setattr(self, name, columns[name])
+        self._encoders: Optional[Dict[str, _CategoryEncoder]] = None
+
+    def __len__(self) -> int:
+        return len(self.story_points)
+
+    @classmethod
+    def from_records(cls, records, base: Optional['StoryColumns'] = None) -> 'StoryColumns':
+        """Encode records one at a time, appending to the columns of base when given"""
+        encoders = base._take_encoders() if base is not None else {
+            name: _CategoryEncoder() for name in ("descriptions",) + tuple(f"{kind}_categories" for kind in LIST_COLUMNS)
+        }
+        known = {name: len(encoder.categories) for name, encoder in encoders.items()}
+        ids: List[str] = []
+        numbers = {name: array('i') for name in ("team_size", "story_points", "hours", "description_codes")}
+        lists = {kind: (encoders[f"{kind}_categories"], array('i'), array('q', [0])) for kind in LIST_COLUMNS}
+
+        for record in records:
+            ids.append(str(record.get('Story_ID', '')))
+            numbers["team_size"].append(_to_int(record.get('Team_Size')))
+            numbers["story_points"].append(_to_int(record.get('Actual_Story_Points')))
+            numbers["hours"].append(_to_int(record.get('Actual_Hours')))
+            numbers["description_codes"].append(encoders["descriptions"].encode(str(record.get('User_Story_Description', ''))))
+            for kind, field in LIST_COLUMNS.items():
+                encoder, codes, offsets = lists[kind]
+                for label in flatten_labels(record.get(field)):
+                    codes.append(encoder.encode(label))
+                offsets.append(len(codes))
+
+        columns = {name: _int_array(values, np.int32) for name, values in numbers.items()}
+        for kind, (_, codes, offsets) in lists.items():
+            columns[f"{kind}_codes"] = _int_array(codes, np.int32)
+            columns[f"{kind}_offsets"] = _int_array(offsets, np.int64)
+        columns["story_ids"] = StringTable.from_strings(ids)
+        for name, encoder in encoders.items():
+            columns[name] = StringTable.from_strings(encoder.categories[known[name]:])
+
+        if base is not None:
+            # Only the new rows and new categories were encoded; existing data is copied as arrays
+            for name in ("team_size", "story_points", "hours", "description_codes"):
+                columns[name] = np.concatenate([getattr(base, name), columns[name]])
+            for kind in LIST_COLUMNS:
+                base_codes = getattr(base, f"{kind}_codes")
+                columns[f"{kind}_codes"] = np.concatenate([base_codes, columns[f"{kind}_codes"]])
+                columns[f"{kind}_offsets"] = np.concatenate([getattr(base, f"{kind}_offsets")[:-1],
+                                                             columns[f"{kind}_offsets"] + len(base_codes)])
+            for name in ("story_ids",) + tuple(encoders):
+                columns[name] = getattr(base, name).concat(columns[name])
+        result = cls(**columns)
+        result._encoders = encoders
+        return result
+
+    def _take_encoders(self) -> Dict[str, '_CategoryEncoder']:
+        """Category encoders for appending; ownership passes to the appended columns"""
+        encoders = self._encoders
+        if encoders is None:
+            encoders = {name: _CategoryEncoder(getattr(self, name).to_list())
+                        for name in ("descriptions",) + tuple(f"{kind}_categories" for kind in LIST_COLUMNS)}
+        self._encoders = None
+        return encoders
+
+    @classmethod
+    def empty(cls) -> 'StoryColumns':
+        return cls.from_records([])
+
+    def appended(self, records: Sequence[Dict[str, Any]]) -> 'StoryColumns':
+        """Return new columns with records appended"""
+        return StoryColumns.from_records(records, base=self)
+
+    def labels(self, kind: str, row: int) -> List[str]:
+        codes = getattr(self, f"{kind}_codes")
+        offsets = getattr(self, f"{kind}_offsets")
+        categories = getattr(self, f"{kind}_categories")
+        return [categories[code] for code in codes[offsets[row]:offsets[row + 1]]]
+
+    def label_counts(self, kind: str) -> Counter:
+        """Count label occurrences across all rows without decoding each row"""
+        categories = getattr(self, f"{kind}_categories")
+        counts = np.bincount(getattr(self, f"{kind}_codes"), minlength=len(categories))
+        return Counter({categories[code]: int(count) for code, count in enumerate(counts) if count})
+
+    def _list_column(self, kind: str) -> List[List[str]]:
+        categories = getattr(self, f"{kind}_categories").to_list()
+        codes = getattr(self, f"{kind}_codes").tolist()
+        offsets = getattr(self, f"{kind}_offsets").tolist()
+        return [[categories[code] for code in codes[start:end]] for start, end in zip(offsets, offsets[1:])]
+
+    def story_texts(self) -> List[str]:
+        """Description plus acceptance criteria per row, as used for text features"""
+        descriptions = self.descriptions.to_list()
+        return [f"{descriptions[code]} | {', '.join(criteria)}" if criteria else descriptions[code]
+                for code, criteria in zip(self.description_codes.tolist(), self._list_column("criteria"))]
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield rows as records with flattened label lists"""
+        frame = self.to_dataframe()
+        yield from frame.to_dict('records')
+
+    def to_dataframe(self):
+        """Materialise the columns as a DataFrame with the historical data schema"""
+        import pandas as pd
+        return pd.DataFrame({
+            'Story_ID': self.story_ids.to_list(),
+            'User_Story_Description': pd.Categorical.from_codes(
+                np.asarray(self.description_codes), categories=pd.Index(self.descriptions.to_list(), dtype=object)
+            ) if len(self.descriptions) else pd.Series([], dtype=object),
+            'Acceptance_Criteria': self._list_column("criteria"),
+            'Team_Size': np.asarray(self.team_size),
+            'Dependencies': self._list_column("dependencies"),
+            'Risks': self._list_column("risks"),
+            'Actual_Story_Points': np.asarray(self.story_points),
+            'Actual_Hours': np.asarray(self.hours)
+        })
+
+    def save(self, directory: str, fingerprint: Optional[str] = None):
+        """Write every column as .npy files plus metadata"""
+        os.makedirs(directory, exist_ok=True)
+        for name in self._ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        for name in self._TABLES:
+            table = getattr(self, name)
+            np.save(os.path.join(directory, f"{name}.blob.npy"), table.blob)
+            np.save(os.path.join(directory, f"{name}.offsets.npy"), table.offsets)
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump({"fingerprint": fingerprint, "rows": len(self)}, f)
+
+    @classmethod
+    def load(cls, directory: str, fingerprint: Optional[str] = None, mmap: bool = True) -> Optional['StoryColumns']:
+        """Memory-map cached columns; None when missing or cached from different data"""
+        try:
+            with open(os.path.join(directory, "meta.json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if fingerprint is not None and meta.get("fingerprint") != fingerprint:
+            return None
+        mode = 'r' if mmap else None
+        try:
+            columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode) for name in cls._ARRAYS}
+            for name in cls._TABLES:
+                columns[name] = StringTable(np.load(os.path.join(directory, f"{name}.blob.npy"), mmap_mode=mode),
+                                            np.load(os.path.join(directory, f"{name}.offsets.npy"), mmap_mode=mode))
+        except (OSError, ValueError):
+            return None
+        return cls(**columns)
+
+
+def _int_array(values: array, dtype) -> np.ndarray:
+    return np.frombuffer(values, dtype=dtype) if len(values) else np.zeros(0, dtype=dtype)
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(round(float(value)))
+    except (TypeError, ValueError):
+        return 0
+
+
+def load_columns(path: str, cache_dir: Optional[str] = None) -> StoryColumns:
+    """Load columns from the cache when it matches path, otherwise stream-parse path and refresh the cache"""
+    fingerprint = file_fingerprint(path)
+    if cache_dir:
+        columns = StoryColumns.load(versioned_cache_dir(cache_dir, fingerprint), fingerprint)
+        if columns is not None:
+            return columns
+    columns = StoryColumns.from_records(iter_records(path))
+    if cache_dir and fingerprint is not None:
+        publish_cache(cache_dir, fingerprint, lambda directory: columns.save(directory, fingerprint))
+    return columns
@@ -0,0 +1,183 @@
+"""
+Similar-story retrieval over historical data.
+Stories are embedded as TF-IDF weighted hashed text features in a compact float32 matrix. Large
+indexes are partitioned by a spherical k-means coarse quantizer (an inverted file), so a query only
+scans the few partitions closest to it. Every array is saved as a plain .npy file and can be
+memory-mapped, so worker processes share one copy of the index.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from local_estimator import AppendBuffer, hash_features, normalize_rows, story_text
+
+# Below this many stories an exhaustive matrix product is already sub-millisecond
+IVF_MIN_ROWS = 8192
+
+_ARRAYS = ("features", "idf", "story_points", "hours", "text_offsets", "text_blob", "centroids", "list_offsets")
+
+
+class StoryIndex:
+    """Top-k cosine retrieval of historical stories with their actual points and hours"""
+
+    def __init__(self, features: np.ndarray, idf: np.ndarray, story_points: np.ndarray, hours: np.ndarray,
+                 text_offsets: np.ndarray, text_blob: np.ndarray, centroids: Optional[np.ndarray] = None,
+                 list_offsets: Optional[np.ndarray] = None, nprobe: int = 8):
+        self.features = features
+        self.idf = idf
+        self.story_points = story_points
+        self.hours = hours
+        self.text_offsets = text_offsets
+        self.text_blob = text_blob
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.nprobe = nprobe
+        # Stories added after the build, scanned exhaustively until the next rebuild: features and
+        # records grown in place together, so lock-free searches see matching rows and records
+        self._extra = AppendBuffer(np.zeros((0, features.shape[1]), dtype=np.float32), np.empty(0, dtype=object))
+
+    def __len__(self) -> int:
+        return len(self.story_points) + len(self._extra)
+
+    @classmethod
+    def build(cls, records: Sequence[Dict[str, Any]], n_features: int = 256, n_lists: Optional[int] = None,
+              nprobe: int = 8, seed: int = 0) -> 'StoryIndex':
+        """Build an index from historical story records"""
+        return cls.build_from_texts(
+            [story_text(record) for record in records],
+            [record.get('Actual_Story_Points', 0) for record in records],
+            [record.get('Actual_Hours', 0) for record in records],
+            n_features, n_lists, nprobe, seed
+        )
+
+    @classmethod
+    def build_from_texts(cls, texts: Sequence[str], story_points, hours, n_features: int = 256,
+                         n_lists: Optional[int] = None, nprobe: int = 8, seed: int = 0) -> 'StoryIndex':
+        """Build an index from story texts and their actual points and hours"""
+        texts = list(texts)
+        return cls.build_from_counts(hash_features(texts, n_features, normalize=False), texts, story_points, hours,
+                                     n_lists, nprobe, seed)
+
+    @classmethod
+    def build_from_counts(cls, counts: np.ndarray, texts: Sequence[str], story_points, hours,
+                          n_lists: Optional[int] = None, nprobe: int = 8, seed: int = 0) -> 'StoryIndex':
+        """Build an index from the stories' unnormalised hashed features (left unchanged) and texts"""
+        texts = list(texts)
+        document_frequency = np.count_nonzero(counts, axis=0)
+        idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(np.float32)
+        features = normalize_rows(counts * idf)
+        story_points = np.asarray(story_points, dtype=np.float32)
+        hours = np.asarray(hours, dtype=np.float32)
+
+        centroids = list_offsets = None
+        if len(texts) >= IVF_MIN_ROWS:
+            n_lists = n_lists or int(np.sqrt(len(texts)))
+            centroids, assignment = _spherical_kmeans(features, n_lists, seed)
+            order = np.argsort(assignment, kind='stable')
+            features, story_points, hours = features[order], story_points[order], hours[order]
+            texts = [texts[position] for position in order]
+            list_offsets = np.searchsorted(assignment[order], np.arange(n_lists + 1)).astype(np.int64)
+
+        encoded = [text.encode('utf-8') for text in texts]
+        text_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in encoded], out=text_offsets[1:])
+        text_blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(features, idf, story_points, hours, text_offsets, text_blob, centroids, list_offsets, nprobe)
+
+    def save(self, directory: str, fingerprint: Optional[str] = None):
+        """Write the index as .npy files plus a small metadata file"""
+        os.makedirs(directory, exist_ok=True)
+        for name in _ARRAYS:
+            array = getattr(self, name)
+            if array is not None:
+                np.save(os.path.join(directory, f"{name}.npy"), array)
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump({"fingerprint": fingerprint, "nprobe": self.nprobe, "rows": len(self.story_points)}, f)
+
+    @classmethod
+    def load(cls, directory: str, fingerprint: Optional[str] = None, mmap: bool = True) -> Optional['StoryIndex']:
+        """Load a saved index, memory-mapped by default; None if missing or built from other data"""
+        try:
+            with open(os.path.join(directory, "meta.json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if fingerprint is not None and meta.get("fingerprint") != fingerprint:
+            return None
+        arrays = {}
+        for name in _ARRAYS:
+            path = os.path.join(directory, f"{name}.npy")
+            arrays[name] = np.load(path, mmap_mode='r' if mmap else None) if os.path.exists(path) else None
+        return cls(nprobe=meta.get("nprobe", 8), **arrays)
+
+    def add(self, records: Sequence[Dict[str, Any]]):
+        """Make newly completed stories retrievable without rebuilding the index"""
+        if not records:
+            return
+        counts = hash_features([story_text(record) for record in records], self.features.shape[1], normalize=False)
+        self._extra.append(normalize_rows(counts * self.idf), list(records))
+
+    def text(self, row: int) -> str:
+        return bytes(self.text_blob[self.text_offsets[row]:self.text_offsets[row + 1]]).decode('utf-8')
+
+    def _candidate_ranges(self, query: np.ndarray) -> List[range]:
+        if self.centroids is None:
+            return [range(0, len(self.story_points))]
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return [range(self.list_offsets[probe], self.list_offsets[probe + 1]) for probe in probes]
+
+    def search(self, texts: Sequence[str], k: int = 3) -> List[List[Dict[str, Any]]]:
+        """Return the k most similar historical stories for each query text"""
+        if not texts or len(self) == 0:
+            return [[] for _ in texts]
+        queries = normalize_rows(hash_features(texts, self.features.shape[1], normalize=False) * self.idf)
+        extra_features, extra_records = self._extra.view()
+        if self.centroids is None:
+            all_scores = queries @ self.features.T if len(self.story_points) else np.zeros((len(texts), 0), dtype=np.float32)
+        results = []
+        for position, query in enumerate(queries):
+            if self.centroids is None:
+                rows, scores = np.arange(len(self.story_points)), all_scores[position]
+            else:
+                ranges = self._candidate_ranges(query)
+                rows = np.concatenate([np.arange(r.start, r.stop) for r in ranges])
+                scores = np.concatenate([self.features[r.start:r.stop] @ query for r in ranges])
+            if len(extra_records):
+                rows = np.concatenate([rows, -1 - np.arange(len(extra_records))])
+                scores = np.concatenate([scores, extra_features @ query])
+            top = min(k, len(scores))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+            results.append([self._result(int(rows[i]), float(scores[i]), extra_records) for i in best])
+        return results
+
+    def _result(self, row: int, similarity: float, extra_records: np.ndarray) -> Dict[str, Any]:
+        if row < 0:
+            record = extra_records[-1 - row]
+            return {"story": story_text(record), "story_points": float(record.get('Actual_Story_Points', 0)),
+                    "hours": float(record.get('Actual_Hours', 0)), "similarity": round(similarity, 3)}
+        return {"story": self.text(row), "story_points": float(self.story_points[row]),
+                "hours": float(self.hours[row]), "similarity": round(similarity, 3)}
+
+
+def _spherical_kmeans(features: np.ndarray, n_lists: int, seed: int, iterations: int = 8,
+                      sample_size: int = 32768, chunk: int = 16384):
+    """Cluster unit vectors by cosine similarity; returns (centroids, assignment of every row)"""
+    rng = np.random.default_rng(seed)
+    sample = features[rng.choice(len(features), min(sample_size, len(features)), replace=False)]
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        empty = ~sums.any(axis=1)
+        sums[empty] = centroids[empty]
+        centroids = normalize_rows(sums)
+    assignment = np.concatenate([
+        np.argmax(features[start:start + chunk] @ centroids.T, axis=1) for start in range(0, len(features), chunk)
+    ])
+    return centroids, assignment
@@ -0,0 +1,234 @@
+"""
+Capacity-constrained scheduling of user stories into sprints.
+Stories are taken in dependency (topological) order, keeping the requested order among stories
+that are ready. Each goes into the first sprint, at or after the one following its last
+dependency, in which some team still has enough hours left; the least loaded of those teams
+takes it. A story bigger than a whole sprint gets an empty sprint of the largest team to itself
+and is flagged as overloaded. Sprints are added past the planned duration when the work does not fit.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from dependency_graph import csr, topological_order
+from sprint_planner import HOURS_PER_PERSON_WEEK, SPRINT_WEEKS, SprintPlan, rows_from_columns
+
+_ARROW = re.compile(r"^(.+?)\s*(?:->|=>|→)\s*(.+)$")
+_DEPENDS = re.compile(r"^(.+?)\s+(?:depends on|requires|blocked by|after)\s+(.+)$", re.IGNORECASE)
+_NUMBERED = re.compile(r"^(?:story|us)?\s*[-#]?\s*(\d+)$", re.IGNORECASE)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(str(text).lower().split())
+
+
+def story_references(stories: Sequence[Any]) -> Dict[str, int]:
+    """Names a dependency may use for each story: its text and, for records, its id"""
+    references: Dict[str, int] = {}
+    for index, story in enumerate(stories):
+        if isinstance(story, dict):
+            for key in ('id', 'Story_ID', 'title'):
+                if story.get(key) not in (None, ''):
+                    references.setdefault(_normalize(story[key]), index)
+            story = story.get('User_Story_Description', story.get('description', ''))
+        references.setdefault(_normalize(story), index)
+    return references
+
+
+def _resolve(reference: str, references: Dict[str, int], count: int) -> Optional[int]:
+    # A story is named by its 1-based position ('3', '#3', 'Story 3', 'US-3'), id or exact text
+    numbered = _NUMBERED.match(reference.strip())
+    if numbered and 1 <= int(numbered.group(1)) <= count:
+        return int(numbered.group(1)) - 1
+    return references.get(_normalize(reference))
+
+
+def parse_story_dependencies(stories: Sequence[Any], dependencies: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """(before, after) story index arrays for dependencies between stories, plus the entries that do
+    not link two stories (external dependencies such as 'Payment gateway').
+
+    'A -> B' means A must be finished before B; 'B depends on A' (or requires, blocked by, after)
+    says the same. Story records can also list what they wait for under 'depends_on'.
+    """
+    references = story_references(stories)
+    before: List[int] = []
+    after: List[int] = []
+    external: List[str] = []
+    for entry in dependencies or []:
+        if not isinstance(entry, str) or not entry.strip():
+            continue
+        arrow = _ARROW.match(entry.strip())
+        depends = None if arrow else _DEPENDS.match(entry.strip())
+        if arrow:
+            first, then = _resolve(arrow.group(1), references, len(stories)), _resolve(arrow.group(2), references, len(stories))
+        elif depends:
+            then, first = _resolve(depends.group(1), references, len(stories)), _resolve(depends.group(2), references, len(stories))
+        else:
+            first = then = None
+        if first is None or then is None or first == then:
+            external.append(entry.strip())
+            continue
+        before.append(first)
+        after.append(then)
+    for index, story in enumerate(stories):
+        if not isinstance(story, dict):
+            continue
+        waits_for = story.get('depends_on') or []
+        for reference in [waits_for] if isinstance(waits_for, (str, int)) else waits_for:
+            first = _resolve(str(reference), references, len(stories))
+            if first is not None and first != index:
+                before.append(first)
+                after.append(index)
+    return np.array(before, dtype=np.int64), np.array(after, dtype=np.int64), external
+
+
+class StorySchedule:
+    """Sprint and team assignment of every story, with per (team, sprint) capacity"""
+
+    def __init__(self, stories: List[str], story_points: np.ndarray, hours: np.ndarray, sprint: np.ndarray,
+                 team: np.ndarray, overloaded: np.ndarray, team_names: List[str], team_sizes: np.ndarray,
+                 sprint_count: int, sprint_weeks: int, hours_per_person_week: float,
+                 before: np.ndarray, after: np.ndarray, blocked: List[int], external: List[str]):
+        self.stories = stories
+        self.story_points = story_points
+        self.hours = hours
+        self.sprint = sprint
+        self.team = team
+        self.overloaded = overloaded
+        self.team_names = team_names
+        self.team_sizes = team_sizes
+        self.sprint_count = sprint_count
+        self.sprint_weeks = sprint_weeks
+        self.hours_per_person_week = hours_per_person_week
+        self.before = before
+        self.after = after
+        self.blocked = blocked
+        self.external_dependencies = external
+
+    def __len__(self) -> int:
+        return len(self.stories)
+
+    def totals(self, values: Any = None) -> np.ndarray:
+        """Sum of values (story count when None) per team and sprint, shape (teams, sprints)"""
+        slots = self.team * self.sprint_count + self.sprint
+        return np.bincount(slots, weights=values, minlength=len(self.team_sizes) * self.sprint_count
+                           ).reshape(len(self.team_sizes), self.sprint_count)
+
+    def plan(self, start) -> SprintPlan:
+        """Sprint dates, load and utilization of every team and sprint"""
+        return SprintPlan(self.team_names, self.team_sizes, np.arange(1, self.sprint_count + 1),
+                          np.full(self.sprint_count, self.sprint_weeks), start,
+                          stories=self.totals().astype(np.int64), story_points=self.totals(self.story_points),
+                          hours=self.totals(self.hours).round(1), hours_per_person_week=self.hours_per_person_week)
+
+    def sprint_stories(self) -> List[List[int]]:
+        """Story indices of each sprint, in story order"""
+        return _group(self.sprint, self.sprint_count)
+
+    def slot_stories(self) -> List[List[int]]:
+        """Story indices of each (team, sprint) slot, team by team like SprintPlan rows"""
+        return _group(self.team * self.sprint_count + self.sprint, len(self.team_sizes) * self.sprint_count)
+
+    def prerequisite_sprints(self) -> List[List[int]]:
+        """For each sprint, the earlier sprints (0-based) holding stories its stories depend on"""
+        earlier: List[set] = [set() for _ in range(self.sprint_count)]
+        for first, then in zip(self.sprint[self.before].tolist(), self.sprint[self.after].tolist()):
+            if first < then:
+                earlier[then].add(first)
+        return [sorted(sprints) for sprints in earlier]
+
+    def breakdown_rows(self, start) -> List[Dict[str, Any]]:
+        """Sprint Breakdown sheet rows, one per team and sprint"""
+        plan = self.plan(start)
+        labels = plan.sprint_number.astype(str)
+        prerequisites = self.prerequisite_sprints()
+        return rows_from_columns(dict(plan.team_columns(), **{
+            'Sprint Number': plan.sprint_number,
+            'Sprint Goal': np.char.add(np.char.add('Sprint ', labels), ' deliverables'),
+            'Duration (weeks)': plan.duration_weeks,
+            'Stories Count': plan.stories,
+            'Estimated Story Points': plan.story_points,
+            'Estimated Hours': plan.hours,
+            'Team Capacity': plan.capacity,
+            'Capacity Utilization': plan.utilization_labels(),
+            'Key Deliverables': [', '.join(self.stories[index] for index in indices) or 'No stories scheduled'
+                                 for indices in self.slot_stories()],
+            'Dependencies': [', '.join(f'Sprint {sprint + 1}' for sprint in sprints) or 'None'
+                             for sprints in prerequisites] * plan.team_count
+        }), len(plan))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sprint_count": self.sprint_count,
+            "stories": [{
+                "story": story, "sprint": int(sprint) + 1, "team": self.team_names[team] or None,
+                "story_points": float(points), "hours": float(hours), "overloaded": bool(overloaded)
+            } for story, sprint, team, points, hours, overloaded in zip(
+                self.stories, self.sprint.tolist(), self.team.tolist(), self.story_points.tolist(),
+                self.hours.tolist(), self.overloaded.tolist())],
+            "blocked_by_cycle": [self.stories[index] for index in self.blocked],
+            "external_dependencies": self.external_dependencies
+        }
+
+
+def _group(keys: np.ndarray, size: int) -> List[List[int]]:
+    grouped: List[List[int]] = [[] for _ in range(size)]
+    for index in np.argsort(keys, kind='stable').tolist():
+        grouped[keys[index]].append(index)
+    return grouped
+
+
+def schedule_stories(stories: List[str], story_points: Sequence[float], hours: Sequence[float],
+                     team_names: List[str], team_sizes: Sequence[int], before: np.ndarray, after: np.ndarray,
+                     planned_sprints: int, sprint_weeks: int = SPRINT_WEEKS,
+                     hours_per_person_week: float = HOURS_PER_PERSON_WEEK, external: Optional[List[str]] = None) -> StorySchedule:
+    """Assign stories to (sprint, team) slots under each team's sprint capacity, respecting dependencies"""
+    count = len(stories)
+    points = np.asarray(story_points, dtype=np.float64)
+    story_hours = np.asarray(hours, dtype=np.float64)
+    sizes = np.asarray(team_sizes, dtype=np.int64)
+    teams = len(sizes)
+    team_capacity = (sizes * sprint_weeks * hours_per_person_week).astype(np.float64)
+
+    order, blocked = topological_order(count, before, after, by_index=True)
+    # Stories blocked by a cycle only wait for the predecessors that could be scheduled
+    offsets, predecessors = csr(after, before, count)
+
+    # Each story needs at most one sprint beyond the planned ones, so this never runs out
+    max_sprints = max(1, planned_sprints) + count
+    capacity = np.tile(team_capacity, max_sprints)
+    remaining = capacity.copy()
+    sprint = np.full(count, -1, dtype=np.int64)
+    team = np.zeros(count, dtype=np.int64)
+    overloaded = np.zeros(count, dtype=bool)
+    last_sprint = max(1, planned_sprints) - 1
+    usable = capacity > 0
+
+    for index in order + blocked:
+        waits_for = sprint[predecessors[offsets[index]:offsets[index + 1]]]
+        earliest = int(waits_for.max()) + 1 if len(waits_for) else 0
+        low, high = earliest * teams, (max(last_sprint, earliest) + 2) * teams
+        window = remaining[low:high]
+        fits = (window >= story_hours[index]) & usable[low:high]
+        slot = int(fits.argmax())
+        if fits[slot]:
+            # Within the first sprint that has room, balance the teams: the least loaded one takes it
+            first = slot - slot % teams
+            free = window[first:first + teams] / np.maximum(capacity[low + first:low + first + teams], 1e-9)
+            slot = first + int(np.where(fits[first:first + teams], free, -np.inf).argmax())
+        else:
+            # Too big for any team's sprint: an empty sprint of the largest team, or a new sprint when
+            # no team has capacity. Dependencies are all in sprints up to last_sprint, so the new sprint
+            # follows it and each story adds at most one sprint
+            empty = (window == capacity[low:high]) & (capacity[low:high] == team_capacity.max()) & usable[low:high]
+            slot = int(empty.argmax()) if empty.any() else (last_sprint + 1) * teams - low
+            overloaded[index] = True
+        slot += low
+        remaining[slot] -= story_hours[index]
+        sprint[index], team[index] = divmod(slot, teams)
+        last_sprint = max(last_sprint, int(sprint[index]))
+
+    return StorySchedule(list(stories), points, story_hours, sprint, team, overloaded, list(team_names), sizes,
+                         last_sprint + 1, sprint_weeks, hours_per_person_week, before, after, blocked, external or [])
@@ -0,0 +1,199 @@
+"""
+Append-only, durable store for completed stories ingested at runtime.
+Stories are appended to an NDJSON file that acts as a write-ahead log next to the historical data.
+Concurrent appends are grouped so one write and one fsync cover a whole batch, and a Story_ID
+index rejects duplicates. Worker processes can share the file: each batch is written under an
+exclusive file lock after catching up on lines other processes appended.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+REQUIRED_FIELDS = ("Story_ID", "User_Story_Description", "Actual_Story_Points", "Actual_Hours")
+NUMERIC_FIELDS = ("Team_Size", "Actual_Story_Points", "Actual_Hours")
+LIST_FIELDS = ("Acceptance_Criteria", "Dependencies", "Risks")
+
+
+def validate_story(story: Any) -> Optional[str]:
+    """Return an error message for an invalid completed story, or None"""
+    if not isinstance(story, dict):
+        return "story must be an object"
+    missing = [field for field in REQUIRED_FIELDS if story.get(field) in (None, "")]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    for field in NUMERIC_FIELDS:
+        value = story.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0):
+            return f"{field} must be a non-negative number"
+    for field in LIST_FIELDS:
+        if field in story and not isinstance(story[field], (list, str)):
+            return f"{field} must be a list or string"
+    return None
+
+
+class _Append:
+    def __init__(self, stories: List[Dict[str, Any]]):
+        self.stories = stories
+        self.accepted: List[Dict[str, Any]] = []
+        self.duplicates: List[str] = []
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+
+class StoryStore:
+    """Group-committed NDJSON log of completed stories with a Story_ID index"""
+
+    def __init__(self, path: str, group_window: float = 0.002):
+        self.path = path
+        self.group_window = group_window
+        self.on_foreign: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+        self.batches_written = 0
+        self.stories_written = 0
+        self._ids: set = set()
+        self._offset = 0
+        self._io_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._pending: List[_Append] = []
+        self._writer: Optional[threading.Thread] = None
+
+    def add_known_ids(self, story_ids: Iterable[str]):
+        """Index Story_IDs already present elsewhere (the historical data file) as duplicates"""
+        with self._io_lock:
+            self._ids.update(story_ids)
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Read every stored story from the start of the file and index their Story_IDs"""
+        with self._io_lock:
+            self._offset = 0
+            return self._catch_up(include_known=True)
+
+    def catch_up(self) -> List[Dict[str, Any]]:
+        """Return new stories appended by other processes since the last read"""
+        with self._io_lock:
+            return self._catch_up()
+
+    def append(self, stories: List[Dict[str, Any]], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Durably append stories, skipping known Story_IDs; returns accepted stories and duplicate IDs"""
+        request = _Append(stories)
+        if stories:
+            with self._cond:
+                self._pending.append(request)
+                self._ensure_writer()
+                self._cond.notify()
+            if not request.done.wait(timeout):
+                return {"error": "Timed out waiting for the story store"}
+        if request.error:
+            return {"error": request.error}
+        return {"accepted": request.accepted, "duplicates": request.duplicates}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "indexed_ids": len(self._ids), "batches_written": self.batches_written,
+                "stories_written": self.stories_written}
+
+    def _ensure_writer(self):
+        # Also restarts the writer in a process forked after it was started
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._run, name='story-store-writer', daemon=True)
+            self._writer.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # Let appends arriving at the same moment join this batch and share its fsync
+            time.sleep(self.group_window)
+            with self._cond:
+                batch, self._pending = self._pending, []
+            foreign = self._write_batch(batch)
+            for request in batch:
+                request.done.set()
+            if foreign and self.on_foreign:
+                try:
+                    self.on_foreign(foreign)
+                except Exception as e:
+                    print(f"Error applying stories from the story store: {e}")
+
+    def _write_batch(self, batch: List[_Append]) -> List[Dict[str, Any]]:
+        foreign: List[Dict[str, Any]] = []
+        with self._io_lock, open(self.path, 'ab+') as f:
+            self._lock(f, exclusive=True)
+            try:
+                foreign = self._read_new(f)
+                lines = []
+                for request in batch:
+                    for story in request.stories:
+                        story_id = str(story['Story_ID'])
+                        if story_id in self._ids:
+                            request.duplicates.append(story_id)
+                            continue
+                        self._ids.add(story_id)
+                        request.accepted.append(story)
+                        lines.append(json.dumps(story) + "\n")
+                if lines:
+                    # A partial last line can only be left by a crashed writer; terminate it
+                    torn = f.seek(0, os.SEEK_END) > self._offset
+                    f.write((("\n" if torn else "") + "".join(lines)).encode('utf-8'))
+                    f.flush()
+                    os.fsync(f.fileno())
+                    self.batches_written += 1
+                    self.stories_written += len(lines)
+                self._offset = f.seek(0, os.SEEK_END)
+            except Exception as e:
+                for request in batch:
+                    self._ids.difference_update(str(story['Story_ID']) for story in request.accepted)
+                    request.accepted = []
+                    request.error = f"Could not write to the story store: {e}"
+            finally:
+                self._unlock(f)
+        return foreign
+
+    def _catch_up(self, include_known: bool = False) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'rb') as f:
+            self._lock(f, exclusive=False)
+            try:
+                return self._read_new(f, include_known)
+            finally:
+                self._unlock(f)
+
+    def _read_new(self, f, include_known: bool = False) -> List[Dict[str, Any]]:
+        """Parse complete lines after the last read offset, skipping indexed Story_IDs unless
+        include_known; caller holds the file lock"""
+        f.seek(self._offset)
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        stories = []
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                story = json.loads(line)
+            except ValueError:
+                print(f"Skipping unreadable line in {self.path}")
+                continue
+            story_id = str(story.get('Story_ID', ''))
+            if include_known or story_id not in self._ids:
+                self._ids.add(story_id)
+                stories.append(story)
+        return stories
+
+    @staticmethod
+    def _lock(f, exclusive: bool):
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    @staticmethod
+    def _unlock(f):
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
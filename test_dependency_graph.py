@@ -0,0 +1,18 @@
+import pytest
+
+from dependency_graph import DependencyCycleError, DependencyGraph
+
+
+def test_critical_path_and_slack():
+    # 0 -> 1 -> 3 and 0 -> 2 -> 3, with the branch through 1 the longer one
+    graph = DependencyGraph([2, 5, 1, 3], before=[0, 0, 1, 2], after=[1, 2, 3, 3])
+    assert graph.project_duration == 10
+    assert graph.critical_path() == [0, 1, 3]
+    assert graph.slack.tolist() == [0, 0, 4, 0]
+
+
+def test_cycle_is_reported_in_dependency_order():
+    with pytest.raises(DependencyCycleError) as error:
+        DependencyGraph([1, 1, 1, 1], before=[0, 1, 2, 3], after=[1, 2, 1, 0])
+    assert sorted(error.value.cycle) == [1, 2]
+    assert "Dependency cycle between stories" in str(error.value)
@@ -0,0 +1,38 @@
+import os
+import time
+
+from historical_snapshot import FileWatcher
+
+
+def test_failed_version_is_skipped_until_the_file_changes(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("[{")
+    calls = []
+
+    def reload():
+        calls.append(path.read_text())
+        return {"error": "invalid JSON"} if path.read_text().endswith("{") else {"reloaded": True}
+
+    watcher = FileWatcher(str(path), lambda: None, reload, interval=0.01, max_backoff=0.02)
+    assert watcher.check()
+    assert not watcher.check() and not watcher.check()
+    assert len(calls) == 1
+    assert watcher.failures == 1 and watcher.last_error == "invalid JSON"
+
+    path.write_text("[{}]")
+    os.utime(path, (time.time() + 5, time.time() + 5))
+    time.sleep(0.05)
+    assert watcher.check()
+    assert len(calls) == 2
+    assert watcher.failures == 0 and watcher.last_error is None
+
+
+def test_failures_back_off(tmp_path):
+    path = tmp_path / "data.json"
+    watcher = FileWatcher(str(path), lambda: None, lambda: 1 / 0, interval=10)
+    path.write_text("a")
+    assert watcher.check()
+    path.write_text("ab")
+    # Changed, but still within the backoff after the first failure
+    assert not watcher.check()
+    assert watcher.last_error == "division by zero"
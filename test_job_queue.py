@@ -0,0 +1,25 @@
+import threading
+import time
+
+from job_queue import DONE, FAILED, RUNNING, JobQueue, MemoryJobBackend, SQLiteJobBackend
+
+
+def test_job_left_running_by_a_stopped_worker_is_failed(tmp_path):
+    backend = SQLiteJobBackend(str(tmp_path / "jobs.db"))
+    stale = time.time() - 600
+    backend.create({'id': 'abandoned', 'status': RUNNING, 'payload': {}, 'created': stale, 'updated': stale})
+    queue = JobQueue(lambda payload, progress: {}, backend=backend, workers=1)
+    job = queue.get('abandoned')
+    assert job['status'] == FAILED
+    assert 'submit it again' in job['error']
+
+
+def test_running_job_keeps_its_lease():
+    release = threading.Event()
+    queue = JobQueue(lambda payload, progress: release.wait() and {'ok': True}, backend=MemoryJobBackend(),
+                     workers=1, lease_seconds=0.3)
+    job_id = queue.submit({})
+    time.sleep(1.0)
+    assert queue.status(job_id)['status'] == RUNNING
+    release.set()
+    assert queue.wait(job_id, timeout=5, poll_interval=0.05)['status'] == DONE
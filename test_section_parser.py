@@ -0,0 +1,36 @@
+from section_parser import IncrementalSectionDetector, parse_sections, split_sections
+
+
+def test_inline_heading_keeps_text_on_heading_line():
+    content = "**PROJECT OVERVIEW**\nA shop.\n\n**RECOMMENDATIONS**: do stuff\n- and more"
+    sections = split_sections(content)
+    assert sections["project_overview"] == "A shop."
+    assert sections["recommendations"] == "do stuff\n- and more"
+    assert parse_sections("## RISK ASSESSMENT - high churn")["risk_assessment"] == "high churn"
+
+
+def test_detector_matches_split_sections_for_inline_headings():
+    content = "1. SPRINT BREAKDOWN: two sprints\nSprint 1\nRECOMMENDATIONS: ship it"
+    detector = IncrementalSectionDetector()
+    completed = []
+    for start in range(0, len(content), 7):
+        completed += detector.feed(content[start:start + 7])
+    completed += detector.finish()
+    assert dict(completed) == split_sections(content)
+
+
+def test_detector_reports_repeated_section_merged():
+    detector = IncrementalSectionDetector()
+    completed = detector.feed("RISK ASSESSMENT\nfirst\nRECOMMENDATIONS\nok\nRISK ASSESSMENT\nsecond\n")
+    completed += detector.finish()
+    assert [key for key, _ in completed] == ["risk_assessment", "recommendations", "risk_assessment"]
+    assert completed[-1][1] == "first\n\nsecond"
+
+
+def test_prose_mentioning_a_heading_does_not_start_a_section():
+    content = ("RISK ASSESSMENT\nChurn is high.\nA RISK ASSESSMENT is due before launch.\n"
+               "RECOMMENDATIONS is what the board asked for\n**STRATEGIC RECOMMENDATIONS**\n- hire")
+    sections = split_sections(content)
+    assert sections["risk_assessment"] == ("Churn is high.\nA RISK ASSESSMENT is due before launch.\n"
+                                           "RECOMMENDATIONS is what the board asked for")
+    assert sections["recommendations"] == "- hire"
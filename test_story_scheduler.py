@@ -0,0 +1,66 @@
+import numpy as np
+
+from sprint_planner import team_size_error
+from story_scheduler import parse_story_dependencies, schedule_stories
+
+
+def schedule(count, dependencies, team_sizes, hours=20.0, planned_sprints=1):
+    stories = [f"Story {number}" for number in range(1, count + 1)]
+    before, after, external = parse_story_dependencies(stories, dependencies)
+    return schedule_stories(stories, [5.0] * count, [hours] * count, [f"Team {number}" for number in range(1, len(team_sizes) + 1)],
+                            team_sizes, before, after, planned_sprints, external=external)
+
+
+def test_zero_capacity_dependency_chain_gets_one_new_sprint_per_story():
+    scheduled = schedule(4, ["1 -> 2", "2 -> 3", "3 -> 4"], [0])
+    assert scheduled.sprint.tolist() == [1, 2, 3, 4]
+    assert scheduled.overloaded.all()
+    assert scheduled.sprint_count == 5
+
+
+def test_zero_capacity_teams_without_dependencies():
+    scheduled = schedule(3, [], [0, 0], planned_sprints=2)
+    assert scheduled.sprint.tolist() == [2, 3, 4]
+    assert len(scheduled.breakdown_rows("2025-01-06")) == 2 * scheduled.sprint_count
+
+
+def test_no_stories():
+    scheduled = schedule(0, [], [5])
+    assert len(scheduled) == 0
+    assert scheduled.sprint_count == 1
+
+
+def test_dependency_chain_runs_in_later_sprints():
+    scheduled = schedule(3, ["1 -> 2", "Story 3 depends on Story 2"], [5], hours=10.0)
+    assert scheduled.sprint.tolist() == [0, 1, 2]
+    assert not scheduled.overloaded.any()
+
+
+def test_story_bigger_than_a_sprint_is_overloaded():
+    scheduled = schedule(2, [], [1, 2], hours=200.0)
+    assert scheduled.overloaded.all()
+    # Each takes an empty sprint of the largest team
+    assert scheduled.team.tolist() == [1, 1]
+    assert scheduled.sprint.tolist() == [0, 1]
+
+
+def test_cycle_stories_are_blocked_but_scheduled():
+    scheduled = schedule(3, ["1 -> 2", "2 -> 1", "2 -> 3", "Payment gateway"], [5], hours=10.0)
+    assert sorted(scheduled.blocked) == [0, 1, 2]
+    assert (scheduled.sprint >= 0).all()
+    assert scheduled.external_dependencies == ["Payment gateway"]
+
+
+def test_capacity_is_respected():
+    scheduled = schedule(10, [], [1, 1], hours=30.0)
+    capacity = scheduled.plan("2025-01-06").capacity
+    assert (scheduled.totals(scheduled.hours).ravel() <= capacity).all()
+    assert np.bincount(scheduled.team).tolist() == [5, 5]
+
+
+def test_team_size_error():
+    assert team_size_error({"total_team_size": 4}) is None
+    assert team_size_error({}) is None
+    assert team_size_error({"total_team_size": 0}) == "Team 1 size must be at least 1, got 0"
+    assert team_size_error({"teams": [3, {"name": "QA", "size": -1}]}) == "Team 2 size must be at least 1, got -1"
+    assert "whole number" in team_size_error({"teams": ["many"]})
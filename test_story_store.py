@@ -0,0 +1,44 @@
+import json
+
+from story_store import StoryStore, validate_story
+
+
+def story(story_id, points=3, hours=8):
+    return {"Story_ID": story_id, "User_Story_Description": f"Story {story_id}",
+            "Actual_Story_Points": points, "Actual_Hours": hours}
+
+
+def test_duplicate_story_ids_are_rejected(tmp_path):
+    store = StoryStore(str(tmp_path / "stories.ndjson"))
+    store.add_known_ids(["H-1"])
+    result = store.append([story("S-1"), story("H-1"), story("S-1")])
+    assert [accepted["Story_ID"] for accepted in result["accepted"]] == ["S-1"]
+    assert result["duplicates"] == ["H-1", "S-1"]
+    assert store.append([story("S-1")], timeout=5)["duplicates"] == ["S-1"]
+    assert [stored["Story_ID"] for stored in StoryStore(store.path).read_all()] == ["S-1"]
+
+
+def test_torn_last_line_is_skipped_and_terminated(tmp_path):
+    path = tmp_path / "stories.ndjson"
+    path.write_text(json.dumps(story("S-1")) + "\n" + '{"Story_ID": "S-2", "User_Sto')
+    store = StoryStore(str(path))
+    assert [stored["Story_ID"] for stored in store.read_all()] == ["S-1"]
+    assert store.append([story("S-3")], timeout=5)["accepted"]
+    assert [stored["Story_ID"] for stored in StoryStore(str(path)).read_all()] == ["S-1", "S-3"]
+
+
+def test_catch_up_returns_stories_from_another_store(tmp_path):
+    path = str(tmp_path / "stories.ndjson")
+    first, second = StoryStore(path), StoryStore(path)
+    first.read_all()
+    second.append([story("S-1")], timeout=5)
+    assert [stored["Story_ID"] for stored in first.catch_up()] == ["S-1"]
+    assert first.append([story("S-1")], timeout=5)["duplicates"] == ["S-1"]
+
+
+def test_validate_story():
+    assert validate_story(story("S-1")) is None
+    assert validate_story([]) == "story must be an object"
+    assert "Actual_Hours" in validate_story({**story("S-1"), "Actual_Hours": ""})
+    assert validate_story({**story("S-1"), "Team_Size": -1}) == "Team_Size must be a non-negative number"
+    assert validate_story({**story("S-1"), "Risks": 3}) == "Risks must be a list or string"
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from response_cache import ResponseCache
+
+VALID = {
+    "project_overview": "A shop",
+    "sprints": [{"number": 1, "goal": "Checkout", "stories": [{"title": "Pay", "story_points": 3, "hours": 12}]}],
+    "bottlenecks": [],
+    "risks": [],
+    "milestones": []
+}
+
+
+class ScriptedTransport:
+    """Answers each chat call with the next scripted reply"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def chat(self, messages, model, max_tokens, temperature, tool=None, on_delta=None):
+        self.calls += 1
+        return self.replies.pop(0)
+
+
+@pytest.fixture
+def estimator(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("SPRINT_HISTORICAL_DATA", str(tmp_path / "missing.json"))
+    monkeypatch.setenv("SPRINT_STORY_STORE", str(tmp_path / "stories.ndjson"))
+    from enhanced_estimator import EnhancedSprintEstimator
+    return EnhancedSprintEstimator(response_cache=ResponseCache())
+
+
+PROJECT = {"project_name": "Shop", "total_team_size": 3, "user_stories": ["Pay", "Ship"]}
+
+
+@pytest.mark.parametrize("bad_reply", ["{not json", json.dumps({"project_overview": "missing the rest"})])
+def test_invalid_structured_reply_is_not_cached(estimator, bad_reply):
+    estimator.transport = ScriptedTransport([bad_reply, json.dumps(VALID)])
+    assert "error" in estimator.get_structured_analysis(PROJECT)
+    assert estimator.response_cache.stats()["entries"] == 0
+
+    analysis = estimator.get_structured_analysis(PROJECT)
+    assert analysis["structured"] and analysis["project_overview"] == "A shop"
+    assert estimator.transport.calls == 2
+
+
+def test_valid_structured_reply_is_served_from_cache(estimator):
+    estimator.transport = ScriptedTransport([json.dumps(VALID)])
+    first = estimator.get_structured_analysis(PROJECT)
+    assert estimator.get_structured_analysis(PROJECT) == first
+    assert estimator.transport.calls == 1